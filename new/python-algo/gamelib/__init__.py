@@ -16,7 +16,46 @@ Investigating it is useful for advanced players interested in getting data from
 The Navigation class in navigation.py contains functions related to pathfinding, which are used by GameState in pathing related functions. 
 Investigating it is useful for advanced player who want to optimize the slow default pathing algorithm we provide. \n 
 
-util.py contains a small handful of functions that help with communication, including the debug-printing function, debug_write().
+The TranspositionTable class in transposition.py is a bounded cache for memoizing evaluations by board hash. 
+GameMap keeps a Zobrist hash of the board in game_map.zobrist_hash that can be used as its key. \n
+
+The GameStateView class in perspective.py presents the game state from your opponent's point of view, without copying the board. 
+Get one with game_state.enemy_view() to predict enemy moves with the same functions you use for your own. \n
+
+The BuildPlan class in build_plan.py describes a defense layout once, and each turn only spawns and upgrades the parts of it that are missing. \n
+
+The StructureCensus class in census.py counts the structures on the board by player, type, upgrade state, row, column and region. 
+GameState builds one while parsing each turn, available as game_state.census. \n
+
+The bitboard.py module flood fills bitboards of the map to find pockets of open space, the tile a unit 
+in a pocket would path to, and which locations can reach their target edge, for either player. \n
+
+The ResourceAllocator class in allocation.py picks the most valuable set of spawns and upgrades 
+we can afford, solving the knapsack problem over SP and MP instead of spending greedily. \n
+
+The MazeBuilder class in maze.py searches, within an SP and time budget, for walls that make enemy units 
+take the most damage on their way to our edge, while keeping the tiles we attack from open. \n
+
+The PlacementEvaluator class in placement.py finds how placing a structure at each of many candidate locations 
+would change the length, damage taken and destination of every enemy path, re-pathing only the paths each candidate blocks. \n
+
+The CoverageOptimizer class in coverage.py chooses turret locations that cover the most dangerous predicted 
+enemy paths within an SP budget, using precomputed bitboards of the tiles in range of each location. \n
+
+The ResourceForecaster class in forecast.py precomputes the SP and MP both players will have if they save, 
+so questions like "how many turns until I can afford 5 demolishers" are answered with a lookup. \n
+
+The StructureRegistry class in registry.py lists a player's live structures in a chosen priority order, 
+with helpers for finding structures to upgrade, repair or that are pending removal. \n
+
+The AttackPredictor class in prediction.py estimates where and how hard the enemy can score on you this turn, 
+by pathing from every location they can deploy on. \n
+
+symmetry.py contains functions for mirroring locations, edges and paths across the center of the arena, 
+detecting mirror symmetric structure layouts, and the MirrorCache class, which shares results between mirrored locations. \n
+
+util.py contains a small handful of functions that help with communication, including the debug-printing function, debug_write(), 
+and get_seed(), which reads the random seed a game runner passes in the TERMINAL_SEED environment variable.
 """
 
 from .algocore import AlgoCore
@@ -24,6 +63,15 @@ from .util import debug_write
 from .game_state import GameState
 from .unit import GameUnit
 from .game_map import GameMap
+from .transposition import TranspositionTable
+from .prediction import AttackPredictor
+from .build_plan import BuildPlan
+from .allocation import ResourceAllocator
+from .forecast import ResourceForecaster
+from .placement import PlacementEvaluator
+from .maze import MazeBuilder
+from .coverage import CoverageOptimizer
+from .registry import StructureRegistry
 
-__all__ = ["algocore", "game_state", "game_map", "navigation", "unit", "util"]
+__all__ = ["algocore", "allocation", "bitboard", "build_plan", "census", "coverage", "forecast", "game_state", "game_map", "maze", "navigation", "perspective", "placement", "prediction", "registry", "symmetry", "transposition", "unit", "util"]
  
\ No newline at end of file
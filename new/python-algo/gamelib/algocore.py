@@ -1,19 +1,26 @@
 import json
+import random
 
 from .game_state import GameState
-from .util import get_command, debug_write, BANNER_TEXT, send_command
+from .util import get_command, debug_write, get_seed, BANNER_TEXT, send_command
 
 class AlgoCore(object):
     """
     This class handles communication with the game engine. \n
     algo_strategy.py subclasses it. 
 
+    If the game runner sets the TERMINAL_SEED environment variable, random is seeded from it, 
+    so seeds drawn from random afterwards, like the one in AlgoStrategy.__init__, repeat between games. 
+
     Attributes :
         * config (JSON): json object containing information about the game
 
     """
     def __init__(self):
         self.config = None
+        seed = get_seed()
+        if seed is not None:
+            random.seed(seed)
 
     def on_game_start(self, config):
         """
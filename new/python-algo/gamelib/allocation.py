@@ -0,0 +1,276 @@
+from fractions import Fraction
+import math
+
+from .util import debug_write
+
+MAX_RESOLUTION = 100
+
+
+class ResourceAllocator:
+    """Chooses the most valuable set of spawns and upgrades that we can afford this turn
+
+    Strategies add candidate actions, each with a value of their choosing, and the allocator solves
+    the knapsack problem over SP and MP exactly with dynamic programming. This stops cheap actions
+    that happen to be attempted first from starving more valuable, expensive ones such as upgrades.
+
+    Candidates at the same location are alternatives: at most one structure type is chosen for an empty
+    tile, and an upgrade of a structure that is not built yet is only chosen together with its spawn.
+    Actions that only cost SP and actions that only cost MP are solved as two separate knapsacks, so a few
+    hundred candidates take milliseconds. Actions costing both resources are solved together over both.
+
+    Example::
+
+        allocator = gamelib.ResourceAllocator()
+        allocator.add(TURRET, [[3, 12], [24, 12]], value=10)
+        allocator.add(TURRET, [[3, 12], [24, 12]], value=8, upgrade=True)
+        allocator.add(WALL, [[3, 13], [24, 13]], value=2)
+        allocator.add(SCOUT, [13, 0], value=1, num=5)
+        allocator.execute(game_state)
+
+    """
+    def __init__(self):
+        self._candidates = []
+
+    def add(self, unit_type, locations, value, upgrade=False, num=1):
+        """Adds candidate actions
+
+        Args:
+            unit_type: The type of unit to spawn or upgrade
+            locations: A single location or list of locations, each one is a separate candidate
+            value: How much the strategy wants each action, in any unit as long as it is used consistently
+            upgrade: If True, the candidate is an upgrade of the structure at the location
+            num: For mobile units, the number of units spawned by each candidate
+
+        """
+        if type(locations[0]) == int:
+            locations = [locations]
+        for location in locations:
+            x, y = map(int, location)
+            self._candidates.append((unit_type, x, y, upgrade, num, value))
+
+    def clear(self):
+        """Removes every candidate
+        """
+        self._candidates = []
+
+    def solve(self, game_state, SP=None, MP=None):
+        """Finds the most valuable set of candidates we can afford, without making any of them
+
+        Args:
+            game_state: The current GameState
+            SP: The most SP to spend, all of our SP by default
+            MP: The most MP to spend, all of our MP by default
+
+        Returns:
+            A tuple of the chosen actions, as a list of (unit_type, location, upgrade, num) in the order
+            they should be attempted, and their total value
+
+        """
+        if SP is None:
+            SP = game_state.get_resource(game_state.SP)
+        if MP is None:
+            MP = game_state.get_resource(game_state.MP)
+
+        groups = self._get_groups(game_state)
+        costs = [cost for group in groups for option in group for cost in option[0]]
+        scale = _get_scale(costs)
+        capacity = [int(math.floor(SP * scale + 1e-9)), int(math.floor(MP * scale + 1e-9))]
+
+        sp_groups, mp_groups, mixed_groups, free = [], [], [], []
+        for group in groups:
+            scaled = [([int(math.ceil(cost * scale - 1e-9)) for cost in option_cost], value, actions)
+                      for option_cost, value, actions in group]
+            uses_sp = any(option[0][0] > 0 for option in scaled)
+            uses_mp = any(option[0][1] > 0 for option in scaled)
+            if uses_sp and uses_mp:
+                mixed_groups.append(scaled)
+            elif uses_sp:
+                sp_groups.append([(option[0][0], option[1], option[2]) for option in scaled])
+            elif uses_mp:
+                mp_groups.append([(option[0][1], option[1], option[2]) for option in scaled])
+            else:
+                free.append(max(scaled, key=lambda option: option[1]))
+
+        chosen = []
+        total_value = 0
+        for _, value, actions in free:
+            chosen.extend(actions)
+            total_value += value
+        if mixed_groups:
+            merged = [[((cost, 0), value, actions) for cost, value, actions in group] for group in sp_groups]
+            merged += [[((0, cost), value, actions) for cost, value, actions in group] for group in mp_groups]
+            value, actions = _solve_2d(merged + mixed_groups, capacity[0], capacity[1])
+            total_value += value
+            chosen.extend(actions)
+        else:
+            for resource_groups, resource_capacity in [(sp_groups, capacity[0]), (mp_groups, capacity[1])]:
+                value, actions = _solve_1d(resource_groups, resource_capacity)
+                total_value += value
+                chosen.extend(actions)
+
+        # Structures before upgrades so upgrades find their structure, and mobile units last
+        chosen.sort(key=lambda action: (action[4], action[2], action[5]))
+        return [(unit_type, location, upgrade, num) for unit_type, location, upgrade, num, _, _ in chosen], total_value
+
+    def execute(self, game_state, SP=None, MP=None):
+        """Solves and then attempts the chosen actions
+
+        Args:
+            game_state: The current GameState
+            SP: The most SP to spend, all of our SP by default
+            MP: The most MP to spend, all of our MP by default
+
+        Returns:
+            The chosen actions, as returned by solve
+
+        """
+        actions, _ = self.solve(game_state, SP, MP)
+        for unit_type, location, upgrade, num in actions:
+            if upgrade:
+                game_state.attempt_upgrade(location)
+            else:
+                game_state.attempt_spawn(unit_type, location, num)
+        return actions
+
+    def _get_groups(self, game_state):
+        """Groups the valid candidates into sets of mutually exclusive options.
+        Each option is ([SP, MP] cost, value, actions)
+        """
+        from .game_state import UNIT_TYPE_TO_INDEX, is_stationary
+        unit_information = game_state.config["unitInformation"]
+        warnings = game_state.enable_warnings
+        game_state.suppress_warnings(True)
+        try:
+            spawns = {}
+            upgrades = {}
+            groups = []
+            for order, (unit_type, x, y, upgrade, num, value) in enumerate(self._candidates):
+                if value <= 0:
+                    continue
+                stationary = is_stationary(unit_type)
+                if not stationary:
+                    if not upgrade and game_state.can_spawn(unit_type, [x, y], num):
+                        cost = [cost * num for cost in game_state.type_cost(unit_type)]
+                        groups.append([(cost, value, [(unit_type, [x, y], False, num, 2, order)])])
+                    continue
+                if upgrade:
+                    if unit_information[UNIT_TYPE_TO_INDEX[unit_type]].get("upgrade") is not None:
+                        key = (x, y, unit_type)
+                        if key not in upgrades or upgrades[key][0] < value:
+                            upgrades[key] = (value, order)
+                elif game_state.can_spawn(unit_type, [x, y]):
+                    key = (x, y)
+                    if key not in spawns or spawns[key].get(unit_type, (0,))[0] < value:
+                        spawns.setdefault(key, {})[unit_type] = (value, order)
+
+            for (x, y, unit_type), (value, order) in upgrades.items():
+                existing = None
+                for unit in game_state.game_map[x, y] if game_state.game_map.in_arena_bounds([x, y]) else []:
+                    if unit.stationary:
+                        existing = unit
+                if existing is None:
+                    continue
+                if existing.player_index != 0 or existing.upgraded or existing.unit_type != unit_type or y >= game_state.HALF_ARENA:
+                    continue
+                groups.append([(game_state.type_cost(unit_type, True), value, [(unit_type, [x, y], True, 1, 1, order)])])
+
+            for (x, y), options in spawns.items():
+                group = []
+                for unit_type, (value, order) in options.items():
+                    spawn_cost = game_state.type_cost(unit_type)
+                    spawn = (unit_type, [x, y], False, 1, 0, order)
+                    group.append((spawn_cost, value, [spawn]))
+                    if (x, y, unit_type) in upgrades:
+                        upgrade_value, upgrade_order = upgrades[(x, y, unit_type)]
+                        upgrade_cost = game_state.type_cost(unit_type, True)
+                        group.append(([spawn_cost[0] + upgrade_cost[0], spawn_cost[1] + upgrade_cost[1]], value + upgrade_value,
+                                      [spawn, (unit_type, [x, y], True, 1, 1, upgrade_order)]))
+                groups.append(group)
+        finally:
+            game_state.suppress_warnings(not warnings)
+        return groups
+
+    def __len__(self):
+        return len(self._candidates)
+
+
+def _get_scale(costs):
+    """Gets the smallest integer that turns every cost into a whole number, capped at MAX_RESOLUTION.
+    Costs that still are not whole are rounded up when scaled, so plans never overspend
+    """
+    scale = 1
+    for cost in costs:
+        denominator = Fraction(cost).limit_denominator(MAX_RESOLUTION).denominator
+        if scale % denominator != 0:
+            combined = scale * denominator // math.gcd(scale, denominator)
+            if combined > MAX_RESOLUTION:
+                debug_write("Costs {} need too fine a resolution, rounding them up to multiples of 1/{}".format(costs, scale))
+                break
+            scale = combined
+    return scale
+
+
+def _solve_1d(groups, capacity):
+    """Multiple choice knapsack over one resource. Each group is a list of (cost, value, actions) and at most one option per group is taken
+    """
+    if capacity < 0 or not groups:
+        return 0, []
+    best = [0] * (capacity + 1)
+    choices = []
+    for group in groups:
+        updated = best[:]
+        choice = [-1] * (capacity + 1)
+        for index, (cost, value, _) in enumerate(group):
+            for used in range(capacity, cost - 1, -1):
+                candidate = best[used - cost] + value
+                if candidate > updated[used]:
+                    updated[used] = candidate
+                    choice[used] = index
+        best = updated
+        choices.append(choice)
+
+    actions = []
+    used = capacity
+    for group, choice in zip(reversed(groups), reversed(choices)):
+        index = choice[used]
+        if index >= 0:
+            cost, _, option_actions = group[index]
+            actions.extend(option_actions)
+            used -= cost
+    return best[capacity], actions
+
+
+def _solve_2d(groups, sp_capacity, mp_capacity):
+    """Multiple choice knapsack over SP and MP together. Each group is a list of ((SP cost, MP cost), value, actions)
+    """
+    if sp_capacity < 0 or mp_capacity < 0 or not groups:
+        return 0, []
+    width = mp_capacity + 1
+    size = (sp_capacity + 1) * width
+    best = [0] * size
+    choices = []
+    for group in groups:
+        updated = best[:]
+        choice = [-1] * size
+        for index, ((sp_cost, mp_cost), value, _) in enumerate(group):
+            for sp in range(sp_cost, sp_capacity + 1):
+                row = sp * width
+                previous_row = (sp - sp_cost) * width - mp_cost
+                for mp in range(mp_cost, mp_capacity + 1):
+                    candidate = best[previous_row + mp] + value
+                    if candidate > updated[row + mp]:
+                        updated[row + mp] = candidate
+                        choice[row + mp] = index
+        best = updated
+        choices.append(choice)
+
+    actions = []
+    sp, mp = sp_capacity, mp_capacity
+    for group, choice in zip(reversed(groups), reversed(choices)):
+        index = choice[sp * width + mp]
+        if index >= 0:
+            (sp_cost, mp_cost), _, option_actions = group[index]
+            actions.extend(option_actions)
+            sp -= sp_cost
+            mp -= mp_cost
+    return best[size - 1], actions
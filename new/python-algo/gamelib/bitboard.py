@@ -0,0 +1,182 @@
+"""
+Bitboards are ints with bit y * ARENA_SIZE + x set for each location [x, y] they contain.
+A flood fill grows a bitboard by one step in every direction with four shifts, so finding
+everything reachable from a location takes one round of shifts per step of the longest path
+inside its pocket, instead of visiting each tile in Python.
+"""
+
+ARENA_SIZE = 28
+HALF_ARENA = 14
+
+# The GameMap edge constants
+TOP_RIGHT = 0
+TOP_LEFT = 1
+BOTTOM_LEFT = 2
+BOTTOM_RIGHT = 3
+
+def _build_masks():
+    arena = 0
+    rows = []
+    for y in range(ARENA_SIZE):
+        row_size = y + 1 if y < HALF_ARENA else ARENA_SIZE - y
+        start_x = HALF_ARENA - row_size
+        row = 0
+        for x in range(start_x, start_x + 2 * row_size):
+            row |= 1 << (y * ARENA_SIZE + x)
+        rows.append(row)
+        arena |= row
+    left_column = 0
+    for y in range(ARENA_SIZE):
+        left_column |= 1 << (y * ARENA_SIZE)
+    edges = [0] * 4
+    for num in range(HALF_ARENA):
+        edges[TOP_RIGHT] |= 1 << ((ARENA_SIZE - 1 - num) * ARENA_SIZE + HALF_ARENA + num)
+        edges[TOP_LEFT] |= 1 << ((ARENA_SIZE - 1 - num) * ARENA_SIZE + HALF_ARENA - 1 - num)
+        edges[BOTTOM_LEFT] |= 1 << (num * ARENA_SIZE + HALF_ARENA - 1 - num)
+        edges[BOTTOM_RIGHT] |= 1 << (num * ARENA_SIZE + HALF_ARENA + num)
+    full = (1 << (ARENA_SIZE * ARENA_SIZE)) - 1
+    return arena, rows, full & ~left_column, full & ~(left_column << (ARENA_SIZE - 1)), edges
+
+# ARENA_MASK: every location on the board. ROW_MASKS[y]: the locations in row y.
+# NOT_LEFT_COLUMN and NOT_RIGHT_COLUMN stop shifts from wrapping a row around to the next one.
+ARENA_MASK, ROW_MASKS, NOT_LEFT_COLUMN, NOT_RIGHT_COLUMN, EDGE_MASKS = _build_masks()
+
+def location_mask(locations):
+    """Converts a list of locations into a bitboard
+    """
+    mask = 0
+    for x, y in locations:
+        mask |= 1 << (y * ARENA_SIZE + x)
+    return mask
+
+def mask_bits(mask):
+    """Yields the index, y * ARENA_SIZE + x, of every location in a bitboard, lowest first
+    """
+    while mask:
+        low_bit = mask & -mask
+        yield low_bit.bit_length() - 1
+        mask ^= low_bit
+
+def mask_locations(mask):
+    """Converts a bitboard into a list of locations, ordered by bit index
+    """
+    return [[index % ARENA_SIZE, index // ARENA_SIZE] for index in mask_bits(mask)]
+
+def get_open_mask(game_map):
+    """Gets the bitboard of every location on the board that does not hold a structure
+    """
+    structures, _ = game_map.get_structure_masks()
+    return ARENA_MASK & ~structures
+
+def flood_fill(seeds, open_mask):
+    """Finds every location reachable from the seeds by moving up, down, left and right through open locations
+
+    Args:
+        seeds: A bitboard of starting locations. Seeds that are not open are ignored
+        open_mask: A bitboard of the locations units can move through, usually from get_open_mask
+
+    Returns:
+        A bitboard of the reachable locations, including the open seeds
+
+    """
+    filled = seeds & open_mask
+    while True:
+        grown = (filled | ((filled << 1) & NOT_LEFT_COLUMN) | ((filled >> 1) & NOT_RIGHT_COLUMN)
+                 | (filled << ARENA_SIZE) | (filled >> ARENA_SIZE)) & open_mask
+        if grown == filled:
+            return filled
+        filled = grown
+
+def most_ideal(pocket, target_edge):
+    """Finds the location a unit in a pocket of open space would try to reach, as ShortestPathFinder does
+
+    Args:
+        pocket: A bitboard of connected open locations, from flood_fill
+        target_edge: The edge the unit is heading for, one of the GameMap edge constants
+
+    Returns:
+        A location on the target edge if the pocket touches it, otherwise the best self destruct location. None for an empty pocket
+
+    """
+    return most_ideal_in(pocket, EDGE_MASKS[target_edge], target_edge in [TOP_RIGHT, BOTTOM_RIGHT], target_edge in [TOP_RIGHT, TOP_LEFT])
+
+def most_ideal_in(pocket, target_mask, right, up):
+    """Finds the location a unit in a pocket would try to reach, for any bitboard of target locations
+
+    Idealness ranks tiles by row first, towards the target edge, then by column towards it.
+    Every rank is a single bit, so the best tile is found with the highest or lowest set bit of the right row.
+
+    Args:
+        pocket: A bitboard of connected open locations, from flood_fill
+        target_mask: A bitboard of the locations the unit is heading for, usually part of an edge
+        right: True if the target is on the right side of the arena
+        up: True if the target is on the top half of the arena
+
+    """
+    if not pocket:
+        return None
+    reached = pocket & target_mask
+    if reached:
+        index = (reached & -reached).bit_length() - 1
+    else:
+        if up:
+            row = ROW_MASKS[(pocket.bit_length() - 1) // ARENA_SIZE] & pocket
+        else:
+            row = ROW_MASKS[((pocket & -pocket).bit_length() - 1) // ARENA_SIZE] & pocket
+        if right:
+            index = row.bit_length() - 1
+        else:
+            index = (row & -row).bit_length() - 1
+    return [index % ARENA_SIZE, index // ARENA_SIZE]
+
+def target_edge_for(location):
+    """Gets the edge a mobile unit at a location heads for, as GameState.get_target_edge does
+    """
+    left = location[0] < HALF_ARENA
+    bottom = location[1] < HALF_ARENA
+    if bottom:
+        return TOP_RIGHT if left else TOP_LEFT
+    return BOTTOM_RIGHT if left else BOTTOM_LEFT
+
+def reaches_edge(game_map, location, target_edge=None, open_mask=None):
+    """Checks if a unit at a location can reach its target edge, instead of self destructing
+
+    Args:
+        game_map: The GameMap
+        location: The location of the unit
+        target_edge: The edge it heads for. Found from the location if None
+        open_mask: The bitboard of open locations. Found from game_map if None, pass it in when making many checks
+
+    Returns:
+        True if the pocket around the location touches the target edge
+
+    """
+    if target_edge is None:
+        target_edge = target_edge_for(location)
+    if open_mask is None:
+        open_mask = get_open_mask(game_map)
+    pocket = flood_fill(1 << (location[1] * ARENA_SIZE + location[0]), open_mask)
+    return pocket & EDGE_MASKS[target_edge] != 0
+
+def get_scoring_spawns(game_map, player_index):
+    """Finds the edge locations a player can deploy on that have a path to the opposite edge
+
+    Args:
+        game_map: The GameMap
+        player_index: The player deploying, 0 for you 1 for the enemy
+
+    Returns:
+        A bitboard of the deploy locations whose units would reach their target edge
+
+    """
+    open_mask = get_open_mask(game_map)
+    if player_index == 0:
+        sides = [(BOTTOM_LEFT, TOP_RIGHT), (BOTTOM_RIGHT, TOP_LEFT)]
+    else:
+        sides = [(TOP_LEFT, BOTTOM_RIGHT), (TOP_RIGHT, BOTTOM_LEFT)]
+    scoring = 0
+    for spawn_edge, target_edge in sides:
+        # Flooding back from the target edge finds every location that can reach it in one fill
+        reachable = flood_fill(EDGE_MASKS[target_edge], open_mask)
+        scoring |= reachable & EDGE_MASKS[spawn_edge] & open_mask
+    return scoring
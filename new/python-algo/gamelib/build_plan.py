@@ -0,0 +1,131 @@
+from .util import debug_write
+from .bitboard import ARENA_SIZE, mask_bits
+
+
+class BuildPlan:
+    """A declarative defense layout that only submits what is missing
+
+    Describe the structures you want once, usually in on_game_start, then call execute every turn.
+    The plan is compared against bitboards of the structures already on the board, so only the missing
+    spawns and upgrades are attempted, highest priority first, and the work done each turn grows with
+    the number of changes rather than with the size of the plan.
+
+    Example::
+
+        # In on_game_start
+        self.plan = gamelib.BuildPlan()
+        self.plan.add(TURRET, [[3, 12], [24, 12]], priority=2)
+        self.plan.add(TURRET, [[3, 12], [24, 12]], upgrade=True, priority=1)
+        self.plan.add(WALL, [[3, 13], [4, 13], [23, 13], [24, 13]])
+        # In on_turn
+        self.plan.execute(game_state)
+
+    """
+    def __init__(self):
+        self._entries = []
+        self._compiled = False
+
+    def add(self, unit_type, locations, upgrade=False, priority=0):
+        """Adds structures to the plan
+
+        Args:
+            unit_type: The type of structure, WALL, TURRET, etc.
+            locations: A single location or list of locations
+            upgrade: If True, the structures should also be upgraded
+            priority: Entries with a higher priority are built first. Entries with the same priority are built in the order they were added
+
+        """
+        if type(locations[0]) == int:
+            locations = [locations]
+        for location in locations:
+            x, y = map(int, location)
+            self._entries.append((unit_type, x, y, upgrade, priority))
+        self._compiled = False
+
+    def compile(self):
+        """Orders the entries and builds the plan's bitboards. Called automatically by execute if the plan changed
+        """
+        order = sorted(range(len(self._entries)), key=lambda index: (-self._entries[index][4], index))
+        self._spawn_mask = 0
+        self._upgrade_mask = 0
+        self._spawns = {}
+        self._upgrades = {}
+        for rank, index in enumerate(order):
+            unit_type, x, y, upgrade, _ = self._entries[index]
+            bit = y * ARENA_SIZE + x
+            if bit in self._spawns:
+                if self._spawns[bit][1] != unit_type:
+                    debug_write("Build plan wants both {} and {} at {}, keeping {}".format(self._spawns[bit][1], unit_type, [x, y], self._spawns[bit][1]))
+            else:
+                self._spawns[bit] = (rank, unit_type, [x, y])
+                self._spawn_mask |= 1 << bit
+            if upgrade and bit not in self._upgrades:
+                self._upgrades[bit] = (rank, [x, y])
+                self._upgrade_mask |= 1 << bit
+        self._compiled = True
+
+    def get_missing(self, game_state, structures=None, upgraded=None):
+        """Gets the parts of the plan that are not on the board yet
+
+        Args:
+            game_state: The current GameState
+            structures: A bitboard of the tiles holding a structure, as returned by GameMap.get_structure_masks. Read from the map if None
+            upgraded: A bitboard of the tiles holding an upgraded structure, as returned by GameMap.get_upgraded_mask. Read from the map if None
+
+        Returns:
+            A list of (unit_type, location, upgrade) in the order they would be built. upgrade is False for spawns and True for upgrades
+
+        """
+        if not self._compiled:
+            self.compile()
+        if structures is None:
+            structures, _ = game_state.game_map.get_structure_masks()
+        if upgraded is None:
+            upgraded = game_state.game_map.get_upgraded_mask()
+        missing = self._spawn_mask & ~structures
+        not_upgraded = self._upgrade_mask & ~upgraded
+
+        actions = []
+        for bit in mask_bits(missing):
+            rank, unit_type, location = self._spawns[bit]
+            actions.append((rank, 0, unit_type, location))
+        for bit in mask_bits(not_upgraded):
+            rank, location = self._upgrades[bit]
+            actions.append((rank, 1, self._spawns[bit][1], location))
+        actions.sort(key=lambda action: (action[0], action[1]))
+        return [(unit_type, location, kind == 1) for _, kind, unit_type, location in actions]
+
+    def execute(self, game_state, budget=None, strict=False):
+        """Spawns and upgrades the missing parts of the plan, highest priority first
+
+        Args:
+            game_state: The current GameState
+            budget: The most SP to spend, all of our SP by default
+            strict: If True, stop at the first item that cannot be afforded instead of skipping it
+
+        Returns:
+            The number of spawns and upgrades made
+
+        """
+        if budget is None:
+            budget = game_state.get_resource(game_state.SP)
+        made = 0
+        for unit_type, location, upgrade in self.get_missing(game_state):
+            cost = game_state.type_cost(unit_type, upgrade)[game_state.SP]
+            if cost > budget:
+                if strict:
+                    break
+                continue
+            if upgrade:
+                done = game_state.attempt_upgrade(location)
+            else:
+                done = game_state.attempt_spawn(unit_type, location)
+            if done:
+                budget -= cost
+                made += done
+            elif strict:
+                break
+        return made
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,189 @@
+from .bitboard import ARENA_SIZE
+
+
+class StructureCensus:
+    """Counts and locations of every structure on the board, for both players
+
+    GameState fills in game_state.census while it parses the turn, so questions like
+    "how many enemy turrets are in columns 7 to 13 of rows 14 to 19" need no scan of the map.
+    Every query can be narrowed by unit type and by upgrade state. Region queries use 2D prefix
+    sums that are built the first time a combination of filters is used.
+
+    The census describes the board at the start of the turn. It is not changed by attempt_spawn,
+    attempt_upgrade or by editing the GameMap.
+
+    Example::
+
+        turrets = game_state.census.count_in_region(1, range(x, x + 7), range(14, 20), TURRET)
+
+    """
+    def __init__(self):
+        self._tiles = {}
+        self._counts = {}
+        self._locations = {}
+        self._rows = {}
+        self._columns = {}
+        self._prefix_sums = {}
+        self._pending_removal = [set(), set()]
+
+    def add(self, unit):
+        """Adds a structure to the census. Mobile units are ignored
+        """
+        if not unit.stationary:
+            return
+        entry = (unit.player_index, unit.unit_type, unit.upgraded)
+        self._tiles[(unit.x, unit.y)] = entry
+        self._apply(unit.x, unit.y, entry, 1)
+
+    def mark_upgraded(self, location):
+        """Records that the structure at location is upgraded
+        """
+        x, y = location
+        entry = self._tiles.get((x, y))
+        if entry is None or entry[2]:
+            return
+        upgraded = (entry[0], entry[1], True)
+        self._tiles[(x, y)] = upgraded
+        self._apply(x, y, entry, -1)
+        self._apply(x, y, upgraded, 1)
+
+    def mark_pending_removal(self, location):
+        """Records that the structure at location is marked for removal by its owner
+        """
+        x, y = location
+        entry = self._tiles.get((x, y))
+        if entry is not None:
+            self._pending_removal[entry[0]].add((x, y))
+
+    def _apply(self, x, y, entry, delta):
+        player_index, unit_type, upgraded = entry
+        for key in [(player_index, unit_type, upgraded), (player_index, None, upgraded),
+                    (player_index, unit_type, None), (player_index, None, None)]:
+            self._counts[key] = self._counts.get(key, 0) + delta
+            locations = self._locations.setdefault(key, set())
+            if delta > 0:
+                locations.add((x, y))
+            else:
+                locations.discard((x, y))
+            if key not in self._rows:
+                self._rows[key] = [0] * ARENA_SIZE
+                self._columns[key] = [0] * ARENA_SIZE
+            self._rows[key][y] += delta
+            self._columns[key][x] += delta
+            self._prefix_sums.pop(key, None)
+
+    def count(self, player_index, unit_type=None, upgraded=None):
+        """Counts a player's structures
+
+        Args:
+            player_index: The player whose structures are counted, 0 for you 1 for the enemy
+            unit_type: Only count this type of structure. Counts every type if None
+            upgraded: True or False to only count upgraded or non upgraded structures. Counts both if None
+
+        Returns:
+            The number of matching structures
+
+        """
+        return self._counts.get((player_index, unit_type, upgraded), 0)
+
+    def get_locations(self, player_index, unit_type=None, upgraded=None):
+        """Gets the locations of a player's structures, filtered as in count
+
+        Returns:
+            A set of (x, y) tuples. Do not modify it
+
+        """
+        return self._locations.get((player_index, unit_type, upgraded), frozenset())
+
+    def get_pending_removal(self, player_index):
+        """Gets the locations of a player's structures that are marked for removal
+
+        Returns:
+            A set of (x, y) tuples. Do not modify it
+
+        """
+        return self._pending_removal[player_index]
+
+    def count_in_row(self, player_index, y, unit_type=None, upgraded=None):
+        """Counts a player's structures in row y, filtered as in count
+        """
+        row = self._rows.get((player_index, unit_type, upgraded))
+        return row[y] if row is not None else 0
+
+    def count_in_column(self, player_index, x, unit_type=None, upgraded=None):
+        """Counts a player's structures in column x, filtered as in count
+        """
+        column = self._columns.get((player_index, unit_type, upgraded))
+        return column[x] if column is not None else 0
+
+    def count_in_region(self, player_index, x_values=None, y_values=None, unit_type=None, upgraded=None):
+        """Counts a player's structures inside a rectangle, filtered as in count
+
+        Args:
+            player_index: The player whose structures are counted, 0 for you 1 for the enemy
+            x_values: The columns to count, as a range or a list of x coordinates. All columns if None
+            y_values: The rows to count, as a range or a list of y coordinates. All rows if None
+            unit_type: Only count this type of structure
+            upgraded: True or False to only count upgraded or non upgraded structures
+
+        Returns:
+            The number of matching structures in the region. This takes constant time when x_values
+            and y_values are contiguous, and falls back to checking each matching structure otherwise.
+
+        """
+        key = (player_index, unit_type, upgraded)
+        if key not in self._counts:
+            return 0
+        x_bounds = _get_bounds(x_values)
+        y_bounds = _get_bounds(y_values)
+        if x_bounds is None or y_bounds is None:
+            xs = set(x_values) if x_values is not None else None
+            ys = set(y_values) if y_values is not None else None
+            return sum(1 for x, y in self._locations[key] if (xs is None or x in xs) and (ys is None or y in ys))
+
+        x_start, x_stop = x_bounds
+        y_start, y_stop = y_bounds
+        if x_start >= x_stop or y_start >= y_stop:
+            return 0
+        prefix = self._prefix_sums.get(key)
+        if prefix is None:
+            prefix = self._build_prefix_sums(key)
+        return prefix[x_stop][y_stop] - prefix[x_start][y_stop] - prefix[x_stop][y_start] + prefix[x_start][y_start]
+
+    def _build_prefix_sums(self, key):
+        """prefix[i][j] is the number of structures with x < i and y < j
+        """
+        grid = [[0] * ARENA_SIZE for _ in range(ARENA_SIZE)]
+        for x, y in self._locations[key]:
+            grid[x][y] = 1
+        prefix = [[0] * (ARENA_SIZE + 1) for _ in range(ARENA_SIZE + 1)]
+        for i in range(ARENA_SIZE):
+            running = 0
+            column = grid[i]
+            previous = prefix[i]
+            current = prefix[i + 1]
+            for j in range(ARENA_SIZE):
+                running += column[j]
+                current[j + 1] = previous[j + 1] + running
+        self._prefix_sums[key] = prefix
+        return prefix
+
+
+def _get_bounds(values):
+    """Converts a range or list of contiguous coordinates into half open bounds clamped to the arena.
+    Returns None if the coordinates are not contiguous
+    """
+    if values is None:
+        return 0, ARENA_SIZE
+    if isinstance(values, range):
+        if values.step != 1:
+            return None
+        start, stop = values.start, values.stop
+    else:
+        values = sorted(set(values))
+        if not values:
+            return 0, 0
+        if values[-1] - values[0] + 1 != len(values):
+            return None
+        start, stop = values[0], values[-1] + 1
+    return max(0, start), min(ARENA_SIZE, stop)
@@ -0,0 +1,172 @@
+import heapq
+
+from .prediction import AttackPredictor
+from .unit import GameUnit
+from .bitboard import ARENA_SIZE, mask_bits
+
+
+class CoverageOptimizer:
+    """Chooses turret locations that cover as much of the enemy's predicted paths as possible
+
+    Every tile of every predicted enemy path is weighted by how dangerous the paths through it are. The
+    optimizer then solves the weighted maximum coverage problem under an SP budget: pick the turret
+    locations whose attack ranges cover the most path weight, optionally requiring each tile to be
+    covered by several turrets. Greedy selection is within a factor of 1 - 1/e of the best answer,
+    and is evaluated lazily, so only a few candidates are rescored after each pick.
+
+    The tiles in range of each location are precomputed as bitboards, indexed by y * ARENA_SIZE + x,
+    once per attack range, so a solve only does bitwise operations on them.
+
+    Example::
+
+        # In on_game_start
+        self.coverage = gamelib.CoverageOptimizer(config)
+        # In on_turn
+        for location in self.coverage.solve(game_state, budget=6):
+            game_state.attempt_spawn(TURRET, location)
+
+    """
+    def __init__(self, config, predictor=None):
+        """Sets up the optimizer
+
+        Args:
+            config: The game configuration
+            predictor: The AttackPredictor used to predict the enemy paths. A new one is made if None
+
+        """
+        self.config = config
+        self.predictor = predictor if predictor is not None else AttackPredictor(config)
+        self._coverage_masks = {}
+
+    def get_coverage_masks(self, radius):
+        """Gets the bitboard of tiles within radius of every location
+
+        Args:
+            radius: The attack range
+
+        Returns:
+            A list where entry y * ARENA_SIZE + x is the bitboard of tiles in range of [x, y]
+
+        """
+        masks = self._coverage_masks.get(radius)
+        if masks is None:
+            size = ARENA_SIZE
+            offsets = self.predictor._get_range_offsets(radius)
+            masks = [0] * (size * size)
+            for y in range(size):
+                for x in range(size):
+                    mask = 0
+                    for dx, dy in offsets:
+                        tx, ty = x + dx, y + dy
+                        if 0 <= tx < size and 0 <= ty < size:
+                            mask |= 1 << (ty * size + tx)
+                    masks[y * size + x] = mask
+            self._coverage_masks[radius] = masks
+        return masks
+
+    def get_path_weights(self, game_state, predictions=None):
+        """Weights each tile by the predicted enemy attacks that pass through it
+
+        Each path adds its breach damage plus one to the tiles on it, so paths that would score count
+        the most, and paths that would not still count a little.
+
+        Args:
+            game_state: The current GameState
+            predictions: A list of AttackPrediction. The predictor's predictions for this turn if None
+
+        Returns:
+            A dict mapping tile indexes to their weight
+
+        """
+        if predictions is None:
+            predictions = self.predictor.predict(game_state)
+        size = game_state.ARENA_SIZE
+        weights = {}
+        for prediction in predictions:
+            weight = prediction.breach_damage + 1
+            for x, y in prediction.path:
+                index = y * size + x
+                weights[index] = weights.get(index, 0) + weight
+        return weights
+
+    def solve(self, game_state, budget=None, unit_type=None, upgrade=False, redundancy=1, candidates=None, predictions=None):
+        """Chooses turret locations under a budget
+
+        Args:
+            game_state: The current GameState
+            budget: The most SP to spend, all of our SP by default
+            unit_type: The turret type, TURRET by default
+            upgrade: If True, plan upgraded turrets, using their range and the cost of spawning and upgrading them
+            redundancy: The number of turrets that should cover each tile. Coverage beyond this is worth nothing
+            candidates: The locations to consider. By default, every empty tile on our half that no predicted path goes through
+            predictions: A list of AttackPrediction to cover. The predictor's predictions for this turn if None
+
+        Returns:
+            A list of locations, most valuable first
+
+        """
+        if unit_type is None:
+            unit_type = self.config["unitInformation"][2]["shorthand"]
+        if budget is None:
+            budget = game_state.get_resource(game_state.SP)
+        if predictions is None:
+            predictions = self.predictor.predict(game_state)
+        turret = GameUnit(unit_type, self.config, 0)
+        cost = game_state.type_cost(unit_type)[game_state.SP]
+        if upgrade:
+            turret.upgrade()
+            cost += game_state.type_cost(unit_type, True)[game_state.SP]
+        if turret.damage_i <= 0 or turret.attackRange <= 0:
+            return []
+
+        size = game_state.ARENA_SIZE
+        weights = self.get_path_weights(game_state, predictions)
+        masks = self.get_coverage_masks(turret.attackRange)
+        if candidates is None:
+            candidates = [[x, y] for y in range(game_state.HALF_ARENA) for x in range(size)
+                          if game_state.game_map.in_arena_bounds([x, y]) and y * size + x not in weights
+                          and not game_state.contains_stationary_unit([x, y])]
+
+        # levels[i] holds the tiles covered by more than i turrets, counting the turrets we already have
+        levels = [0] * redundancy
+        for unit in game_state.game_map.get_structures(0).values():
+            if unit.damage_i > 0 and unit.attackRange > 0:
+                self._add_coverage(levels, self.get_coverage_masks(unit.attackRange)[unit.y * size + unit.x])
+
+        path_mask = 0
+        for index in weights:
+            path_mask |= 1 << index
+
+        # Lazy greedy: a stale gain is an upper bound on the true gain, since coverage only has diminishing returns
+        heap = []
+        for order, (x, y) in enumerate(candidates):
+            mask = masks[y * size + x] & path_mask
+            gain = _weigh(mask & ~levels[-1], weights)
+            if gain > 0:
+                heap.append((-gain, order, [x, y], mask))
+        heapq.heapify(heap)
+
+        chosen = []
+        while heap and budget >= cost:
+            _, order, location, mask = heapq.heappop(heap)
+            gain = _weigh(mask & ~levels[-1], weights)
+            if gain <= 0:
+                continue
+            if heap and gain < -heap[0][0]:
+                heapq.heappush(heap, (-gain, order, location, mask))
+                continue
+            chosen.append(location)
+            budget -= cost
+            self._add_coverage(levels, mask)
+        return chosen
+
+    def _add_coverage(self, levels, mask):
+        for level in range(len(levels) - 1, 0, -1):
+            levels[level] |= levels[level - 1] & mask
+        levels[0] |= mask
+
+
+def _weigh(mask, weights):
+    """Sums the weights of the tiles set in a bitboard
+    """
+    return sum(weights.get(index, 0) for index in mask_bits(mask))
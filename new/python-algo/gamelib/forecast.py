@@ -0,0 +1,162 @@
+import math
+
+SP = 0
+MP = 1
+MP_RESOLUTION = 10
+
+
+class ResourceForecaster:
+    """Precomputed SP and MP schedules for both players, assuming they save every turn
+
+    The schedules are built once per turn from the resources section of the config and from the structures
+    that generate resources, as counted by game_state.census. Each turn MP decays by bitDecayPerRound, then
+    bitsPerRound plus bitGrowthRate for every turnIntervalForBitSchedule turns is added, as in
+    GameState.project_future_MP. SP grows by coresPerRound. Structures add their generatesResource1 SP and
+    generatesResource2 MP every turn, using the values from their upgrade when they are upgraded.
+    SP gained by damaging the enemy cannot be predicted and is not included.
+
+    After construction, every query is a list lookup or a little arithmetic.
+
+    Example::
+
+        forecaster = gamelib.ResourceForecaster(game_state)
+        if forecaster.turns_until_affordable(DEMOLISHER, 5) == 1:
+            # Save this turn and attack with 5 demolishers next turn
+            pass
+
+    """
+    def __init__(self, game_state, horizon=100):
+        """Builds the schedules
+
+        Args:
+            game_state: The current GameState
+            horizon: The number of turns ahead to forecast
+
+        """
+        self.game_state = game_state
+        self.horizon = horizon
+        resources = game_state.config["resources"]
+        decay = 1 - resources["bitDecayPerRound"]
+        bits_per_round = resources["bitsPerRound"]
+        growth_rate = resources["bitGrowthRate"]
+        interval = resources["turnIntervalForBitSchedule"]
+        cores_per_round = resources.get("coresPerRound", 0)
+
+        self._income = []
+        self._MP = []
+        self._MP_reached = []
+        for player_index in range(2):
+            SP_generated, MP_generated = self._get_generated_resources(game_state, player_index)
+            self._income.append([cores_per_round + SP_generated, MP_generated])
+
+            current_MP = game_state.get_resource(MP, player_index)
+            schedule = [current_MP]
+            for turn in range(game_state.turn_number + 1, game_state.turn_number + horizon + 1):
+                current_MP = round(current_MP * decay + bits_per_round + growth_rate * (turn // interval) + MP_generated, 1)
+                schedule.append(current_MP)
+            self._MP.append(schedule)
+
+            # reached[i] is the first turn on which we have at least i / MP_RESOLUTION MP
+            reached = []
+            for turns, value in enumerate(schedule):
+                threshold = int(math.floor(value * MP_RESOLUTION + 1e-9))
+                while len(reached) <= threshold:
+                    reached.append(turns)
+            self._MP_reached.append(reached)
+
+    def _get_generated_resources(self, game_state, player_index):
+        unit_information = game_state.config["unitInformation"]
+        generated = [0, 0]
+        for unit_def in unit_information:
+            if unit_def.get("unitCategory") != 0 or "shorthand" not in unit_def:
+                continue
+            upgrade = unit_def.get("upgrade", {})
+            for upgraded in [False, True]:
+                count = game_state.census.count(player_index, unit_def["shorthand"], upgraded)
+                if count == 0:
+                    continue
+                for resource, key in [(SP, "generatesResource1"), (MP, "generatesResource2")]:
+                    amount = upgrade.get(key, unit_def.get(key, 0)) if upgraded else unit_def.get(key, 0)
+                    generated[resource] += count * amount
+        return generated
+
+    def get_income(self, resource_type, player_index=0):
+        """Gets the resources a player gains every turn, before MP decay and MP growth
+
+        Args:
+            resource_type: SP or MP
+            player_index: The player, 0 for you 1 for the enemy
+
+        """
+        return self._income[player_index][resource_type]
+
+    def resource_after(self, resource_type, turns, player_index=0):
+        """Gets the resources a player will have after saving for a number of turns
+
+        Args:
+            resource_type: SP or MP
+            turns: The number of turns to save for, 0 for the current amount
+            player_index: The player, 0 for you 1 for the enemy
+
+        Returns:
+            The amount of the resource they will have
+
+        """
+        if turns < 0 or turns > self.horizon:
+            self.game_state.warn("Invalid number of turns ({}). Turns should be between 0 and {}".format(turns, self.horizon))
+            turns = max(0, min(turns, self.horizon))
+        if resource_type == MP:
+            return self._MP[player_index][turns]
+        return self.game_state.get_resource(SP, player_index) + turns * self._income[player_index][SP]
+
+    def turns_until(self, resource_type, amount, player_index=0):
+        """Gets how many turns a player needs to save before they have an amount of a resource
+
+        Args:
+            resource_type: SP or MP
+            amount: The amount they need
+            player_index: The player, 0 for you 1 for the enemy
+
+        Returns:
+            The number of turns, 0 if they already have enough, or None if they will not have enough within the horizon
+
+        """
+        if resource_type == MP:
+            if self._MP[player_index][0] >= amount:
+                return 0
+            threshold = max(0, int(math.ceil(amount * MP_RESOLUTION - 1e-9)))
+            reached = self._MP_reached[player_index]
+            return reached[threshold] if threshold < len(reached) else None
+
+        missing = amount - self.game_state.get_resource(SP, player_index)
+        if missing <= 0:
+            return 0
+        income = self._income[player_index][SP]
+        if income <= 0:
+            return None
+        turns = int(math.ceil(missing / income - 1e-9))
+        return turns if turns <= self.horizon else None
+
+    def turns_until_affordable(self, unit_type, num=1, player_index=0, upgrade=False):
+        """Gets how many turns a player needs to save before they can afford some units
+
+        Args:
+            unit_type: The type of unit
+            num: The number of units
+            player_index: The player, 0 for you 1 for the enemy
+            upgrade: If True, use the cost of upgrading the unit
+
+        Returns:
+            The number of turns, 0 if they can afford them now, or None if they cannot within the horizon
+
+        """
+        costs = self.game_state.type_cost(unit_type, upgrade)
+        turns = 0
+        for resource_type in [SP, MP]:
+            if costs[resource_type] <= 0:
+                continue
+            needed = self.turns_until(resource_type, costs[resource_type] * num, player_index)
+            if needed is None:
+                return None
+            turns = max(turns, needed)
+        return turns
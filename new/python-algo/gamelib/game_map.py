@@ -1,6 +1,8 @@
 import math
+import copy
 from .unit import GameUnit
 from .util import debug_write
+from .transposition import tile_hash, zobrist_key
 
 class GameMap:
     """Holds data about the current game map and provides functions
@@ -18,6 +20,7 @@ class GameMap:
         * TOP_LEFT (int): A constant that represents the top left edge
         * BOTTOM_LEFT (int): Hidden challenge! Can you guess what this constant represents???
         * BOTTOM_RIGHT (int): A constant that represents the bottom right edge
+        * zobrist_hash (int): A hash of the units on the board, kept up to date by add_unit, remove_unit and upgrade_unit
 
     """
     def __init__(self, config):
@@ -37,6 +40,10 @@ class GameMap:
         self.BOTTOM_RIGHT = 3
         self.__map = self.__empty_grid()
         self.__start = [13,0]
+        self.zobrist_hash = 0
+        self._journal = None
+        self._structures = [{}, {}]
+        self._stacks = {}
     
     def __getitem__(self, location):
         if len(location) == 2 and self.in_arena_bounds(location):
@@ -46,7 +53,12 @@ class GameMap:
 
     def __setitem__(self, location, val):
         if type(location) == tuple and len(location) == 2 and self.in_arena_bounds(location):
-            self.__map[location[0]][location[1]] = val
+            x, y = location
+            self._record_tile(x, y)
+            self.zobrist_hash ^= tile_hash(self.__map[x][y], x, y) ^ tile_hash(val, x, y)
+            self._track_structures(self.__map[x][y], val, x, y)
+            self._stacks.pop((x, y), None)
+            self.__map[x][y] = val
             return
         self._invalid_coordinates(location)
 
@@ -166,12 +178,72 @@ class GameMap:
         if player_index < 0 or player_index > 1:
             self.warn("Player index {} is invalid. Player index should be 0 or 1.".format(player_index))
 
-        x, y = location
         new_unit = GameUnit(unit_type, self.config, player_index, None, location[0], location[1])
-        if not new_unit.stationary:
-            self.__map[x][y].append(new_unit)
+        self._place_unit(new_unit)
+
+    def _place_unit(self, unit, count=1):
+        """Puts an existing GameUnit on the map at its own location, keeping zobrist_hash in sync.
+        For mobile units, count - 1 copies of the unit are added along with it, and only their
+        own keys are hashed in, so stacking units costs the same however many are on the tile.
+        """
+        x, y = unit.x, unit.y
+        self._record_tile(x, y)
+        tile = self.__map[x][y]
+        if not unit.stationary:
+            stack = self._get_stack(x, y)
+            kind = (unit.type_index, unit.player_index)
+            stacked = stack.get(kind, 0)
+            for ordinal in range(stacked, stacked + count):
+                self.zobrist_hash ^= zobrist_key(x, y, unit.type_index, unit.player_index, ordinal)
+            stack[kind] = stacked + count
+            tile.append(unit)
+            for _ in range(count - 1):
+                tile.append(copy.copy(unit))
         else:
-            self.__map[x][y] = [new_unit]
+            self._track_structures(tile, [unit], x, y)
+            self._stacks.pop((x, y), None)
+            self.zobrist_hash ^= tile_hash(tile, x, y) ^ tile_hash([unit], x, y)
+            self.__map[x][y] = [unit]
+
+    def _get_stack(self, x, y):
+        """Gets how many mobile units of each (type index, player index) are on a tile, counting them
+        the first time they are needed. Anything that replaces the tile drops its counts.
+        """
+        stack = self._stacks.get((x, y))
+        if stack is None:
+            stack = {}
+            for unit in self.__map[x][y]:
+                if not unit.stationary:
+                    kind = (unit.type_index, unit.player_index)
+                    stack[kind] = stack.get(kind, 0) + 1
+            self._stacks[(x, y)] = stack
+        return stack
+
+    def upgrade_unit(self, location):
+        """Upgrade the structure at the given location.
+
+        Args:
+            location: The location of the structure to upgrade
+
+        Returns:
+            The upgraded GameUnit, or None if there is no structure at the location
+
+        Like add_unit, this function only changes the data stored in GameMap.
+        """
+        if not self.in_arena_bounds(location):
+            self._invalid_coordinates(location)
+            return
+
+        x, y = location
+        tile = self.__map[x][y]
+        for unit in tile:
+            if unit.stationary:
+                if self._journal is not None:
+                    self._journal.append((x, y, None, (unit, dict(unit.__dict__)), self.zobrist_hash))
+                old_hash = tile_hash(tile, x, y)
+                unit.upgrade()
+                self.zobrist_hash ^= old_hash ^ tile_hash(tile, x, y)
+                return unit
 
     def remove_unit(self, location):
         """Remove all units on the map in the given location.
@@ -186,8 +258,87 @@ class GameMap:
             self._invalid_coordinates(location)
         
         x, y = location
+        self._record_tile(x, y)
+        self.zobrist_hash ^= tile_hash(self.__map[x][y], x, y)
+        self._track_structures(self.__map[x][y], [], x, y)
+        self._stacks.pop((x, y), None)
         self.__map[x][y] = []
 
+    def _track_structures(self, old_tile, new_tile, x, y):
+        """Keeps the per player structure registry in sync when a tile's contents are replaced
+        """
+        for unit in old_tile:
+            if unit.stationary and unit.player_index in (0, 1):
+                self._structures[unit.player_index].pop((x, y), None)
+        for unit in new_tile:
+            if unit.stationary and unit.player_index in (0, 1):
+                self._structures[unit.player_index][(x, y)] = unit
+
+    def get_structures(self, player_index):
+        """Gets the live structures controlled by a player
+
+        The registry is kept up to date by add_unit, remove_unit, setting tiles and rolling back transactions.
+
+        Args:
+            player_index: The player whose structures to get, 0 for you 1 for the enemy
+
+        Returns:
+            A dict mapping (x, y) to the GameUnit of the structure there. Do not modify it
+
+        """
+        return self._structures[player_index]
+
+    def _record_tile(self, x, y):
+        """Saves the contents of a tile to the undo journal before it is changed, if a transaction is open
+        """
+        if self._journal is not None:
+            self._journal.append((x, y, list(self.__map[x][y]), None, self.zobrist_hash))
+
+    def _undo(self, mark):
+        """Reverts every journaled change made after the journal had mark entries
+        """
+        journal = self._journal
+        while len(journal) > mark:
+            x, y, old_tile, unit_state, old_hash = journal.pop()
+            if unit_state is not None:
+                unit, attributes = unit_state
+                unit.__dict__.update(attributes)
+            else:
+                self._track_structures(self.__map[x][y], old_tile, x, y)
+                self._stacks.pop((x, y), None)
+                self.__map[x][y] = old_tile
+            self.zobrist_hash = old_hash
+
+    def get_structure_masks(self):
+        """Gets bitboards of the tiles holding a structure
+
+        Bit y * ARENA_SIZE + x is set if there is a structure at [x, y]. The masks are built from the
+        structure registry (see get_structures), so only tiles holding a structure are visited.
+
+        Returns:
+            A tuple (structures, mirrored) where mirrored is the same board reflected left to right, so [x, y] maps to [ARENA_SIZE - 1 - x, y]
+
+        """
+        structures = 0
+        mirrored = 0
+        size = self.ARENA_SIZE
+        for player_structures in self._structures:
+            for x, y in player_structures:
+                structures |= 1 << (y * size + x)
+                mirrored |= 1 << (y * size + size - 1 - x)
+        return structures, mirrored
+
+    def get_upgraded_mask(self):
+        """Gets a bitboard of the tiles holding an upgraded structure, using the same layout as get_structure_masks
+        """
+        upgraded = 0
+        size = self.ARENA_SIZE
+        for player_structures in self._structures:
+            for (x, y), unit in player_structures.items():
+                if unit.upgraded:
+                    upgraded |= 1 << (y * size + x)
+        return upgraded
+
     def get_locations_in_range(self, location, radius):
         """Gets locations in a circular area around a location
 
@@ -6,6 +6,7 @@ from .navigation import ShortestPathFinder
 from .util import send_command, debug_write
 from .unit import GameUnit
 from .game_map import GameMap
+from .census import StructureCensus
 
 def is_stationary(unit_type):
     """
@@ -17,6 +18,62 @@ def is_stationary(unit_type):
     """
     return unit_type in STRUCTURE_TYPES
 
+class Transaction:
+    """A savepoint on a GameState, created with game_state.transaction()
+
+    Changes made to resources, the game map and the build/deploy stacks after the
+    savepoint are kept when the with block exits normally, and undone if it exits with
+    an exception or if rollback() is called. Transactions can be nested.
+
+    Example::
+
+        with game_state.transaction() as t:
+            game_state.attempt_spawn(TURRET, [13, 10])
+            score = evaluate(game_state)
+            t.rollback()
+
+    """
+    def __init__(self, game_state):
+        self.game_state = game_state
+        self._outermost = False
+        self._mark = None
+
+    def __enter__(self):
+        game_state = self.game_state
+        game_map = game_state.game_map
+        if game_map._journal is None:
+            game_map._journal = []
+            self._outermost = True
+        self._mark = len(game_map._journal)
+        self._build_length = len(game_state._build_stack)
+        self._deploy_length = len(game_state._deploy_stack)
+        self._resources = [dict(resources) for resources in game_state._player_resources]
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.rollback()
+        if self._outermost:
+            self.game_state.game_map._journal = None
+        return False
+
+    def rollback(self):
+        """Undo every change made since this transaction was entered.
+        The transaction stays open, so it can be rolled back again after further changes,
+        until the outermost with block exits.
+        """
+        if self._mark is None:
+            self.game_state.warn("Attempted to roll back a transaction that was never entered")
+            return
+        if self.game_state.game_map._journal is None:
+            self.game_state.warn("Attempted to roll back a transaction that has already been closed")
+            return
+        game_state = self.game_state
+        game_state.game_map._undo(self._mark)
+        del game_state._build_stack[self._build_length:]
+        del game_state._deploy_stack[self._deploy_length:]
+        game_state._player_resources = [dict(resources) for resources in self._resources]
+
 class GameState:
     """Represents the entire gamestate for a given turn
     Provides methods related to resources and unit deployment
@@ -44,6 +101,7 @@ class GameState:
         * my_time (int): The time you took to submit your previous turn
         * enemy_health (int): Your opponents current remaining health
         * enemy_time (int): Your opponents current remaining time
+        * census (:obj: StructureCensus): Counts and locations of the structures on the board at the start of the turn
 
     """
 
@@ -93,6 +151,7 @@ class GameState:
         self._shortest_path_finder = ShortestPathFinder()
         self._build_stack = []
         self._deploy_stack = []
+        self.census = StructureCensus()
         self._player_resources = [
                 {'SP': 0, 'MP': 0},  # player 0, which is you
                 {'SP': 0, 'MP': 0}]  # player 1, which is the opponent
@@ -142,12 +201,15 @@ class GameState:
                     # Quick fix will deploy engine fix soon
                     if self.contains_stationary_unit([x,y]):
                         self.game_map[x,y][0].pending_removal = True
+                        self.census.mark_pending_removal([x,y])
                 elif unit_type == UPGRADE:
                     if self.contains_stationary_unit([x,y]):
-                        self.game_map[x,y][0].upgrade()
+                        self.game_map.upgrade_unit([x,y])
+                        self.census.mark_upgraded([x,y])
                 else:
                     unit = GameUnit(unit_type, self.config, player_number, hp, x, y)
-                    self.game_map[x,y].append(unit)
+                    self.game_map._place_unit(unit)
+                    self.census.add(unit)
 
     def __resource_required(self, unit_type):
         return self.SP if is_stationary(unit_type) else self.MP
@@ -171,12 +233,35 @@ class GameState:
     def _invalid_unit(self, unit):
         self.warn("Invalid unit {}".format(unit))
 
+    def transaction(self):
+        """Creates a savepoint that can be used to try out moves and undo them in place
+
+        Returns:
+            A Transaction to be used in a with statement. Call its rollback() function to undo the moves made inside it.
+
+        """
+        return Transaction(self)
+
+    def enemy_view(self):
+        """Gets the game state from your opponent's perspective, rotated so that they are player 0 at the bottom of the map.
+        Nothing is copied, so this is cheap to call every turn.
+
+        Returns:
+            A GameStateView supporting the query functions of GameState
+
+        """
+        from .perspective import GameStateView
+        return GameStateView(self)
+
     def submit_turn(self):
         """Submit and end your turn.
             Must be called at the end of your turn or the algo will hang.
         """
+        deploy_commands = []
+        for unit_type, x, y, count in self._deploy_stack:
+            deploy_commands.extend([(unit_type, x, y)] * count)
         build_string = json.dumps(self._build_stack)
-        deploy_string = json.dumps(self._deploy_stack)
+        deploy_string = json.dumps(deploy_commands)
         send_command(build_string)
         send_command(deploy_string)
 
@@ -271,12 +356,15 @@ class GameState:
             self.warn("Invalid current MP ({}). Current MP cannot be negative.".format(current_MP))
 
         MP = self.get_resource(self.MP, player_index) if not current_MP else current_MP
+        resources = self.config["resources"]
+        MP_decay = 1 - resources["bitDecayPerRound"]
+        MP_per_round = resources["bitsPerRound"]
+        MP_per_round_growth = resources["bitGrowthRate"]
+        MP_ramp_interval = resources["turnIntervalForBitSchedule"]
         for increment in range(1, turns_in_future + 1):
             current_turn = self.turn_number + increment
-            MP *= (1 - self.config["resources"]["bitDecayPerRound"])
-            MP_per_round = self.config["resources"]["bitsPerRound"]
-            MP_ramp_ups = current_turn // self.config["resources"]["turnIntervalForBitSchedule"]
-            MP_per_round_growth = self.config["resources"]["bitGrowthRate"]
+            MP *= MP_decay
+            MP_ramp_ups = current_turn // MP_ramp_interval
             MP_gained = MP_per_round + (MP_per_round_growth * MP_ramp_ups)
             MP += MP_gained
             MP = round(MP, 1)
@@ -333,7 +421,8 @@ class GameState:
         stationary = is_stationary(unit_type)
         blocked = self.contains_stationary_unit(location) or (stationary and len(self.game_map[location[0],location[1]]) > 0)
         correct_territory = location[1] < self.HALF_ARENA
-        on_edge = location in (self.game_map.get_edge_locations(self.game_map.BOTTOM_LEFT) + self.game_map.get_edge_locations(self.game_map.BOTTOM_RIGHT))
+        on_edge = not stationary and (location in self.game_map.get_edge_locations(self.game_map.BOTTOM_LEFT) or
+                                      location in self.game_map.get_edge_locations(self.game_map.BOTTOM_RIGHT))
 
         if self.enable_warnings:
             fail_reason = ""
@@ -363,6 +452,9 @@ class GameState:
         Returns:
             The number of units successfully spawned
 
+        Each location is validated once, and the number of units placed there is worked out from
+        the resources available, so large values of num cost no more than spawning a single unit.
+
         """
         if unit_type not in ALL_UNITS:
             self._invalid_unit(unit_type)
@@ -373,22 +465,26 @@ class GameState:
       
         if type(locations[0]) == int:
             locations = [locations]
+        stationary = is_stationary(unit_type)
+        costs = self.type_cost(unit_type)
         spawned_units = 0
         for location in locations:
-            for i in range(num):
-                if self.can_spawn(unit_type, location, 1):
-                    x, y = map(int, location)
-                    costs = self.type_cost(unit_type)
-                    self.__set_resource(SP, 0 - costs[SP])
-                    self.__set_resource(MP, 0 - costs[MP])
-                    self.game_map.add_unit(unit_type, location, 0)
-                    if is_stationary(unit_type):
-                        self._build_stack.append((unit_type, x, y))
-                    else:
-                        self._deploy_stack.append((unit_type, x, y))
-                    spawned_units += 1
-                else:
-                    break
+            if not self.can_spawn(unit_type, location, 1):
+                continue
+            # A structure blocks its own tile, mobile units can stack as long as we can pay for them
+            count = 1 if stationary else min(num, self.number_affordable(unit_type))
+            x, y = map(int, location)
+            self.__set_resource(SP, 0 - costs[SP] * count)
+            self.__set_resource(MP, 0 - costs[MP] * count)
+            self.game_map._place_unit(GameUnit(unit_type, self.config, 0, None, x, y), count)
+            if stationary:
+                self._build_stack.append((unit_type, x, y))
+            else:
+                self._deploy_stack.append((unit_type, x, y, count))
+            spawned_units += count
+            if count < num and self.enable_warnings:
+                # Report why the rest could not be spawned
+                self.can_spawn(unit_type, location, 1)
         return spawned_units
 
     def attempt_remove(self, locations):
@@ -441,7 +537,7 @@ class GameState:
                     if resources[SP] >= costs[SP] and resources[MP] >= costs[MP]:
                         self.__set_resource(SP, 0 - costs[SP])
                         self.__set_resource(MP, 0 - costs[MP])
-                        existing_unit.upgrade()
+                        self.game_map.upgrade_unit([x, y])
                         self._build_stack.append((UPGRADE, x, y))
                         spawned_units += 1
             else:
@@ -0,0 +1,107 @@
+import collections
+import time
+
+from .bitboard import get_open_mask, reaches_edge
+from .placement import PlacementEvaluator
+
+
+class MazeBuilder:
+    """Searches for wall placements that make the enemy's units take as much damage as possible
+
+    The search is greedy: each step tries a wall on every tile of our half that an enemy path goes
+    through, busiest tiles first, using PlacementEvaluator. It keeps the wall that adds the most threat
+    weighted damage along the enemy paths, or the most path length when that is tied. Walls off every
+    path cannot change any path, so they are never tried. Kept walls are placed inside a transaction, so the next step
+    sees them, and everything is rolled back before returning.
+
+    Tiles in open_tiles are never walled, and a wall is only kept if each of them can still reach
+    the edge our units would target from it, checked with a bitboard flood fill, so our own attack
+    lanes stay open.
+
+    Example::
+
+        # In on_game_start
+        self.maze_builder = gamelib.MazeBuilder(config)
+        # In on_turn
+        walls = self.maze_builder.search(game_state, budget=8, open_tiles=[[13, 0], [14, 0]], time_limit=0.3)
+        game_state.attempt_spawn(WALL, walls)
+
+    """
+    def __init__(self, config, evaluator=None):
+        """Sets up the builder
+
+        Args:
+            config: The game configuration
+            evaluator: A PlacementEvaluator to use. A new one is made if None
+
+        """
+        self.config = config
+        self.evaluator = evaluator if evaluator is not None else PlacementEvaluator(config)
+
+    def search(self, game_state, budget=None, open_tiles=None, unit_type=None, time_limit=0.5, allow_self_destruct=False, batch_size=16):
+        """Finds walls to add to the current map
+
+        Args:
+            game_state: The current GameState
+            budget: The most SP to spend on walls, all of our SP by default
+            open_tiles: A list of locations that must not be walled and must keep a path to their target edge
+            unit_type: The structure to place, WALL by default
+            time_limit: Stop searching after this many seconds. The walls found so far are returned
+            allow_self_destruct: If False, walls that make an enemy path stop short of our edge are not used
+            batch_size: The number of candidates evaluated between checks of the time limit
+
+        Returns:
+            A list of locations to place walls at, in the order they were chosen
+
+        """
+        started = time.perf_counter()
+        if unit_type is None:
+            unit_type = self.config["unitInformation"][0]["shorthand"]
+        if budget is None:
+            budget = game_state.get_resource(game_state.SP)
+        cost = game_state.type_cost(unit_type)[game_state.SP]
+        open_tiles = [[int(x), int(y)] for x, y in open_tiles] if open_tiles else []
+        closed = set((x, y) for x, y in open_tiles)
+
+        game_map = game_state.game_map
+        chosen = []
+        with game_state.transaction() as transaction:
+            while budget >= cost and time.perf_counter() - started < time_limit:
+                # Tiles crossed by the most enemy paths are tried first, in case time runs out
+                crossings = collections.Counter()
+                for _, _, path in self.evaluator.get_enemy_paths(game_state):
+                    for x, y in path:
+                        if y < game_state.HALF_ARENA and (x, y) not in closed and not game_state.contains_stationary_unit([x, y]):
+                            crossings[(x, y)] += 1
+                candidates = sorted(crossings, key=lambda location: (-crossings[location], location[1], location[0]))
+
+                ranked = []
+                for start in range(0, len(candidates), batch_size):
+                    if start > 0 and time.perf_counter() - started >= time_limit:
+                        break
+                    batch = [list(location) for location in candidates[start:start + batch_size]]
+                    for impact in self.evaluator.evaluate(game_state, batch, unit_type):
+                        if impact is None or impact.blocked_count > 0:
+                            continue
+                        if impact.self_destruct_count > 0 and not allow_self_destruct:
+                            continue
+                        score = (impact.damage_change, impact.path_length_change)
+                        if score > (0, 0):
+                            ranked.append((score, impact.location))
+                ranked.sort(key=lambda entry: entry[0], reverse=True)
+
+                placed = False
+                for _, location in ranked:
+                    game_map.add_unit(unit_type, location, 0)
+                    open_mask = get_open_mask(game_map)
+                    if all(reaches_edge(game_map, tile, open_mask=open_mask) for tile in open_tiles):
+                        chosen.append(location)
+                        budget -= cost
+                        placed = True
+                        break
+                    game_map.remove_unit(location)
+                    closed.add(tuple(location))
+                if not placed:
+                    break
+            transaction.rollback()
+        return chosen
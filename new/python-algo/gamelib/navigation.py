@@ -1,21 +1,21 @@
 import heapq
 import math
 import sys
-import queue
+import collections
 from .util import debug_write
+from .transposition import TranspositionTable
+from .bitboard import ARENA_MASK, flood_fill, location_mask, mask_locations, most_ideal_in
 
 class Node:
     """A pathfinding node
 
     Attributes :
-        * visited_idealness (bool): Have we visited this node during the idealness search step?
         * visited_validate (bool): Have we visited this node during the validation step?
         * blocked (bool): Is there a structures at this node's location
         * pathlength: The distance between this node and the target location
 
     """
     def __init__(self):
-        self.visited_idealness = False
         self.visited_validate = False
         self.blocked = False
         self.pathlength = -1
@@ -35,11 +35,19 @@ class ShortestPathFinder:
         * game_state (:obj: GameState): The current gamestate
         * game_map (:obj: GameMap): The current gamemap
 
+    Paths and distance fields are cached by the exact layout of structures. Distance fields are
+    stored in a canonical orientation, with the target edge on the right, so a query towards a left
+    edge on a mirror symmetric layout reuses the field of the mirrored query towards the right.
+    Paths are cached as they were walked, since the order neighbors are tried in is not symmetric,
+    so the mirror of a path is not always the path a unit would take.
+
     """
-    def __init__(self):
+    def __init__(self, max_cached_paths=1024, max_cached_fields=64):
         self.HORIZONTAL = 1
         self.VERTICAL = 2
         self.initialized = False
+        self._path_cache = TranspositionTable(max_entries=max_cached_paths)
+        self._field_cache = TranspositionTable(max_entries=max_cached_fields)
 
     def initialize_map(self, game_state):
         """Initializes the map
@@ -67,47 +75,134 @@ class ShortestPathFinder:
         """
         if game_state.contains_stationary_unit(start_point):
             return
+        return self.navigate_many([start_point], end_points, game_state)[0]
+
+    def navigate_many(self, start_points, end_points, game_state):
+        """Finds the paths units at several start points would take to reach the same set of endpoints
+
+        The map is set up once, each pocket of pathable space is found once with a bitboard flood fill, and every start point
+        heading for the same target shares one distance field. This is much faster than calling
+        navigate_multiple_endpoints for each start point, and gives the same paths.
+
+        Args:
+            * start_points: A list of starting locations
+            * end_points: The end points of the units, should be a list of edge locations
+            * game_state: The current game state
+
+        Returns:
+            A list with the path from each start point, in the same order. The entry is None for blocked start points.
+
+        """
+        size = game_state.ARENA_SIZE
+        structures, mirrored = game_state.game_map.get_structure_masks()
+        # Work in the orientation where the target is on the right, mirroring left targets
+        flip = end_points[0][0] < game_state.HALF_ARENA
+        if flip:
+            layout = mirrored
+            canonical_end_points = tuple((size - 1 - x, y) for x, y in end_points)
+        else:
+            layout = structures
+            canonical_end_points = tuple((x, y) for x, y in end_points)
+
+        paths = [None] * len(start_points)
+        unresolved = []
+        for index, start_point in enumerate(start_points):
+            if game_state.contains_stationary_unit(start_point) or not game_state.game_map.in_arena_bounds(start_point):
+                continue
+            path_key = (structures, (start_point[0], start_point[1]), tuple((x, y) for x, y in end_points))
+            path = self._path_cache.get(path_key)
+            if path is None:
+                unresolved.append((index, start_point, path_key))
+            else:
+                paths[index] = [[x, y] for x, y in path]
+        if not unresolved:
+            return paths
 
         #Initialize map 
         self.initialize_map(game_state)
         #Fill in walls
-        for location in self.game_state.game_map:
-            if self.game_state.contains_stationary_unit(location):
-                self.game_map[location[0]][location[1]].blocked = True
-        #Do pathfinding
-        ideal_endpoints = self._idealness_search(start_point, end_points)
-        self._validate(ideal_endpoints, end_points)
-        return self._get_path(start_point, end_points)
-
-    def _idealness_search(self, start, end_points):
-        """
-        Finds the most ideal tile in our 'pocket' of pathable space. 
-        The edge if it is available, or the best self destruct location otherwise
+        self._fill_walls(structures)
+        #Find the most ideal tile of each pocket, then group start points by the target they path to
+        open_mask = ARENA_MASK & ~structures
+        end_mask = location_mask(end_points)
+        direction = self._get_direction_from_endpoints(end_points)
+        targets = {}
+        while unresolved:
+            start_point = unresolved[0][1]
+            pocket = flood_fill(1 << (start_point[1] * size + start_point[0]), open_mask)
+            ideal_endpoints = most_ideal_in(pocket, end_mask, direction[0] == 1, direction[1] == 1)
+            if ideal_endpoints in end_points:
+                target = canonical_end_points
+            elif flip:
+                target = (size - 1 - ideal_endpoints[0], ideal_endpoints[1])
+            else:
+                target = tuple(ideal_endpoints)
+            group = targets.setdefault(target, (ideal_endpoints, []))[1]
+            remaining = []
+            for entry in unresolved:
+                start_point = entry[1]
+                if pocket >> (start_point[1] * size + start_point[0]) & 1:
+                    group.append(entry)
+                else:
+                    remaining.append(entry)
+            unresolved = remaining
+
+        #Do pathfinding, once per distance field
+        first = True
+        for target, (ideal_endpoints, group) in targets.items():
+            if not first:
+                self._reset_validation()
+            first = False
+            field_key = (layout, target)
+            field = self._field_cache.get(field_key)
+            if field is None:
+                self._validate(ideal_endpoints, end_points)
+                self._field_cache.store(field_key, self._save_field(flip))
+            else:
+                self._load_field(field, flip)
+            for index, start_point, path_key in group:
+                path = self._get_path(start_point, end_points)
+                self._path_cache.store(path_key, tuple((x, y) for x, y in path))
+                paths[index] = path
+        return paths
+
+    def _reset_validation(self):
+        """Clears the pathlengths set by _validate so another target can be validated
         """
-        current = queue.Queue()
-        current.put(start)
-        best_idealness = self._get_idealness(start, end_points)
-        self.game_map[start[0]][start[1]].visited_idealness = True
-        most_ideal = start
-
-        while not current.empty():
-            search_location = current.get()
-            for neighbor in self._get_neighbors(search_location):
-                if not self.game_state.game_map.in_arena_bounds(neighbor) or self.game_map[neighbor[0]][neighbor[1]].blocked:
-                    continue
-
-                x, y = neighbor
-                current_idealness = self._get_idealness(neighbor, end_points)
+        for column in self.game_map:
+            for node in column:
+                node.pathlength = -1
+                node.visited_validate = False
 
-                if current_idealness > best_idealness:
-                    best_idealness = current_idealness
-                    most_ideal = neighbor
-
-                if not self.game_map[x][y].visited_idealness and not self.game_map[x][y].blocked:
-                    self.game_map[x][y].visited_idealness = True
-                    current.put(neighbor)
+    def _fill_walls(self, structures):
+        """Marks the nodes of every tile set in the structures bitboard as blocked
+        """
+        for x, y in mask_locations(structures):
+            self.game_map[x][y].blocked = True
 
-        return most_ideal
+    def _save_field(self, flip):
+        """Copies the validated pathlengths into a flat list indexed by y * ARENA_SIZE + x, mirrored if flip is True
+        """
+        size = self.game_state.ARENA_SIZE
+        field = [-1] * (size * size)
+        for x in range(size):
+            column = self.game_map[x]
+            fx = size - 1 - x if flip else x
+            for y in range(size):
+                field[y * size + fx] = column[y].pathlength
+        return field
+
+    def _load_field(self, field, flip):
+        """Sets node pathlengths from a field saved by _save_field, instead of running _validate
+        """
+        size = self.game_state.ARENA_SIZE
+        for x in range(size):
+            column = self.game_map[x]
+            fx = size - 1 - x if flip else x
+            for y in range(size):
+                node = column[y]
+                node.pathlength = field[y * size + fx]
+                node.visited_validate = node.pathlength != -1
 
     def _get_neighbors(self, location):
         """Get the locations adjacent to a location
@@ -134,51 +229,27 @@ class ShortestPathFinder:
             direction[1] = -1
         return direction
 
-    def _get_idealness(self, location, end_points):
-        """Get the idealness of a tile, the reachable tile the unit most wants to path to.
-        Better self destruct locations are more ideal. The endpoints are perfectly ideal. 
-
-        Returns:
-            A location the unit will attempt to reach
-        """
-        if location in end_points:
-            return sys.maxsize
-
-        direction = self._get_direction_from_endpoints(end_points)
-
-        idealness = 0
-        if direction[1] == 1:
-            idealness += 28 * location[1]
-        else: 
-            idealness += 28 * (27 - location[1])
-        if direction[0] == 1:
-            idealness += location[0]
-        else: 
-            idealness += (27 - location[0])
-
-        return idealness
-
     def _validate(self, ideal_tile, end_points):
         """Breadth first search of the grid, setting the pathlengths of each node
 
         """
         #VALDIATION
         #Add our most ideal tiles to current
-        current = queue.Queue()
+        current = collections.deque()
         if ideal_tile in end_points:
             for location in end_points:
-               current.put(location)
+               current.append(location)
                #Set current pathlength to 0
                self.game_map[location[0]][location[1]].pathlength = 0
                self.game_map[location[0]][location[1]].visited_validate = True
         else:
-            current.put(ideal_tile)
+            current.append(ideal_tile)
             self.game_map[ideal_tile[0]][ideal_tile[1]].pathlength = 0
             self.game_map[ideal_tile[0]][ideal_tile[1]].visited_validate = True
 
         #While current is not empty
-        while not current.empty():
-            current_location = current.get()
+        while current:
+            current_location = current.popleft()
             current_node = self.game_map[current_location[0]][current_location[1]]
             for neighbor in self._get_neighbors(current_location):
                 if not self.game_state.game_map.in_arena_bounds(neighbor) or self.game_map[neighbor[0]][neighbor[1]].blocked:
@@ -188,7 +259,7 @@ class ShortestPathFinder:
                 if not neighbor_node.visited_validate and not current_node.blocked:
                     neighbor_node.pathlength = current_node.pathlength + 1
                     neighbor_node.visited_validate = True
-                    current.put(neighbor)
+                    current.append(neighbor)
 
         #debug_write("Print after validate")
         #self.print_map()
@@ -0,0 +1,190 @@
+from .game_state import GameState
+from .bitboard import ARENA_SIZE
+
+_LAST_BIT = ARENA_SIZE * ARENA_SIZE - 1
+
+def rotate_location(location):
+    """Rotates a location 180 degrees around the center of the arena
+
+    This converts between real board coordinates and the coordinates seen by the other player.
+    Applying it twice gives back the original location.
+
+    Args:
+        location: A map location, [x, y]
+
+    Returns:
+        The rotated location, [27 - x, 27 - y]
+
+    """
+    return [ARENA_SIZE - 1 - location[0], ARENA_SIZE - 1 - location[1]]
+
+def rotate_edge(edge):
+    """Gets the edge an edge becomes when the board is rotated 180 degrees, for example TOP_RIGHT <-> BOTTOM_LEFT
+    """
+    return (edge + 2) % 4
+
+def rotate_mask(mask):
+    """Rotates a bitboard, as returned by GameMap.get_structure_masks, 180 degrees
+    """
+    return int(format(mask, '0{}b'.format(_LAST_BIT + 1))[::-1], 2)
+
+
+class GameMapView:
+    """A GameMap as seen by the enemy, rotated 180 degrees so that they are at the bottom
+
+    No tiles are copied. game_map_view[x, y] returns the same list of GameUnits as
+    game_map[27 - x, 27 - y], so changes to the real map are seen immediately. Note that the
+    GameUnits themselves are shared too, so their x, y and player_index are in real board terms.
+
+    The edge constants and the geometric helpers (in_arena_bounds, get_edges, get_locations_in_range,
+    distance_between_locations) are unchanged, because the arena looks the same after rotation.
+
+    """
+    def __init__(self, game_map):
+        self.game_map = game_map
+        self.config = game_map.config
+        self.ARENA_SIZE = game_map.ARENA_SIZE
+        self.HALF_ARENA = game_map.HALF_ARENA
+        self.TOP_RIGHT = game_map.TOP_RIGHT
+        self.TOP_LEFT = game_map.TOP_LEFT
+        self.BOTTOM_LEFT = game_map.BOTTOM_LEFT
+        self.BOTTOM_RIGHT = game_map.BOTTOM_RIGHT
+        self.in_arena_bounds = game_map.in_arena_bounds
+        self.get_edge_locations = game_map.get_edge_locations
+        self.get_edges = game_map.get_edges
+        self.get_locations_in_range = game_map.get_locations_in_range
+        self.distance_between_locations = game_map.distance_between_locations
+        self.warn = game_map.warn
+
+    def __getitem__(self, location):
+        if len(location) == 2 and self.in_arena_bounds(location):
+            x, y = location
+            return self.game_map[ARENA_SIZE - 1 - x, ARENA_SIZE - 1 - y]
+        self.game_map._invalid_coordinates(location)
+
+    def __iter__(self):
+        for location in self.game_map:
+            yield rotate_location(location)
+
+    @property
+    def zobrist_hash(self):
+        return self.game_map.zobrist_hash
+
+    def get_structure_masks(self):
+        """Gets the structure bitboards in rotated coordinates, see GameMap.get_structure_masks
+        """
+        structures, mirrored = self.game_map.get_structure_masks()
+        return rotate_mask(structures), rotate_mask(mirrored)
+
+    def add_unit(self, unit_type, location, player_index=0):
+        """Adds a unit at a rotated location. player_index 0 is the enemy, see GameMap.add_unit
+        """
+        self.game_map.add_unit(unit_type, rotate_location(location), 1 - player_index)
+
+    def remove_unit(self, location):
+        """Removes all units at a rotated location, see GameMap.remove_unit
+        """
+        self.game_map.remove_unit(rotate_location(location))
+
+    def upgrade_unit(self, location):
+        """Upgrades the structure at a rotated location, see GameMap.upgrade_unit
+        """
+        return self.game_map.upgrade_unit(rotate_location(location))
+
+
+class GameStateView:
+    """The GameState as seen by the enemy. Create one with game_state.enemy_view()
+
+    The board is rotated 180 degrees and the player indices are swapped, so in the view the
+    enemy is player 0 at the bottom of the map. This lets the same code that plans our moves
+    predict the enemy's, without building a flipped copy of the board.
+
+    The query functions (get_resource, number_affordable, project_future_MP, type_cost, can_spawn,
+    get_target_edge, find_path_to_edge, contains_stationary_unit, get_attackers, get_target) take and
+    return locations and player indices in the rotated perspective. Paths are computed on the real
+    board and rotated, so they match the engine exactly and share the real pathfinder's caches.
+    GameUnits are shared with the real board, so their own x, y and player_index are in real board terms.
+
+    Attributes :
+        * game_state (:obj: GameState): The real GameState
+        * game_map (:obj: GameMapView): The rotated map
+        * my_health, my_time, enemy_health, enemy_time: Swapped from the real GameState
+
+    """
+    def __init__(self, game_state):
+        self.game_state = game_state
+        self.config = game_state.config
+        self.ARENA_SIZE = game_state.ARENA_SIZE
+        self.HALF_ARENA = game_state.HALF_ARENA
+        self.MP = game_state.MP
+        self.SP = game_state.SP
+        self.turn_number = game_state.turn_number
+        self.my_health = game_state.enemy_health
+        self.my_time = game_state.enemy_time
+        self.enemy_health = game_state.my_health
+        self.enemy_time = game_state.my_time
+        self.game_map = GameMapView(game_state.game_map)
+
+    @property
+    def enable_warnings(self):
+        return self.game_state.enable_warnings
+
+    # These only depend on the map, resources and unit types, so they work unchanged in the rotated perspective
+    number_affordable = GameState.number_affordable
+    project_future_MP = GameState.project_future_MP
+    type_cost = GameState.type_cost
+    can_spawn = GameState.can_spawn
+    get_target_edge = GameState.get_target_edge
+    contains_stationary_unit = GameState.contains_stationary_unit
+    _invalid_player_index = GameState._invalid_player_index
+    _invalid_unit = GameState._invalid_unit
+
+    def warn(self, message):
+        self.game_state.warn(message)
+
+    def get_resource(self, resource_type, player_index=0):
+        """Gets a players resources. player_index 0 is the enemy, see GameState.get_resource
+        """
+        if not player_index == 1 and not player_index == 0:
+            self._invalid_player_index(player_index)
+            return
+        return self.game_state.get_resource(resource_type, 1 - player_index)
+
+    def get_resources(self, player_index=0):
+        """Gets a players resources as a list. player_index 0 is the enemy, see GameState.get_resources
+        """
+        if not player_index == 1 and not player_index == 0:
+            self._invalid_player_index(player_index)
+            return
+        return self.game_state.get_resources(1 - player_index)
+
+    def find_path_to_edge(self, start_location, target_edge=None):
+        """Gets the path a unit at a rotated location would take, see GameState.find_path_to_edge
+
+        Returns:
+            The path in rotated coordinates
+
+        """
+        if target_edge is None:
+            target_edge = self.get_target_edge(start_location)
+        path = self.game_state.find_path_to_edge(rotate_location(start_location), rotate_edge(target_edge))
+        if path is None:
+            return None
+        return [rotate_location(location) for location in path]
+
+    def get_attackers(self, location, player_index):
+        """Gets the structures threatening a rotated location. player_index 0 is the enemy, see GameState.get_attackers
+        """
+        if not player_index == 0 and not player_index == 1:
+            self._invalid_player_index(player_index)
+        return self.game_state.get_attackers(rotate_location(location), 1 - player_index)
+
+    def get_target(self, attacking_unit):
+        """Returns the target of a unit, see GameState.get_target. Targeting does not depend on perspective
+        """
+        return self.game_state.get_target(attacking_unit)
+
+    def enemy_view(self):
+        """Returns the real GameState, the enemy of the enemy
+        """
+        return self.game_state
@@ -0,0 +1,162 @@
+from .prediction import AttackPredictor
+from .unit import GameUnit
+
+
+class PlacementImpact:
+    """How placing one structure would change the paths of the enemy's mobile units
+
+    Attributes :
+        * location (list): The location of the candidate structure
+        * unit_type (str): The type of the candidate structure
+        * path_length_change (int): The total change in path length over every enemy spawn location
+        * damage_change (float): The total change in damage our structures deal along those paths, per unit sent
+        * self_destruct_count (int): The number of spawn locations whose path no longer reaches our edge
+        * blocked_count (int): The number of spawn locations the structure would block
+        * changed_count (int): The number of spawn locations whose path changes
+
+    """
+    def __init__(self, location, unit_type):
+        self.location = location
+        self.unit_type = unit_type
+        self.path_length_change = 0
+        self.damage_change = 0
+        self.self_destruct_count = 0
+        self.blocked_count = 0
+        self.changed_count = 0
+
+    def __repr__(self):
+        return "{} at {}, path length change: {} damage change: {} new self destructs: {}".format(
+            self.unit_type, self.location, self.path_length_change, self.damage_change, self.self_destruct_count)
+
+
+class PlacementEvaluator:
+    """Evaluates many candidate structure placements against every enemy path at once
+
+    The enemy's current paths are found once with ShortestPathFinder.navigate_many. Adding a structure can
+    only change the paths that go through its tile, so each candidate only re-paths those spawn locations,
+    with the structure placed inside a transaction that is rolled back afterwards. Candidates that are not on
+    any path need no pathfinding at all. The distance fields and paths of every layout tried are kept in the
+    path finder's caches, so evaluating the same candidates again, or a mirrored candidate, is cheap.
+
+    Example::
+
+        evaluator = gamelib.PlacementEvaluator(config)
+        impacts = evaluator.evaluate(game_state, [[x, 13] for x in range(28)], WALL)
+        best = max(impacts, key=lambda impact: impact.damage_change if impact else -1)
+
+    """
+    def __init__(self, config, predictor=None):
+        """Sets up the evaluator
+
+        Args:
+            config: The game configuration
+            predictor: An AttackPredictor to share range offsets with. A new one is made if None
+
+        """
+        self.config = config
+        self.predictor = predictor if predictor is not None else AttackPredictor(config)
+
+    def evaluate(self, game_state, candidates, unit_type=None, attacker_type=None):
+        """Finds the impact of placing a structure at each candidate location, one at a time
+
+        Args:
+            game_state: The current GameState
+            candidates: A list of locations to try
+            unit_type: The structure to place, WALL by default
+            attacker_type: The enemy mobile unit whose speed is used for damage, SCOUT by default
+
+        Returns:
+            A list of PlacementImpact in the same order as candidates, with None for locations that are
+            out of bounds or already hold a structure
+
+        """
+        if unit_type is None:
+            unit_type = self.config["unitInformation"][0]["shorthand"]
+        if attacker_type is None:
+            attacker_type = self.config["unitInformation"][3]["shorthand"]
+        attacker = GameUnit(attacker_type, self.config, 1)
+        frames_per_tile = 1 / attacker.speed if attacker.speed > 0 else 1
+
+        game_map = game_state.game_map
+        finder = game_state._shortest_path_finder
+        threat = self.predictor.get_threat_map(game_state, 1)
+
+        # The current enemy paths, and which spawn locations go through each tile
+        routes = []
+        through = {}
+        for spawn_location, end_points, path in self.get_enemy_paths(game_state):
+            route = len(routes)
+            damage = sum(threat[x][y] for x, y in path) * frames_per_tile
+            routes.append((spawn_location, end_points, path, damage, path[-1] in end_points))
+            for x, y in path:
+                through.setdefault((x, y), []).append(route)
+
+        template = GameUnit(unit_type, self.config, 0)
+        added_threat = template.damage_i > 0 and template.attackRange > 0
+        impacts = []
+        with game_state.transaction() as transaction:
+            for location in candidates:
+                x, y = map(int, location)
+                if not game_map.in_arena_bounds([x, y]) or game_state.contains_stationary_unit([x, y]):
+                    impacts.append(None)
+                    continue
+                impact = PlacementImpact([x, y], unit_type)
+                affected = through.get((x, y), [])
+                in_range = set()
+                if added_threat:
+                    for dx, dy in self.predictor._get_range_offsets(template.attackRange):
+                        in_range.add((x + dx, y + dy))
+
+                if affected:
+                    game_map.add_unit(unit_type, [x, y], 0)
+                    by_edge = {}
+                    for route in affected:
+                        by_edge.setdefault(id(routes[route][1]), []).append(route)
+                    for group in by_edge.values():
+                        end_points = routes[group[0]][1]
+                        new_paths = finder.navigate_many([routes[route][0] for route in group], end_points, game_state)
+                        for route, new_path in zip(group, new_paths):
+                            _, _, path, damage, breaches = routes[route]
+                            impact.changed_count += 1
+                            if new_path is None:
+                                impact.blocked_count += 1
+                                impact.path_length_change -= len(path)
+                                impact.damage_change -= damage
+                                continue
+                            new_damage = sum(threat[tx][ty] for tx, ty in new_path)
+                            new_damage += sum(template.damage_i for tx, ty in new_path if (tx, ty) in in_range)
+                            impact.path_length_change += len(new_path) - len(path)
+                            impact.damage_change += new_damage * frames_per_tile - damage
+                            if breaches and new_path[-1] not in end_points:
+                                impact.self_destruct_count += 1
+                    transaction.rollback()
+
+                if in_range:
+                    affected = set(affected)
+                    for route, (_, _, path, _, _) in enumerate(routes):
+                        if route not in affected:
+                            impact.damage_change += sum(template.damage_i for tx, ty in path if (tx, ty) in in_range) * frames_per_tile
+                impacts.append(impact)
+        return impacts
+
+    def get_enemy_paths(self, game_state):
+        """Gets the path from every location the enemy can deploy on, found in two batches with navigate_many
+
+        Args:
+            game_state: The current GameState
+
+        Returns:
+            A list of (spawn_location, end_points, path) for every spawn location that is not blocked
+
+        """
+        game_map = game_state.game_map
+        finder = game_state._shortest_path_finder
+        enemy_paths = []
+        for spawn_edge, target_edge in [(game_map.TOP_LEFT, game_map.BOTTOM_RIGHT), (game_map.TOP_RIGHT, game_map.BOTTOM_LEFT)]:
+            spawn_locations = game_map.get_edge_locations(spawn_edge)
+            end_points = game_map.get_edge_locations(target_edge)
+            paths = finder.navigate_many(spawn_locations, end_points, game_state)
+            for spawn_location, path in zip(spawn_locations, paths):
+                if path is not None:
+                    enemy_paths.append((spawn_location, end_points, path))
+        return enemy_paths
@@ -0,0 +1,161 @@
+import math
+
+from .unit import GameUnit
+from .bitboard import mask_locations
+
+
+class AttackPrediction:
+    """The predicted outcome of the enemy attacking from one spawn location
+
+    Attributes :
+        * spawn_location (list): The enemy edge location the attack starts from
+        * path (list): The path the attacking units would take
+        * breach_location (list): The location on our edge where they would score, None for a self destruct path
+        * path_damage (float): The damage our structures would deal to the attackers along the path
+        * units (int): The number of units the enemy could send
+        * survivors (int): The estimated number of units that would survive the path
+        * breach_damage (float): The estimated damage to our health
+
+    """
+    def __init__(self, spawn_location, path, breach_location, path_damage, units, survivors, breach_damage):
+        self.spawn_location = spawn_location
+        self.path = path
+        self.breach_location = breach_location
+        self.path_damage = path_damage
+        self.units = units
+        self.survivors = survivors
+        self.breach_damage = breach_damage
+
+    def __repr__(self):
+        return "Attack from {} breaching at {}, path damage: {} units: {} survivors: {} breach damage: {}".format(
+            self.spawn_location, self.breach_location, self.path_damage, self.units, self.survivors, self.breach_damage)
+
+
+class AttackPredictor:
+    """Predicts where the enemy can score on us this turn, from every location they can deploy on
+
+    All paths towards each of our edges are computed in one batch with ShortestPathFinder.navigate_many,
+    so they share distance fields. The estimate assumes the enemy sends all of their MP as a single
+    stack of one unit type, and that our structures' damage along the path kills attackers one at a time.
+
+    Example::
+
+        # In on_game_start
+        self.predictor = gamelib.AttackPredictor(config)
+        # At the start of on_turn
+        for prediction in self.predictor.predict(game_state)[:3]:
+            gamelib.debug_write(prediction)
+
+    """
+    def __init__(self, config):
+        """Sets up the predictor
+
+        Args:
+            config: The game configuration
+
+        """
+        self.config = config
+        self._range_offsets = {}
+
+    def predict(self, game_state, unit_type=None, turns_ahead=0):
+        """Predicts the outcome of an enemy attack from each of their deployable edge locations
+
+        Args:
+            game_state: The current GameState
+            unit_type: The mobile unit the enemy is expected to use. Defaults to the first mobile unit, SCOUT
+            turns_ahead: Predict with the MP the enemy will have after saving for this many turns, using project_future_MP
+
+        Returns:
+            A list of AttackPrediction, most damaging first
+
+        """
+        from .game_state import UNIT_TYPE_TO_INDEX
+        if unit_type is None:
+            unit_type = self.config["unitInformation"][3]["shorthand"]
+        if turns_ahead > 0:
+            enemy_MP = game_state.project_future_MP(turns_ahead, player_index=1)
+        else:
+            enemy_MP = game_state.get_resource(game_state.MP, 1)
+
+        attacker = GameUnit(unit_type, self.config, 1)
+        cost = attacker.cost[game_state.MP]
+        units = int(math.floor(enemy_MP / cost)) if cost > 0 else 0
+        breach_damage_per_unit = self.config["unitInformation"][UNIT_TYPE_TO_INDEX[unit_type]].get("playerBreachDamage", 1)
+        frames_per_tile = 1 / attacker.speed if attacker.speed > 0 else 1
+
+        threat = self.get_threat_map(game_state, 1)
+        game_map = game_state.game_map
+        finder = game_state._shortest_path_finder
+        predictions = []
+        for spawn_edge, target_edge in [(game_map.TOP_LEFT, game_map.BOTTOM_RIGHT), (game_map.TOP_RIGHT, game_map.BOTTOM_LEFT)]:
+            spawn_locations = game_map.get_edge_locations(spawn_edge)
+            end_points = game_map.get_edge_locations(target_edge)
+            paths = finder.navigate_many(spawn_locations, end_points, game_state)
+            for spawn_location, path in zip(spawn_locations, paths):
+                if path is None:
+                    continue
+                path_damage = sum(threat[x][y] for x, y in path) * frames_per_tile
+                breach_location = path[-1] if path[-1] in end_points else None
+                killed = int(path_damage // attacker.max_health) if attacker.max_health > 0 else units
+                survivors = max(0, units - killed)
+                breach_damage = survivors * breach_damage_per_unit if breach_location is not None else 0
+                predictions.append(AttackPrediction(spawn_location, path, breach_location, path_damage, units, survivors, breach_damage))
+
+        predictions.sort(key=lambda prediction: (-prediction.breach_damage, prediction.path_damage))
+        return predictions
+
+    def rank_breach_points(self, predictions):
+        """Groups predictions by where they breach
+
+        Args:
+            predictions: A list of AttackPrediction, as returned by predict
+
+        Returns:
+            A list of [breach_location, breach_damage] pairs with the worst case damage for each location, most damaging first
+
+        """
+        worst = {}
+        for prediction in predictions:
+            if prediction.breach_location is None:
+                continue
+            key = tuple(prediction.breach_location)
+            worst[key] = max(worst.get(key, 0), prediction.breach_damage)
+        ranked = [[list(location), damage] for location, damage in worst.items()]
+        ranked.sort(key=lambda entry: -entry[1])
+        return ranked
+
+    def get_threat_map(self, game_state, player_index):
+        """Gets the damage per frame structures deal to mobile units of the given player on each tile
+
+        Args:
+            game_state: The current GameState
+            player_index: The player whose mobile units are attacked, 0 for you 1 for the enemy
+
+        Returns:
+            A 2D list where threat[x][y] is the total damage per frame at [x, y]
+
+        """
+        game_map = game_state.game_map
+        size = game_map.ARENA_SIZE
+        threat = [[0] * size for _ in range(size)]
+        structures, _ = game_map.get_structure_masks()
+        for x, y in mask_locations(structures):
+            for unit in game_map[x, y]:
+                if unit.stationary and unit.player_index != player_index and unit.damage_i > 0:
+                    for dx, dy in self._get_range_offsets(unit.attackRange):
+                        tx, ty = x + dx, y + dy
+                        if 0 <= tx < size and 0 <= ty < size:
+                            threat[tx][ty] += unit.damage_i
+        return threat
+
+    def _get_range_offsets(self, radius):
+        """Gets the [dx, dy] offsets within radius, matching GameMap.get_locations_in_range
+        """
+        offsets = self._range_offsets.get(radius)
+        if offsets is None:
+            get_hit_radius = self.config["unitInformation"][0]['getHitRadius']
+            search_radius = math.ceil(radius)
+            offsets = [(dx, dy) for dx in range(-search_radius, search_radius + 1) for dy in range(-search_radius, search_radius + 1)
+                       if math.sqrt(dx ** 2 + dy ** 2) < radius + get_hit_radius]
+            self._range_offsets[radius] = offsets
+        return offsets
@@ -0,0 +1,71 @@
+class StructureRegistry:
+    """Iterates a player's live structures in priority order, for upgrade, repair and removal sweeps
+
+    Sweeps over the registry only touch tiles that hold a structure, instead of calling
+    contains_stationary_unit on every location of the map. The structures come from
+    GameMap.get_structures, so structures spawned earlier in the turn are included.
+
+    Example::
+
+        registry = gamelib.StructureRegistry(game_state.game_map, priority=lambda unit: -unit.y)
+        for turret in registry.not_upgraded(0, TURRET):
+            game_state.attempt_upgrade([turret.x, turret.y])
+
+    """
+    def __init__(self, game_map, priority=None):
+        """Creates a registry for a map
+
+        Args:
+            game_map: The GameMap to read structures from
+            priority: A function taking a GameUnit and returning a sort key. Units with lower keys come first.
+                If None, units are ordered by location, bottom row first
+
+        """
+        self.game_map = game_map
+        self.priority = priority if priority is not None else (lambda unit: (unit.y, unit.x))
+
+    def structures(self, player_index, unit_type=None):
+        """Gets a player's structures in priority order
+
+        Args:
+            player_index: The player whose structures to get, 0 for you 1 for the enemy
+            unit_type: Only return this type of structure. All types if None
+
+        Returns:
+            A list of GameUnits
+
+        """
+        units = self.game_map.get_structures(player_index).values()
+        if unit_type is not None:
+            units = [unit for unit in units if unit.unit_type == unit_type]
+        return sorted(units, key=self.priority)
+
+    def not_upgraded(self, player_index, unit_type=None):
+        """Gets a player's structures that are not upgraded yet and can be, in priority order
+        """
+        from .game_state import UNIT_TYPE_TO_INDEX
+        unit_information = self.game_map.config["unitInformation"]
+        return [unit for unit in self.structures(player_index, unit_type)
+                if not unit.upgraded and unit_information[UNIT_TYPE_TO_INDEX[unit.unit_type]].get("upgrade") is not None]
+
+    def damaged(self, player_index, threshold=1.0, unit_type=None):
+        """Gets a player's structures whose health is below a fraction of their maximum, in priority order
+
+        Args:
+            player_index: The player whose structures to get, 0 for you 1 for the enemy
+            threshold: The fraction of max_health below which a structure counts as damaged, 0.5 for below 50%
+            unit_type: Only return this type of structure. All types if None
+
+        """
+        return [unit for unit in self.structures(player_index, unit_type)
+                if unit.max_health > 0 and unit.health < threshold * unit.max_health]
+
+    def pending_removal(self, player_index, unit_type=None):
+        """Gets a player's structures that are marked for removal, in priority order
+        """
+        return [unit for unit in self.structures(player_index, unit_type) if unit.pending_removal]
+
+    def get_locations(self, units):
+        """Converts a list of units into a list of their locations, ready to pass to attempt_upgrade or attempt_remove
+        """
+        return [[unit.x, unit.y] for unit in units]
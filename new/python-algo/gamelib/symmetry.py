@@ -0,0 +1,137 @@
+from .transposition import TranspositionTable
+from .bitboard import ARENA_SIZE
+
+# TOP_RIGHT <-> TOP_LEFT, BOTTOM_LEFT <-> BOTTOM_RIGHT, see the GameMap edge constants
+_MIRRORED_EDGES = [1, 0, 3, 2]
+
+def mirror_location(location):
+    """Reflects a location across the vertical center line of the arena
+
+    Args:
+        location: A map location, [x, y]
+
+    Returns:
+        The mirrored location, [27 - x, y]
+
+    """
+    return [ARENA_SIZE - 1 - location[0], location[1]]
+
+def mirror_edge(edge):
+    """Gets the edge on the other side of the vertical center line
+
+    Args:
+        edge: One of the GameMap edge constants, such as game_map.TOP_LEFT
+
+    Returns:
+        The mirrored edge constant, for example game_map.TOP_RIGHT for game_map.TOP_LEFT
+
+    """
+    return _MIRRORED_EDGES[edge]
+
+def mirror_path(path):
+    """Reflects every location in a path. Returns None for a None path
+
+    Note that on a symmetric board the mirror of a unit's path is not always the path a unit at the
+    mirrored location takes, since the path finder breaks ties the same way on both sides.
+    """
+    if path is None:
+        return None
+    return [[ARENA_SIZE - 1 - x, y] for x, y in path]
+
+def _structure_signature(game_map, location):
+    for unit in game_map[location]:
+        if unit.stationary:
+            return (unit.unit_type, unit.player_index, unit.upgraded)
+    return None
+
+def is_mirror_symmetric(game_map, region=None, compare_units=True):
+    """Checks if the structures on the board are the same on both sides of the vertical center line
+
+    Args:
+        game_map: The GameMap to check
+        region: A list of locations to restrict the check to. Each location is compared with its mirror. Defaults to the whole arena
+        compare_units: If True, structures must also match in type, owner and upgrade state.
+            If False, only which tiles are blocked is compared, which is all pathing depends on.
+
+    Returns:
+        True if the layout, or the given region of it, is mirror symmetric
+
+    """
+    if region is None and not compare_units:
+        structures, mirrored = game_map.get_structure_masks()
+        return structures == mirrored
+
+    if region is None:
+        region = [location for location in game_map if location[0] < game_map.HALF_ARENA]
+    for location in region:
+        mirrored = mirror_location(location)
+        own = _structure_signature(game_map, location)
+        other = _structure_signature(game_map, mirrored)
+        if compare_units:
+            if own != other:
+                return False
+        elif (own is None) != (other is None):
+            return False
+    return True
+
+
+class MirrorCache:
+    """Memoizes per location evaluations, sharing them between mirrored locations when the board allows it
+
+    The symmetry of the board, or of the given region, is checked once when the cache is created.
+    If it is symmetric, a result computed for [x, y] is reused for [27 - x, y] after passing it
+    through mirror_result. Results are only valid for the board the cache was created for.
+
+    Example::
+
+        cache = MirrorCache(game_state.game_map)
+        damage = cache.get(location, lambda loc: evaluate_damage(game_state, loc))
+
+    Attributes :
+        * symmetric (bool): Whether the board was found to be mirror symmetric
+        * mirror_result (function): Converts a result for a location into the result for its mirror
+
+    """
+    def __init__(self, game_map, mirror_result=None, region=None, compare_units=True, max_entries=None):
+        """Checks the symmetry of the board
+
+        Args:
+            game_map: The GameMap the results are computed on
+            mirror_result: A function converting a result to its mirror image. Defaults to returning the result unchanged,
+                which is right for scalars like damage or path length
+            region: Only require the board to be symmetric on these locations, see is_mirror_symmetric
+            compare_units: If False, only the blocked tiles need to be symmetric, which is enough for pathing results
+            max_entries: The maximum number of results to keep, None for no limit
+
+        """
+        self.symmetric = is_mirror_symmetric(game_map, region, compare_units)
+        self.mirror_result = mirror_result if mirror_result is not None else (lambda result: result)
+        self._table = TranspositionTable(max_entries=max_entries)
+
+    def get(self, location, compute, edge=None):
+        """Gets the result for a location, computing it only if neither it nor its mirror is known
+
+        Args:
+            location: The location the result is for
+            compute: A function taking the location (and edge, if one was given) that performs the evaluation
+            edge: An optional edge constant the result depends on. It is mirrored along with the location
+
+        Returns:
+            The result for the location
+
+        """
+        x, y = location
+        key = (x, y, edge)
+        table = self._table
+        if key in table:
+            return table.get(key)
+        if self.symmetric:
+            mirrored_edge = None if edge is None else mirror_edge(edge)
+            mirrored_key = (ARENA_SIZE - 1 - x, y, mirrored_edge)
+            if mirrored_key in table:
+                result = self.mirror_result(table.get(mirrored_key))
+                table.store(key, result)
+                return result
+        result = compute(location) if edge is None else compute(location, edge)
+        table.store(key, result)
+        return result
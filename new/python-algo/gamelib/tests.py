@@ -213,7 +213,24 @@ class BasicTests(unittest.TestCase):
         self.assertEqual(True, game.attempt_spawn("DF", [[13, 6]]), "We cannot spawn a tower!")
         self.assertEqual(2, game.attempt_spawn("SI", [[13, 0], [13, 0], [13, 5]]), "More or less than 2 units were spawned!")
         self.assertEqual([("DF", 13, 6)], game._build_stack, "Build queue is wrong!")
-        self.assertEqual([("SI", 13, 0), ("SI", 13, 0), ("SI", 13, 0)], game._deploy_stack, "Deploy queue is wrong!")
+        self.assertEqual([("SI", 13, 0, 1), ("SI", 13, 0, 1), ("SI", 13, 0, 1)], game._deploy_stack, "Deploy queue is wrong!")
+
+    def test_bulk_spawning(self):
+        import io
+        import contextlib
+        game = self.make_turn_0_map()
+        self.assertEqual(5, game.attempt_spawn("PI", [13, 0], 100), "Should spawn as many pings as we can afford")
+        self.assertEqual(0, game.get_resource(game.MP))
+        self.assertEqual([("PI", 13, 0, 5)], game._deploy_stack, "Bulk spawn should be one deploy entry")
+        self.assertEqual(5, len(game.game_map[13, 0]), "Every spawned unit should be on the map")
+        self.assertEqual(1, game.attempt_spawn("DF", [13, 6], 10), "Only one structure fits on a tile")
+
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            game.submit_turn()
+        build, deploy = output.getvalue().splitlines()
+        self.assertEqual([["DF", 13, 6]], json.loads(build))
+        self.assertEqual([["PI", 13, 0]] * 5, json.loads(deploy), "Engine should still get one command per unit")
 
     def test_trivial_functions(self):
         game = self.make_turn_0_map()
@@ -275,3 +292,392 @@ class BasicTests(unittest.TestCase):
         actual = game.project_future_MP(turns)
         self.assertAlmostEqual(actual, expected, 0, "Expected {} MP {} turns from now, got {}".format(expected, turns, actual))
 
+
+    def test_zobrist_hash(self):
+        game = self.make_turn_0_map()
+        other = self.make_turn_0_map()
+        self.assertEqual(0, game.game_map.zobrist_hash, "An empty board should hash to 0")
+
+        game.game_map.add_unit("FF", [13,5])
+        game.game_map.add_unit("DF", [10,6])
+        game.game_map.add_unit("PI", [13,0])
+        game.game_map.add_unit("PI", [13,0])
+        other.game_map.add_unit("PI", [13,0])
+        other.game_map.add_unit("DF", [10,6])
+        other.game_map.add_unit("PI", [13,0])
+        other.game_map.add_unit("FF", [13,5])
+        self.assertEqual(game.game_map.zobrist_hash, other.game_map.zobrist_hash, "Hash depends on spawn order")
+
+        before = game.game_map.zobrist_hash
+        game.game_map.upgrade_unit([10,6])
+        self.assertNotEqual(before, game.game_map.zobrist_hash, "Upgrading should change the hash")
+        game.game_map.add_unit("FF", [20,20], 1)
+        game.game_map.remove_unit([20,20])
+        game.game_map.remove_unit([13,0])
+        other.game_map.remove_unit([13,0])
+        other.game_map.upgrade_unit([10,6])
+        self.assertEqual(game.game_map.zobrist_hash, other.game_map.zobrist_hash, "Hash is not maintained by remove_unit")
+
+    def test_zobrist_hash_stacked(self):
+        from .transposition import tile_hash
+        config = self.make_turn_0_map().config
+        turn = {"p2Units": [[[13, 20, 75.0, "1"]], [], [], [[14, 27, 15.0, str(i)] for i in range(100)], [[14, 27, 5.0, "x"]], [], [], []],
+                "turnInfo": [1, 3, -1], "p1Stats": [30.0, 25.0, 5.0, 0], "p2Stats": [30.0, 25.0, 5.0, 0],
+                "p1Units": [[], [], [], [[13, 0, 15.0, str(i)] for i in range(100)], [], [[13, 0, 40.0, str(i)] for i in range(40)], [], []], "events": {}}
+        game = GameState(config, json.dumps(turn))
+        game_map = game.game_map
+
+        def recompute():
+            result = 0
+            for x in range(game_map.ARENA_SIZE):
+                for y in range(game_map.ARENA_SIZE):
+                    if game_map.in_arena_bounds([x, y]):
+                        result ^= tile_hash(game_map[x, y], x, y)
+            return result
+        self.assertEqual(140, len(game_map[13, 0]))
+        self.assertEqual(recompute(), game_map.zobrist_hash, "Hash of a parsed stack should match hashing the board from scratch")
+
+        game_map.add_unit("PI", [13, 0])
+        game_map.add_unit("FF", [14, 27], 1)
+        game_map.add_unit("PI", [14, 27], 1)
+        self.assertEqual(recompute(), game_map.zobrist_hash, "Hash should stay in sync after replacing a stacked tile")
+
+    def test_transposition_table(self):
+        from .transposition import TranspositionTable
+        table = TranspositionTable(max_entries=2)
+        table.store(1, "a")
+        table.store(2, "b")
+        self.assertEqual("a", table.get(1))
+        table.store(3, "c")
+        self.assertNotIn(2, table, "The least recently used entry should be evicted")
+        self.assertEqual(2, len(table))
+        self.assertEqual("d", table.lookup_or_compute(4, lambda: "d"))
+        self.assertEqual("d", table.lookup_or_compute(4, lambda: "e"))
+        self.assertEqual(2, table.hits)
+        self.assertEqual(2, table.evictions)
+
+        table = TranspositionTable(max_entries=None, max_bytes=100, sizeof=lambda value: value)
+        table.store("x", 60)
+        table.store("y", 60)
+        self.assertEqual(["y"], [key for key in ["x", "y"] if key in table], "Memory limit was not enforced")
+
+    def test_transaction(self):
+        game = self.make_turn_0_map()
+        game.attempt_spawn("FF", [[13, 5]])
+        start_hash = game.game_map.zobrist_hash
+        start_resources = game.get_resources()
+
+        with game.transaction() as t:
+            game.attempt_spawn("DF", [[13, 6]])
+            game.attempt_upgrade([13, 5])
+            with game.transaction():
+                game.attempt_spawn("SI", [13, 0], 2)
+            self.assertEqual([("SI", 13, 0, 2)], game._deploy_stack)
+            t.rollback()
+        self.assertEqual(start_resources, game.get_resources(), "Resources were not rolled back")
+        self.assertEqual(start_hash, game.game_map.zobrist_hash, "Map hash was not rolled back")
+        self.assertEqual([("FF", 13, 5)], game._build_stack, "Build queue was not rolled back")
+        self.assertEqual([], game._deploy_stack, "Deploy queue was not rolled back")
+        self.assertEqual(0, len(game.game_map[13, 6]), "Spawned structure was not removed")
+        self.assertFalse(game.game_map[13, 5][0].upgraded, "Upgrade was not undone")
+        self.assertEqual(75, game.game_map[13, 5][0].max_health, "Upgrade was not undone")
+
+        with game.transaction():
+            game.attempt_spawn("DF", [[13, 6]])
+        self.assertEqual(1, len(game.game_map[13, 6]), "Committed changes should be kept")
+        self.assertIsNone(game.game_map._journal)
+        t.rollback()
+        self.assertEqual(1, len(game.game_map[13, 6]), "Rolling back a closed transaction should do nothing")
+
+    def test_mirror_symmetry(self):
+        from .symmetry import is_mirror_symmetric, MirrorCache
+        game = self.make_turn_0_map()
+        for location in [[3, 12], [6, 10], [10, 8]]:
+            game.game_map.add_unit("FF", location)
+            game.game_map.add_unit("FF", [27 - location[0], location[1]])
+        game.game_map.add_unit("DF", [5, 11])
+        game.game_map.add_unit("DF", [22, 11], 1)
+        self.assertTrue(is_mirror_symmetric(game.game_map, compare_units=False))
+        self.assertFalse(is_mirror_symmetric(game.game_map), "Owners differ so the units are not symmetric")
+        self.assertTrue(is_mirror_symmetric(game.game_map, region=[[3, 12], [6, 10]]))
+
+        # a symmetric pocket, units in it walk the same way from both sides instead of mirrored paths
+        for location in [[11, 2], [11, 3], [11, 4], [12, 4], [13, 2], [13, 5], [12, 6]]:
+            game.game_map.add_unit("FF", location)
+            game.game_map.add_unit("FF", [27 - location[0], location[1]])
+        right = game.find_path_to_edge([14, 1])
+        left = game.find_path_to_edge([13, 1])
+        self.assertEqual([[14, 1], [15, 1], [15, 2], [15, 3]], right[:4])
+        self.assertEqual([[13, 1], [14, 1], [15, 1], [15, 2]], left[:4], "The cached right path should not be mirrored")
+        self.assertEqual(1, len(game._shortest_path_finder._field_cache), "Both sides should share one distance field")
+
+        cache = MirrorCache(game.game_map, compare_units=False)
+        calls = []
+        def compute(location):
+            calls.append(location)
+            return len(game.find_path_to_edge(location))
+        self.assertEqual(len(left), cache.get([13, 1], compute))
+        self.assertEqual(len(left), cache.get([14, 1], compute))
+        self.assertEqual([[13, 1]], calls, "The mirrored result should have been reused")
+
+    def test_enemy_view(self):
+        game = self.make_turn_0_map()
+        game.game_map.add_unit("DF", [13, 5], 0)
+        game.game_map.add_unit("FF", [13, 20], 1)
+        game.attempt_spawn("FF", [[12, 2]])
+        view = game.enemy_view()
+
+        self.assertIs(game.game_map[13, 20], view.game_map[14, 7], "The view should share tiles with the real map")
+        self.assertTrue(view.contains_stationary_unit([14, 7]))
+        self.assertEqual(25, view.get_resource(view.SP), "The enemy should have 25 SP")
+        self.assertEqual(24, view.get_resource(view.SP, 1), "We should have 24 SP left")
+        self.assertTrue(view.can_spawn("PI", [13, 0]), "The enemy should be able to spawn on their edge")
+        self.assertFalse(view.can_spawn("FF", [14, 22]), "The enemy cannot build on our side")
+        self.assertEqual(view.game_map.TOP_RIGHT, view.get_target_edge([13, 0]))
+
+        real_path = game.find_path_to_edge([14, 27], game.game_map.BOTTOM_LEFT)
+        view_path = view.find_path_to_edge([13, 0])
+        self.assertEqual([[27 - x, 27 - y] for x, y in real_path], view_path, "The view path should be the rotated real path")
+
+        attackers = view.get_attackers([14, 21], 0)
+        self.assertEqual(1, len(attackers), "Our turret should threaten the enemy")
+        self.assertEqual(0, attackers[0].player_index, "Units keep their real player index")
+        self.assertIs(game, view.enemy_view())
+
+    def test_attack_prediction(self):
+        from .prediction import AttackPredictor
+        game = self.make_turn_0_map()
+        predictor = AttackPredictor(game.config)
+        predictions = predictor.predict(game)
+        self.assertEqual(28, len(predictions), "Every enemy edge location should be predicted")
+        self.assertEqual(5, predictions[0].units, "The enemy can afford 5 pings")
+        self.assertEqual(5, predictions[0].breach_damage, "With no defenses every ping scores")
+        for prediction in predictions:
+            self.assertEqual(game.find_path_to_edge(prediction.spawn_location), prediction.path, "Batched path differs")
+
+        game.game_map.add_unit("DF", [13, 1], 0)
+        game.game_map.add_unit("FF", [14, 27], 1)
+        predictions = predictor.predict(game)
+        self.assertEqual(27, len(predictions), "Blocked spawn locations should be skipped")
+        self.assertGreater(predictions[-1].path_damage, 0, "The turret should damage some paths")
+        self.assertLessEqual(predictions[-1].breach_damage, predictions[0].breach_damage, "Predictions should be ranked")
+        ranked = predictor.rank_breach_points(predictions)
+        self.assertEqual(sorted(ranked, key=lambda entry: -entry[1]), ranked)
+        self.assertAlmostEqual(predictor.predict(game, turns_ahead=1)[0].units, 8, delta=1, msg="Projected MP is not used")
+
+    def test_build_plan(self):
+        from .build_plan import BuildPlan
+        game = self.make_turn_0_map()
+        plan = BuildPlan()
+        plan.add("FF", [[3, 13], [4, 13]])
+        plan.add("DF", [3, 12], upgrade=True, priority=1)
+        plan.add("EF", [[13, 2], [14, 2]], priority=-1)
+        game.attempt_spawn("FF", [4, 13])
+
+        self.assertEqual([("DF", [3, 12], False), ("DF", [3, 12], True), ("FF", [3, 13], False), ("EF", [13, 2], False), ("EF", [14, 2], False)],
+                         plan.get_missing(game), "Plan should skip built structures and follow priority")
+        self.assertEqual(3, plan.execute(game, budget=10), "Should build until the budget runs out")
+        self.assertEqual(17, game.get_resource(game.SP))
+        self.assertEqual([("EF", [13, 2], False), ("EF", [14, 2], False)], plan.get_missing(game))
+        self.assertTrue(game.game_map[3, 12][0].upgraded)
+
+    def test_census(self):
+        config = self.make_turn_0_map().config
+        turn = {"p2Units": [[[14, 20, 75.0, "1"]], [], [[10, 17, 90.0, "2"], [12, 18, 90.0, "3"], [20, 15, 90.0, "4"]], [], [], [], [[12, 18, 0, "5"]], [[10, 17, 0, "6"]]],
+                "turnInfo": [0, 3, -1], "p1Stats": [30.0, 25.0, 5.0, 0], "p2Stats": [30.0, 25.0, 5.0, 0],
+                "p1Units": [[[3, 12, 75.0, "7"]], [], [], [[13, 0, 15.0, "8"]], [], [], [], []], "events": {}}
+        game = GameState(config, json.dumps(turn))
+        census = game.census
+        self.assertEqual(4, census.count(1))
+        self.assertEqual(3, census.count(1, "DF"))
+        self.assertEqual(1, census.count(1, "DF", upgraded=True))
+        self.assertEqual(1, census.count(0), "Mobile units should not be counted")
+        self.assertEqual({(10, 17)}, census.get_locations(1, upgraded=True))
+        self.assertEqual({(12, 18)}, census.get_pending_removal(1))
+        self.assertEqual(2, census.count_in_region(1, range(10, 17), range(14, 20), "DF"))
+        self.assertEqual(2, census.count_in_region(1, [10, 20], None, "DF"), "Non contiguous columns should still work")
+        self.assertEqual(1, census.count_in_row(1, 20))
+        self.assertEqual(2, census.count_in_column(1, 10) + census.count_in_column(1, 12))
+
+    def test_structure_registry(self):
+        from .registry import StructureRegistry
+        game = self.make_turn_0_map()
+        game.attempt_spawn("DF", [[3, 12], [24, 12], [13, 5]])
+        game.attempt_spawn("FF", [[4, 13]])
+        game.game_map.add_unit("DF", [14, 20], 1)
+        game.game_map[13, 5][0].health = 10
+        game.game_map[4, 13][0].pending_removal = True
+        game.attempt_upgrade([24, 12])
+
+        registry = StructureRegistry(game.game_map, priority=lambda unit: -unit.y)
+        self.assertEqual([[4, 13], [3, 12], [24, 12], [13, 5]], registry.get_locations(registry.structures(0)))
+        self.assertEqual([[3, 12], [13, 5]], registry.get_locations(registry.not_upgraded(0, "DF")))
+        self.assertEqual([[13, 5]], registry.get_locations(registry.damaged(0, 0.5)))
+        self.assertEqual([[4, 13]], registry.get_locations(registry.pending_removal(0)))
+        self.assertEqual([[14, 20]], registry.get_locations(registry.structures(1)))
+
+        with game.transaction() as t:
+            game.game_map.remove_unit([3, 12])
+            self.assertEqual(3, len(registry.structures(0)))
+            t.rollback()
+        self.assertEqual(4, len(registry.structures(0)), "Rolling back should restore the registry")
+
+    def test_resource_allocator(self):
+        from .allocation import ResourceAllocator
+        game = self.make_turn_0_map()
+        game.attempt_spawn("DF", [3, 12])
+        allocator = ResourceAllocator()
+        allocator.add("FF", [[3, 13], [4, 13], [5, 13], [6, 13]], value=1)
+        allocator.add("DF", [3, 12], value=5, upgrade=True)
+        allocator.add("DF", [24, 12], value=3)
+        allocator.add("DF", [24, 12], value=5, upgrade=True)
+        allocator.add("EF", [24, 12], value=2)
+        allocator.add("PI", [13, 0], value=2, num=3)
+
+        actions, value = allocator.solve(game, SP=10, MP=3)
+        self.assertEqual(15, value, "Should prefer the upgrades over the cheap walls")
+        self.assertEqual([("DF", [24, 12], False, 1), ("DF", [3, 12], True, 1), ("DF", [24, 12], True, 1), ("PI", [13, 0], False, 3)], actions)
+        self.assertEqual(13, allocator.solve(game, SP=10, MP=2)[1], "Should skip mobile units we cannot afford")
+
+        allocator.execute(game, SP=10, MP=3)
+        self.assertEqual(13, game.get_resource(game.SP))
+        self.assertTrue(game.game_map[24, 12][0].upgraded)
+        self.assertEqual(3, len(game.game_map[13, 0]))
+
+    def test_resource_forecaster(self):
+        from .forecast import ResourceForecaster
+        config = self.make_turn_0_map().config
+        turn = {"p2Units": [[], [], [], [], [], [], [], []], "turnInfo": [0, 3, -1], "p1Stats": [30.0, 25.0, 5.0, 0], "p2Stats": [30.0, 10.0, 12.0, 0],
+                "p1Units": [[], [[13, 2, 30.0, "1"], [14, 2, 30.0, "2"]], [], [], [], [], [], [[14, 2, 0, "3"]]], "events": {}}
+        game = GameState(config, json.dumps(turn))
+        forecaster = ResourceForecaster(game)
+
+        self.assertEqual([7.0, 1], [forecaster.get_income(game.SP), forecaster.get_income(game.MP)], "Factories should add to the income")
+        self.assertEqual([5.0, 0], [forecaster.get_income(game.SP, 1), forecaster.get_income(game.MP, 1)])
+        for turns in [1, 2, 15, 40]:
+            self.assertEqual(game.project_future_MP(turns, 1), forecaster.resource_after(game.MP, turns, 1))
+        self.assertEqual(25 + 3 * 7, forecaster.resource_after(game.SP, 3))
+
+        self.assertEqual(0, forecaster.turns_until(game.SP, 20))
+        self.assertEqual(2, forecaster.turns_until(game.SP, 39))
+        for amount in [5.0, 9.5, 12.1, 30]:
+            turns = forecaster.turns_until(game.MP, amount)
+            self.assertGreaterEqual(forecaster.resource_after(game.MP, turns), amount)
+            self.assertTrue(all(forecaster.resource_after(game.MP, earlier) < amount for earlier in range(turns)))
+        self.assertIsNone(forecaster.turns_until(game.MP, 10000))
+        self.assertEqual(forecaster.turns_until(game.MP, 3 * 8), forecaster.turns_until_affordable("EI", 8))
+
+    def test_placement_evaluator(self):
+        from .placement import PlacementEvaluator
+        game = self.make_turn_0_map()
+        game.attempt_spawn("FF", [[x, 13] for x in range(3, 28)])
+        evaluator = PlacementEvaluator(game.config)
+        path = game.find_path_to_edge([14, 27])
+        on_path = path[len(path) // 2]
+
+        impacts = evaluator.evaluate(game, [on_path, [0, 0], [3, 13], [14, 8]], "FF")
+        self.assertIsNone(impacts[1], "Out of bounds candidates should be skipped")
+        self.assertIsNone(impacts[2], "Occupied candidates should be skipped")
+        self.assertEqual(0, impacts[3].changed_count, "A tile no path goes through should not change any path")
+        self.assertGreater(impacts[0].changed_count, 0)
+
+        with game.transaction() as transaction:
+            game.game_map.add_unit("FF", on_path, 0)
+            new_path = game.find_path_to_edge([14, 27])
+            transaction.rollback()
+        self.assertNotEqual(path, new_path)
+        self.assertEqual(25, len(game.game_map.get_structures(0)), "The map should be restored after evaluating")
+
+        turret = evaluator.evaluate(game, [[14, 12]], "DF")[0]
+        self.assertEqual(0, turret.path_length_change)
+        self.assertGreater(turret.damage_change, 0, "Turrets should add damage along the paths in their range")
+
+    def test_maze_builder(self):
+        from .maze import MazeBuilder
+        from .bitboard import reaches_edge
+        game = self.make_turn_0_map()
+        game.attempt_spawn("FF", [[x, 13] for x in range(4, 28)])
+        game.attempt_spawn("DF", [[3, 10], [5, 8]])
+        structures = game.game_map.get_structure_masks()
+        open_tiles = [[4, 9], [5, 9]]
+        builder = MazeBuilder(game.config)
+
+        walls = builder.search(game, budget=3, open_tiles=open_tiles, time_limit=5)
+        self.assertTrue(0 < len(walls) <= 3, "Should stay within the budget")
+        self.assertEqual(structures, game.game_map.get_structure_masks(), "The map should be restored after searching")
+        for tile in open_tiles:
+            self.assertNotIn(tile, walls)
+
+        before = builder.evaluator.get_enemy_paths(game)
+        game.attempt_spawn("FF", walls)
+        for tile in open_tiles:
+            self.assertTrue(reaches_edge(game.game_map, tile), "Open tiles should keep a path to their edge")
+        after = builder.evaluator.get_enemy_paths(game)
+        self.assertGreater(sum(len(path) for _, _, path in after), sum(len(path) for _, _, path in before))
+
+    def test_coverage_optimizer(self):
+        from .coverage import CoverageOptimizer
+        game = self.make_turn_0_map()
+        game.attempt_spawn("FF", [[x, 13] for x in range(4, 24)])
+        optimizer = CoverageOptimizer(game.config)
+
+        masks = optimizer.get_coverage_masks(2.5)
+        in_range = [[x, y] for x in range(28) for y in range(28) if masks[12 * 28 + 10] >> (y * 28 + x) & 1]
+        self.assertEqual(sorted(game.game_map.get_locations_in_range([10, 12], 2.5)), sorted(in_range))
+
+        predictions = optimizer.predictor.predict(game)
+        weights = optimizer.get_path_weights(game, predictions)
+        chosen = optimizer.solve(game, budget=2, predictions=predictions)
+        self.assertEqual(1, len(chosen), "Should stay within the budget")
+        best = max(sum(weights.get(index, 0) for index in range(784) if masks[y * 28 + x] >> index & 1)
+                   for x, y in [[x, y] for y in range(14) for x in range(28)]
+                   if game.game_map.in_arena_bounds([x, y]) and y * 28 + x not in weights and not game.contains_stationary_unit([x, y]))
+        x, y = chosen[0]
+        self.assertEqual(best, sum(weights.get(index, 0) for index in range(784) if masks[y * 28 + x] >> index & 1))
+        for x, y in optimizer.solve(game, budget=10, predictions=predictions, redundancy=2):
+            self.assertNotIn(y * 28 + x, weights, "Turrets should not be placed on the paths they cover")
+
+    def test_seed_from_environment(self):
+        import os
+        import random
+        from .algocore import AlgoCore
+        from .util import SEED_VARIABLE, get_seed
+        previous = os.environ.pop(SEED_VARIABLE, None)
+        try:
+            self.assertIsNone(get_seed())
+            os.environ[SEED_VARIABLE] = "not a seed"
+            self.assertIsNone(get_seed())
+            os.environ[SEED_VARIABLE] = "1234"
+            self.assertEqual(1234, get_seed())
+            AlgoCore()
+            first = random.random()
+            AlgoCore()
+            self.assertEqual(first, random.random(), "Algos started with the same seed should make the same random choices")
+        finally:
+            os.environ.pop(SEED_VARIABLE, None)
+            if previous is not None:
+                os.environ[SEED_VARIABLE] = previous
+
+    def test_bitboard_reachability(self):
+        from . import bitboard
+        game = self.make_turn_0_map()
+        game_map = game.game_map
+        self.assertEqual(bitboard.location_mask(list(game_map)), bitboard.ARENA_MASK)
+        for edge in range(4):
+            self.assertEqual(bitboard.location_mask(game_map.get_edge_locations(edge)), bitboard.EDGE_MASKS[edge])
+
+        # Wall off the bottom left corner of our half
+        game.attempt_spawn("FF", [[x, 4] for x in range(9, 14)] + [[13, y] for y in range(5)])
+        open_mask = bitboard.get_open_mask(game_map)
+        pocket = bitboard.flood_fill(bitboard.location_mask([[11, 2]]), open_mask)
+        self.assertEqual(sorted([x, y] for x, y in game_map if y < 4 and 13 - y <= x < 13), sorted(bitboard.mask_locations(pocket)))
+        self.assertEqual([12, 3], bitboard.most_ideal(pocket, game_map.TOP_RIGHT), "Should pick the same self destruct tile as the path finder")
+        self.assertEqual(game.find_path_to_edge([10, 3])[-1], bitboard.most_ideal(pocket, game_map.TOP_RIGHT))
+        self.assertFalse(bitboard.reaches_edge(game_map, [10, 3]))
+        self.assertTrue(bitboard.reaches_edge(game_map, [20, 6]))
+        self.assertTrue(bitboard.reaches_edge(game_map, [10, 3], game_map.BOTTOM_LEFT))
+
+        scoring = bitboard.mask_locations(bitboard.get_scoring_spawns(game_map, 0))
+        self.assertNotIn([12, 1], scoring)
+        self.assertIn([14, 0], scoring)
+        self.assertEqual(28, len(bitboard.mask_locations(bitboard.get_scoring_spawns(game_map, 1))))
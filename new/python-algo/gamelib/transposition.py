@@ -0,0 +1,187 @@
+import sys
+from collections import OrderedDict
+
+
+_MASK_64 = (1 << 64) - 1
+_zobrist_keys = {}
+
+def zobrist_key(x, y, type_index, player_index, variant=0):
+    """Gets the Zobrist key for a single unit on the board
+
+    Keys are generated deterministically, so the same board hashes to the same
+    value in every game and in every GameMap instance.
+
+    Args:
+        x: The x coordinate of the unit
+        y: The y coordinate of the unit
+        type_index: The index of the unit type, see UNIT_TYPE_TO_INDEX in game_state
+        player_index: The player controlling the unit, 0 for you 1 for the enemy
+        variant: 1 for an upgraded structure, or the stacking order of a mobile unit on its tile
+
+    Returns:
+        A 64 bit integer key
+
+    """
+    index = ((((x * 28 + y) * 8 + type_index) * 2 + player_index) << 16) | variant
+    key = _zobrist_keys.get(index)
+    if key is None:
+        # splitmix64 finalizer, cheap and well distributed for sequential indices
+        z = (index + 0x9E3779B97F4A7C15) & _MASK_64
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK_64
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK_64
+        key = z ^ (z >> 31)
+        _zobrist_keys[index] = key
+    return key
+
+def tile_hash(units, x, y):
+    """Gets the combined Zobrist key of every unit on a tile
+
+    Structures are keyed by type, owner and upgrade state. Mobile units are keyed by
+    type, owner and how many of the same kind are already stacked on the tile, so the
+    result does not depend on the order units were added in. Health is not hashed.
+
+    Args:
+        units: The list of GameUnits on the tile
+        x: The x coordinate of the tile
+        y: The y coordinate of the tile
+
+    Returns:
+        A 64 bit integer, 0 for an empty tile
+
+    """
+    result = 0
+    stacked = None
+    for unit in units:
+        type_index = unit.type_index
+        if unit.stationary:
+            result ^= zobrist_key(x, y, type_index, unit.player_index, 1 if unit.upgraded else 0)
+        else:
+            if stacked is None:
+                stacked = {}
+            kind = (type_index, unit.player_index)
+            ordinal = stacked.get(kind, 0)
+            stacked[kind] = ordinal + 1
+            result ^= zobrist_key(x, y, type_index, unit.player_index, ordinal)
+    return result
+
+
+class TranspositionTable:
+    """A bounded cache that memoizes evaluations by board hash
+
+    Keys are usually game_map.zobrist_hash, or a tuple containing it along with whatever
+    else the evaluation depends on (a start location, a target edge, a player index).
+    When either limit is exceeded the least recently used entries are evicted.
+
+    Attributes :
+        * max_entries (int): The maximum number of stored entries, None for no limit
+        * max_bytes (int): The approximate maximum memory used by stored values, None for no limit
+        * hits (int): The number of lookups that found a stored value
+        * misses (int): The number of lookups that did not
+        * evictions (int): The number of entries removed to stay within the limits
+
+    """
+    def __init__(self, max_entries=4096, max_bytes=None, sizeof=None):
+        """Creates an empty table
+
+        Args:
+            max_entries: The maximum number of stored entries, None for no limit
+            max_bytes: The approximate maximum memory of stored values, None for no limit
+            sizeof: A function estimating the size in bytes of a value, sys.getsizeof by default
+
+        """
+        if max_entries is not None and max_entries < 1:
+            raise ValueError("max_entries must be at least 1, got {}".format(max_entries))
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof if sizeof is not None else sys.getsizeof
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        """Looks up a stored evaluation
+
+        Args:
+            key: The board hash, or a tuple containing it
+
+        Returns:
+            The stored value, or default if nothing is stored for key
+
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def store(self, key, value):
+        """Stores an evaluation, evicting old entries if the table is full
+
+        Args:
+            key: The board hash, or a tuple containing it
+            value: The result of the evaluation
+
+        """
+        size = self._sizeof(value) if self.max_bytes is not None else 0
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old[1]
+        self._entries[key] = (value, size)
+        self._bytes += size
+        self._evict()
+
+    def lookup_or_compute(self, key, compute):
+        """Returns the stored evaluation for key, computing and storing it if it is missing
+
+        Args:
+            key: The board hash, or a tuple containing it
+            compute: A function taking no arguments that performs the evaluation
+
+        Returns:
+            The value stored under key
+
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+        self.misses += 1
+        value = compute()
+        self.store(key, value)
+        return value
+
+    def discard(self, key):
+        """Removes a stored evaluation if there is one
+        """
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old[1]
+
+    def clear(self):
+        """Removes every stored evaluation
+        """
+        self._entries.clear()
+        self._bytes = 0
+
+    def memory_used(self):
+        """Gets the approximate size of the stored values in bytes. Always 0 when max_bytes is None
+        """
+        return self._bytes
+
+    def _evict(self):
+        while self._entries and ((self.max_entries is not None and len(self._entries) > self.max_entries) or
+                                 (self.max_bytes is not None and self._bytes > self.max_bytes)):
+            _, (_, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
@@ -14,6 +14,7 @@ class GameUnit:
 
     Attributes :
         * unit_type (string): This unit's type
+        * type_index (integer): The index of this unit's type, see UNIT_TYPE_TO_INDEX in game_state
         * config (JSON): Contains information about the game
         * player_index (integer): The player that controls this unit. 0 for you, 1 for your opponent.
         * x (integer): The x coordinate of the unit
@@ -48,7 +49,8 @@ class GameUnit:
 
     def __serialize_type(self):
         from .game_state import STRUCTURE_TYPES, UNIT_TYPE_TO_INDEX, FACTORY
-        type_config = self.config["unitInformation"][UNIT_TYPE_TO_INDEX[self.unit_type]]
+        self.type_index = UNIT_TYPE_TO_INDEX[self.unit_type]
+        type_config = self.config["unitInformation"][self.type_index]
         self.stationary = type_config["unitCategory"] == 0
         self.speed = type_config.get("speed", 0)
         self.damage_f = type_config.get("attackDamageTower", 0)
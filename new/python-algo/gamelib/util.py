@@ -1,8 +1,12 @@
+import os
 import sys
 
 
 BANNER_TEXT = "---------------- Starting Your Algo --------------------"
 
+# Game runners can set this to make an algo's random choices repeatable
+SEED_VARIABLE = "TERMINAL_SEED"
+
 
 def get_command():
     """Gets input from stdin
@@ -29,6 +33,22 @@ def send_command(cmd):
     sys.stdout.write(cmd.strip() + "\n")
     sys.stdout.flush()
 
+def get_seed():
+    """Gets the random seed a game runner asked for
+
+    Returns:
+        The int in the TERMINAL_SEED environment variable, or None if it is not set or not an int
+
+    """
+    seed = os.environ.get(SEED_VARIABLE)
+    if seed is None:
+        return None
+    try:
+        return int(seed)
+    except ValueError:
+        debug_write("Ignoring {}={}, it is not an int".format(SEED_VARIABLE, seed))
+        return None
+
 def debug_write(*msg):
     """Prints a message to the games debug output
 
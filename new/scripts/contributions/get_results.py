@@ -70,6 +70,16 @@ You can specify how many replays back you would like to run (by date) using the
 
 would run the last 3 games you ran
 
+----------------------------------------------------------------------------------------
+-r: Run the replay files of an arena run
+
+run_arena.py records the games of every run in the arena_runs folder. To summarize only those games,
+and not whatever else was played recently:
+>py scripts/contributions/get_results.py -r
+
+runs the newest arena run. You can also give the name of a run:
+>py scripts/contributions/get_results.py -r 2018-11-08-13-51-45
+
 ----------------------------------------------------------------------------------------
 -avg: Print average data fro a single replay (not very useful right now)
 
@@ -226,6 +236,12 @@ def parse_args():
 		nargs="*",
 		default=[],
 		help="specify a replay file (or multiple) you'd like to analyze\n\n")
+	ap.add_argument(
+		"-r", "--run",
+		nargs='?',
+		const='',
+		default=None,
+		help="summarize only the games of an arena run (a file in arena_runs/), the newest run if no name is given\n\n")
 	ap.add_argument(
 		"-g", "--graph",
 		nargs="*",
@@ -593,8 +609,8 @@ class FileHandler:
 		return self.replays[i]
 
 	def __latest_replays(self, num=1, a=False):
-		replay_dir = os.path.dirname(os.path.realpath(__file__)).replace('scripts\\contributions', '')+'replays\\'
-		files = glob.glob('{}*.replay'.format(replay_dir))
+		replay_dir = os.path.join(get_parent_dir(), 'replays')
+		files = glob.glob(os.path.join(replay_dir, '*.replay'))
 		files = sorted(files, key=os.path.getctime, reverse=True)
 		if a:
 			return files
@@ -630,6 +646,33 @@ class FileHandler:
 			Graph.advance()
 
 
+# the folder holding replays/ and arena_runs/ (two levels above this file)
+def get_parent_dir():
+	return os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), os.pardir, os.pardir))
+
+# gets the replays of the games journaled by a run_arena.py run, so other games in replays/ are left out
+def get_run_replays(run=''):
+	runs_dir = os.path.join(get_parent_dir(), 'arena_runs')
+	if run == '':
+		runs = sorted(glob.glob(os.path.join(runs_dir, '*.jsonl')))
+		if len(runs) == 0:
+			sys.stderr.write('No arena runs found in {}\n'.format(runs_dir))
+			return []
+		path = runs[-1]
+	else:
+		path = run if os.path.isfile(run) else os.path.join(runs_dir, run if run.endswith('.jsonl') else run + '.jsonl')
+
+	replays = []
+	with open(path) as f:
+		for line in f:
+			try:
+				entry = json.loads(line)
+			except ValueError:
+				continue
+			if entry.get('replay') and os.path.exists(entry['replay']):
+				replays.append(entry['replay'])
+	return replays
+
 # displays detailed data for every replay stored in the fileManager fh.
 def run_every_replay_verbose(fh, graphing_enabled, options):
 	for replay in fh.get_replays():
@@ -710,6 +753,12 @@ def get_graph_options(options):
 def main(args):
 	verbose_options, summary_options = get_graph_options(args['graph'])
 
+	if args.get('run') is not None:
+		args['file'] = get_run_replays(args['run'])
+		args['num'] = len(args['file'])
+		if args['num'] == 0:
+			return
+
 	fh = FileHandler()
 	fh.load_files(int(args['num']), args['all'], args['file']) #loads the files - all JSON reading is here
 
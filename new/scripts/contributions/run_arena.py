@@ -52,14 +52,62 @@ algo3
 Lastly, the final argument you can (and should) in combination with each of these
 is -b, for batch_size. This controls how many games can run at one time to keep
 this from melting your computer. The default is 5.
+Each slot starts the next match as soon as its game finishes.
 
 For example:
 >py scripts/contributions/run_arena.py -a -b 6
 
 This would run every single game like before, but 6 games at a time.
 
+You can also pass -t, a timeout in seconds. A game that runs longer is killed along with both
+of its algos and reported as a timeout instead of holding its slot forever:
+>py scripts/contributions/run_arena.py -a -b 6 -t 300
+
 DO NOT RUN WITH A LARGE BATCH SIZE (like >15, depending on your computer) or else it will take forever and crash.
 
+Each pairing is played twice, once from each side, and both algos get the same seed in both games.
+Python algos are seeded by scripts/contributions/seeding/sitecustomize.py, which the arena puts on
+their PYTHONPATH, so no changes to the algos (or their copy of gamelib) are needed. Algos in other
+languages are not seeded, and are listed as such. After the usual results, the
+arena prints each algo's mean score over these pairs, from 0 to 2, with its standard error. Since
+the side and the random choices cancel out within a pair, this separates algos with far fewer games.
+Use --seed to play with different random choices, or --one-side to play each pairing once.
+
+The output of every game (the engine and both algos' debug output) is written to
+arena_logs/<algo1>-vs-<algo2>-<seed>.log as it is printed, instead of being held in memory. Each log
+keeps at most 5MB plus two older parts. Every --status seconds (default 30) the arena prints which turn
+each running game is on, so you can spot a hung game.
+
+Add --dashboard to see a live summary instead of a line per match, redrawn every second: games per
+minute, the average game length, how many slots are busy and how many games are queued, the ETA,
+each algo's win rate so far, and the number of timeouts, errors and crashes. The same numbers are
+written to arena_runs/<run>.metrics.json as the run goes, for other programs to read.
+
+Running many games at once makes them compete for the CPU, which slows down the algos' turns and can
+push slow algos into timeouts. --cpus gives every match its own cores (Linux only), e.g. with 8 cores:
+>py scripts/contributions/run_arena.py -a -b 4 --cpus 2
+runs 4 matches at once, each on 2 cores. --memory 2048 stops a match (the engine and both algos
+together) from using more than 2GB, through a cgroup made by systemd-run. Without one only the engine's
+heap is capped, with java's -Xmx. The CPU time each match used is recorded and shown with its results.
+
+To spread the games over several computers, give the coordinator a shared folder (a network drive,
+or any folder when testing on one computer) and start workers on each computer with the same folder:
+>py scripts/contributions/run_arena.py -a --queue /shared/arena-queue
+>py scripts/contributions/run_arena.py --worker /shared/arena-queue -b 4
+Workers play the games with their own copy of the algos, engine and config, so keep those the same on
+every computer. Replays are copied into the queue folder. If a worker dies its games are given to
+other workers after --lease seconds (default 60), up to --attempts times (default 3). Workers stop when
+every game in the queue is played. Use a new folder for each run, or --resume with the same folder.
+
+Every finished game is saved to arena_ledger.json (next to engine.jar) with a hash of both algo
+folders, the game config and the engine. Running the arena again only plays the pairings where one
+of those changed, and shows the saved results for the rest. Add -r to play every pairing again.
+
+Every run is also recorded in arena_runs/, one line per match as it finishes. If a run is interrupted,
+--resume plays only the matches it had not finished, then summarizes the whole run:
+>py scripts/contributions/run_arena.py --resume -b 6
+resumes the newest run. Pass the name of a file in arena_runs/ to resume an older one.
+
 
 At the end I also run the get_results.py script that outputs some data. I recommend having
 matplotlib installed for graphs, etc.
@@ -73,74 +121,754 @@ If you have questions just ask me on the forums - @Isaac
 import sys
 try:
 	import os
+	import json
+	import queue
 	import subprocess
 	import argparse
 	import itertools
+	import hashlib
+	import math
+	import shutil
+	import socket
+	import re
+	import collections
+	import threading
 	import time
-	import copy
-	import multiprocessing as mp
+	import uuid
 except ImportError as e:
 	print("WARNING: Module not found, full error:\n")
 	print(str(e))
 	sys.exit()
 
+# run_match.py in the scripts folder starts the engine and reads the replays
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+from run_match import Match, kill_process_tree
+
+
+# Get if running in windows OS
+is_windows = sys.platform.startswith('win')
+
+# the folder holding engine.jar, algos/ and replays/ (two levels above this file)
+def get_parent_dir():
+	scripts_dir = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+	return os.path.abspath(os.path.join(scripts_dir, os.pardir))
+
+# the algo folder name from a path to an algo folder or its run file
+def get_algo_name(algo):
+	algo = algo.replace('\\', '/').rstrip('/')
+	if algo.endswith('run.sh') or algo.endswith('run.ps1'):
+		algo = os.path.dirname(algo)
+	return os.path.basename(algo)
+
+# set while the dashboard is shown, so the lines for each match do not scroll it away
+dashboard = False
+
+# games that are running, so they can be killed if the arena is interrupted
+# (they are in their own process groups, so ctrl+c does not reach them)
+active_games = {}
+active_lock = threading.Condition()
+stopping = threading.Event()
+
+# stops the slots from starting new games, then kills the running ones. Their results are not recorded
+# waits up to timeout seconds for the slots to remove the killed games' folders, the slots are daemon threads
+# and would otherwise be stopped with them half cleaned up when the arena exits
+def kill_active_games(timeout=10):
+	stopping.set()
+	with active_lock:
+		for p in active_games:
+			kill_process_tree(p)
+		active_lock.wait_for(lambda: len(active_games) == 0, timeout)
+
+# the command from get_cgroup_launcher, set when --memory can be enforced with a cgroup, which caps a match's engine
+# and both algos together
+cgroup_launcher = None
+
+# the command systemd-run starts a match under to give it a cgroup of its own, None where there is none to use
+def get_cgroup_launcher():
+	if is_windows or shutil.which('systemd-run') is None:
+		return None
+	launcher = ['systemd-run', '--scope', '--quiet'] + ([] if os.geteuid() == 0 else ['--user'])
+	if subprocess.call(launcher + ['true'], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL) != 0:
+		return None
+	return launcher
+
+# cores every match can have to itself, the first cpus_per_match cores for the first slot and so on
+# returns the cores of each slot, fewer slots than batch_size when the cores only fit that many matches
+def get_core_sets(cpus_per_match, batch_size):
+	if cpus_per_match <= 0:
+		return [None] * batch_size
+	if is_windows or not hasattr(os, 'sched_getaffinity') or shutil.which('taskset') is None:
+		print ('WARNING: pinning matches to cores needs taskset (Linux only), --cpus is ignored')
+		return [None] * batch_size
+	cores = sorted(os.sched_getaffinity(0))
+	core_sets = [cores[i:i + cpus_per_match] for i in range(0, len(cores) - cpus_per_match + 1, cpus_per_match)]
+	if len(core_sets) == 0:
+		print ('WARNING: only {} cores are available, --cpus is ignored'.format(len(cores)))
+		return [None] * batch_size
+	if len(core_sets) < batch_size:
+		print ('WARNING: {} cores only fit {} matches with {} cores each, running {} at a time instead of {}'.format(
+			len(cores), len(core_sets), cpus_per_match, len(core_sets), batch_size))
+	return core_sets[:batch_size]
 
-# Runs a single game
-def run_single_game(process_command, algo1, algo2, max_name_len):
-	p = subprocess.Popen(
-		process_command,
-		shell=True,
+# the command a game is started under and the options for its java, so it runs on cores and within memory MB
+# The engine is run by taskset and starts both algos after it, so they are pinned to the same cores. With a cgroup
+# memory caps the whole match, otherwise only the engine's heap is capped (with -Xmx) and the algos are not limited
+def limit_game(cores=None, memory=None):
+	launcher, java_options = [], []
+	if memory is not None:
+		if cgroup_launcher is not None:
+			launcher += cgroup_launcher + ['-p', 'MemoryMax={}M'.format(memory), '-p', 'MemorySwapMax=0']
+		else:
+			java_options.append('-Xmx{}m'.format(memory))
+	if cores is not None:
+		launcher += ['taskset', '-c', ','.join(str(core) for core in cores)]
+	return launcher, java_options
+
+# waits for a game, killing it after timeout seconds, and gets the CPU time used by it, which includes the engine
+# and both algos once they exit. Returns if it timed out and the CPU time in seconds, None where wait4 is not available
+def wait_game(p, timeout=None):
+	if not hasattr(os, 'wait4'):
+		try:
+			p.wait(timeout=timeout)
+			return False, None
+		except subprocess.TimeoutExpired:
+			kill_process_tree(p)
+			p.wait()
+			return True, None
+
+	timed_out = threading.Event()
+	def kill():
+		timed_out.set()
+		kill_process_tree(p)
+	timer = None
+	if timeout is not None:
+		timer = threading.Timer(timeout, kill)
+		timer.daemon = True
+		timer.start()
+	try:
+		pid, status, usage = os.wait4(p.pid, 0)
+	finally:
+		if timer is not None:
+			timer.cancel()
+	p.returncode = -os.WTERMSIG(status) if os.WIFSIGNALED(status) else os.WEXITSTATUS(status)
+	return timed_out.is_set(), usage.ru_utime + usage.ru_stime
+
+# The output of a match, moved to path.1 (and path.1 to path.2 and so on) when it grows past max_bytes,
+# so the logs of chatty algos stay a fixed size
+class RotatingLog:
+	def __init__(self, path, max_bytes=5 * 1024 * 1024, backups=2):
+		os.makedirs(os.path.dirname(path), exist_ok=True)
+		self.path = path
+		self.max_bytes = max_bytes
+		self.backups = backups
+		self.lock = threading.Lock()
+		self.f = open(path, 'ab')
+		self.size = self.f.tell()
+
+	def write(self, data):
+		with self.lock:
+			if self.size > 0 and self.size + len(data) > self.max_bytes:
+				self.rotate()
+			self.f.write(data)
+			self.size += len(data)
+
+	def rotate(self):
+		self.f.close()
+		for i in range(self.backups - 1, 0, -1):
+			if os.path.exists('{}.{}'.format(self.path, i)):
+				os.replace('{}.{}'.format(self.path, i), '{}.{}'.format(self.path, i + 1))
+		if self.backups > 0:
+			os.replace(self.path, self.path + '.1')
+		self.f = open(self.path, 'wb')
+		self.size = 0
+
+	def close(self):
+		with self.lock:
+			self.f.close()
+
+# gamelib algos print 'Performing turn N' every turn, and the engine prints the turn with printTStrings
+TURN_PATTERN = re.compile(rb'\bturn\b\D{0,3}(\d+)', re.IGNORECASE)
+
+# copies one output stream of a game to its log a line at a time. Only the last lines are kept in memory,
+# for error messages, and the highest turn printed is saved in game for the status of running games
+def stream_output(stream, log, tail, game):
+	for line in iter(lambda: stream.readline(65536), b''):
+		log.write(line)
+		tail.append(line)
+		match = TURN_PATTERN.search(line)
+		if match:
+			game['turn'] = max(game['turn'], int(match.group(1)))
+		game['lines'] += 1
+	stream.close()
+
+# prints the turn and running time of every game in progress
+def print_live_status():
+	with active_lock:
+		games = list(active_games.values())
+	if len(games) == 0:
+		return
+	print ('{} games running:'.format(len(games)))
+	for game in sorted(games, key=lambda g: g['started']):
+		print ('    {} vs {}   turn {}   {:.0f}s   {} lines of output'.format(game['algo1'], game['algo2'], game['turn'], time.time() - game['started'], game['lines']))
+
+# holds the sitecustomize.py that seeds Python algos, whichever copy of gamelib they use
+seeding_dir = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'seeding')
+
+# only Python algos are seeded, others make their own random choices in each game of a pair
+def is_seeded(algo):
+	algo_dir = os.path.join(get_parent_dir(), 'algos', algo)
+	return os.path.isdir(algo_dir) and any(f.endswith('.py') for f in os.listdir(algo_dir))
+
+# Runs a single game, killing it if it takes longer than timeout seconds
+# seed is passed to both algos in the TERMINAL_SEED environment variable, and Python algos seed random with it
+# through the sitecustomize.py in seeding/. cores and memory limit the game as in limit_game. Its output is streamed to log_path
+def run_single_game(algo1, algo2, max_name_len, timeout=None, seed=None, cores=None, memory=None, log_path=None):
+	name1, name2 = get_algo_name(algo1), get_algo_name(algo2)
+	env = None
+	if seed is not None:
+		env = dict(os.environ)
+		env['TERMINAL_SEED'] = str(seed)
+		env['PYTHONPATH'] = os.pathsep.join([seeding_dir] + ([env['PYTHONPATH']] if env.get('PYTHONPATH') else []))
+	if log_path is None:
+		log_path = os.path.join(get_parent_dir(), 'arena_logs', '{}-vs-{}.log'.format(name1, name2))
+
+	launcher, java_options = limit_game(cores, memory)
+	match = Match(
+		algo1, algo2,
+		parent_dir=get_parent_dir(),
+		launcher=launcher,
+		java_options=java_options,
 		stdout=subprocess.PIPE,
-		stderr=subprocess.PIPE
+		stderr=subprocess.PIPE,
+		env=env
 		)
-	output, error = p.communicate()
-	# daemon necessary so game shuts down if this script is shut down by user
-	p.daemon = 1
-	p.wait()
-	print("{: <30}{: <{fill}}   vs   {}".format('Finished running match:', algo1, algo2, fill=str(max_name_len)))
-
-	# print (''.join(['{}\n'.format(x) for x in str(output).split('\\r\\n')])[1:])
-	if str(error) != "b''":
-		print ('Error with match - {} {}:\n\tError:\n{}'.format(algo1, algo2, error))
+	p = match.process
+	game = {'algo1': name1, 'algo2': name2, 'started': match.started, 'turn': 0, 'lines': 0}
+	with active_lock:
+		if stopping.is_set():
+			kill_process_tree(p)
+		active_games[p] = game
+	try:
+		log = RotatingLog(log_path)
+		log.write('==== {} vs {}, seed {}, started {} ====\n'.format(name1, name2, seed, time.strftime('%Y-%m-%d %H:%M:%S')).encode())
+		out_tail = collections.deque(maxlen=20)
+		err_tail = collections.deque(maxlen=20)
+		readers = [threading.Thread(target=stream_output, args=(p.stdout, log, out_tail, game), daemon=True),
+				   threading.Thread(target=stream_output, args=(p.stderr, log, err_tail, game), daemon=True)]
+		for reader in readers:
+			reader.start()
+		timed_out, cpu_time = wait_game(p, timeout)
+		# a process the game left behind could keep the pipes open, so the readers are not waited for forever
+		for reader in readers:
+			reader.join(5)
+		log.close()
 
-def run_match(arg1='', arg2='', max_name_len=0):
-	# Get location of this run file
-	file_dir = os.path.dirname(os.path.realpath(__file__)).replace('\\contributions', '')
-	parent_dir = os.path.join(file_dir, os.pardir)
-	parent_dir = os.path.abspath(parent_dir)
+		if stopping.is_set():
+			match.finish('error')
+			return {'algo1': name1, 'algo2': name2, 'status': 'interrupted', 'duration': time.time() - match.started}
+		result = match.finish('timeout' if timed_out else None)
+	except BaseException:
+		# the game is killed and its folder removed, so nothing is left running or in replays/
+		match.kill()
+		if p.returncode is None:
+			p.wait()
+		match.finish('error')
+		raise
+	finally:
+		with active_lock:
+			active_games.pop(p, None)
+			active_lock.notify_all()
+	if not dashboard:
+		print("{: <30}{: <{fill}}   vs   {}".format('Finished running match:', name1, name2, fill=str(max_name_len)))
 
-	# Get if running in windows OS
-	is_windows = sys.platform.startswith('win')
+	if result.status == 'timeout':
+		print ('Match timed out after {:.0f}s on turn {} - {} {}, log: {}'.format(result.duration, game['turn'], name1, name2, log_path))
+	elif result.status == 'error':
+		tail = b''.join(err_tail if len(err_tail) > 0 else out_tail).decode(errors='replace')
+		print ('Error with match - {} {} (exit code {}), log: {}\n\tLast output:\n{}'.format(name1, name2, p.returncode, log_path, tail))
+	result = result.as_dict()
+	del result['returncode']
+	result.update({'cpu_time': cpu_time, 'cores': cores, 'log': log_path})
+	return result
 
+def run_match(arg1='', arg2='', max_name_len=0, timeout=None, seed=None, cores=None, memory=None):
 	# Set default path for algos if script is run with no params
-	default_algo = parent_dir + "\\algos\\starter-algo-ZIPME\\run.ps1" if is_windows else parent_dir + "/algos/starter-algo-ZIPME/run.sh" 
-	algo1 = default_algo
-	algo2 = default_algo
-
-	# If script run with params, use those algo locations when running the game
-	if arg1 != '':
-		algo1 = arg1
-	if arg2 != '':
-		algo2 = arg2
-
-	# If folder path is given instead of run file path, add the run file to the path based on OS
-	# trailing_char deals with if there is a trailing \ or / or not after the directory name
-	if is_windows:
-		if "run.ps1" not in algo1:
-			trailing_char = "" if algo1.endswith("\\") else "\\"
-			algo1 = algo1 + trailing_char + "run.ps1"
-		if "run.ps1" not in algo2:
-			trailing_char = "" if algo2.endswith("\\") else "\\"
-			algo2 = algo2 + trailing_char + "run.ps1"
-	else:
-		if "run.sh" not in algo1:
-			trailing_char = "" if algo1.endswith('/') else "/"
-			algo1 = algo1 + trailing_char + "run.sh"
-		if "run.sh" not in algo2:
-			trailing_char = "" if algo2.endswith('/') else "/"
-			algo2 = algo2 + trailing_char + "run.sh"
+	default_algo = os.path.join("algos", "starter-algo-ZIPME")
+	algo1 = arg1 if arg1 != '' else default_algo
+	algo2 = arg2 if arg2 != '' else default_algo
+
+	name1, name2 = get_algo_name(algo1), get_algo_name(algo2)
+	log_path = os.path.join(get_parent_dir(), 'arena_logs', '{}-vs-{}-{}.log'.format(name1, name2, seed if seed is not None else 'unseeded'))
+	result = run_single_game(algo1, algo2, max_name_len, timeout, seed, cores, memory, log_path)
+	result['seed'] = seed
+	return result
+
+# hashes every file in a folder (for an algo: its algo_strategy.py, gamelib and anything else it runs)
+# python caches are skipped since they change without the code changing
+def hash_folder(folder):
+	h = hashlib.sha1()
+	for root, dirs, files in os.walk(folder):
+		dirs[:] = sorted(d for d in dirs if d != '__pycache__')
+		for f_name in sorted(files):
+			if f_name.endswith('.pyc'):
+				continue
+			path = os.path.join(root, f_name)
+			h.update(os.path.relpath(path, folder).replace('\\', '/').encode())
+			with open(path, 'rb') as f:
+				h.update(f.read())
+	return h.hexdigest()
+
+def hash_file(path):
+	try:
+		with open(path, 'rb') as f:
+			return hashlib.sha1(f.read()).hexdigest()
+	except FileNotFoundError:
+		return None
+
+# Stores the result of every pairing with the hashes of both algos, the game config and the engine it was played with.
+# A pairing only needs to be played again if one of those changed
+class Ledger:
+	def __init__(self, path, parent_dir):
+		self.path = path
+		self.parent_dir = parent_dir
+		self.lock = threading.Lock()
+		self.algo_hashes = {}
+		self.config_hash = hash_file(os.path.join(parent_dir, 'game-configs.json'))
+		self.engine_hash = hash_file(os.path.join(parent_dir, 'engine.jar'))
+		self.entries = {}
+		try:
+			with open(path) as f:
+				self.entries = json.load(f)
+		except FileNotFoundError:
+			pass
+		except ValueError:
+			print ('Ledger {} could not be read, every match will be played again'.format(path))
+
+	def get_hashes(self, algo1, algo2):
+		for algo in (algo1, algo2):
+			if algo not in self.algo_hashes:
+				self.algo_hashes[algo] = hash_folder(os.path.join(self.parent_dir, 'algos', algo))
+		return [self.algo_hashes[algo1], self.algo_hashes[algo2], self.config_hash, self.engine_hash]
+
+	def get_key(self, algo1, algo2, seed):
+		if seed is None:
+			return '{} vs {}'.format(algo1, algo2)
+		return '{} vs {} seed {}'.format(algo1, algo2, seed)
+
+	# returns the stored result for a pairing, or None if it is missing or was played with different code
+	def get(self, algo1, algo2, seed=None):
+		entry = self.entries.get(self.get_key(algo1, algo2, seed))
+		if entry is None or entry['hashes'] != self.get_hashes(algo1, algo2):
+			return None
+		result = dict(entry['result'])
+		result['cached'] = True
+		return result
+
+	# only finished games are stored, so timeouts and errors are tried again next time
+	def record(self, result):
+		if result['status'] != 'finished':
+			return
+		with self.lock:
+			self.entries[self.get_key(result['algo1'], result['algo2'], result.get('seed'))] = {
+				'hashes': self.get_hashes(result['algo1'], result['algo2']),
+				'result': result
+			}
+			# written to a temporary file first so an interrupted arena never leaves a broken ledger
+			tmp_path = self.path + '.tmp'
+			with open(tmp_path, 'w') as f:
+				json.dump(self.entries, f, indent=1)
+			os.replace(tmp_path, self.path)
+
+# A run's journal is a JSONL file in arena_runs/: the first line lists every match of the run, then one line
+# is appended for each match as soon as it finishes, and synced to disk, so an interrupted run loses at most the games in progress
+class Journal:
+	# with matches a new journal is created, and it is an error if the file already exists
+	def __init__(self, path, matches=None):
+		self.path = path
+		self.lock = threading.Lock()
+		if matches is not None:
+			os.makedirs(os.path.dirname(path), exist_ok=True)
+			os.close(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL))
+			self.write({'run': os.path.splitext(os.path.basename(path))[0], 'matches': [list(m) for m in matches]})
+
+	def write(self, entry):
+		with self.lock:
+			with open(self.path, 'a') as f:
+				f.write(json.dumps(entry) + '\n')
+				f.flush()
+				os.fsync(f.fileno())
+
+	def record(self, result):
+		entry = dict(result)
+		entry.setdefault('seed', None)
+		self.write(entry)
+
+# starts the journal of a new run. It is named by the time, so the newest run sorts last, and a random id,
+# so runs started in the same second (or on other computers sharing the folder) never write to the same file
+def new_journal(parent_dir, matches, mode=''):
+	name = '-'.join([time.strftime('%Y-%m-%d-%H-%M-%S'), uuid.uuid4().hex[:8]] + ([mode] if mode != '' else []))
+	return Journal(os.path.join(parent_dir, 'arena_runs', name + '.jsonl'), matches)
+
+# returns the matches of a run and the results journaled for it so far
+def load_journal(path):
+	matches = []
+	results = []
+	with open(path) as f:
+		for line in f:
+			try:
+				entry = json.loads(line)
+			except ValueError:
+				continue        # the last line can be cut off if the arena was killed while writing it
+			if 'matches' in entry:
+				# runs from before seeds were added list pairs without one
+				matches = [tuple(m) if len(m) == 3 else (m[0], m[1], None) for m in entry['matches']]
+			else:
+				results.append(entry)
+	return matches, results
+
+# finds a journal from a run name or path, or the newest run if run is empty
+def find_journal(parent_dir, run=''):
+	runs_dir = os.path.join(parent_dir, 'arena_runs')
+	if run == '':
+		runs = sorted(f for f in os.listdir(runs_dir) if f.endswith('.jsonl')) if os.path.isdir(runs_dir) else []
+		if len(runs) == 0:
+			print ('No arena runs to resume in {}'.format(runs_dir))
+			sys.exit()
+		return os.path.join(runs_dir, runs[-1])
+	for path in [run, os.path.join(runs_dir, run), os.path.join(runs_dir, run + '.jsonl')]:
+		if os.path.isfile(path):
+			return path
+	print ('Arena run {} was not found'.format(run))
+	sys.exit()
+
+# the matches of a run that have no result in its journal, repeats of a pairing are counted separately
+def get_remaining(matches, results):
+	played = {}
+	for r in results:
+		pairing = (r['algo1'], r['algo2'], r.get('seed'))
+		played[pairing] = played.get(pairing, 0) + 1
+	remaining = []
+	for match in matches:
+		if played.get(match, 0) > 0:
+			played[match] -= 1
+		else:
+			remaining.append(match)
+	return remaining
+
+# A match queue in a shared folder, for running an arena on several machines. The coordinator adds a job file
+# per match and closes the queue, workers on any host claim jobs by creating a lease file, which only one can do,
+# and write the result and a copy of the replay back. Only plain file operations are used, so any shared folder works.
+# A worker keeps touching its leases while it plays. A lease that was not touched for lease_time seconds belongs to a
+# lost worker, it is removed so the job is played again, up to max_attempts times. Ages are measured against the
+# modified time of a file the queue writes, so the clocks of the hosts do not need to agree
+class WorkQueue:
+	def __init__(self, path, lease_time=60, max_attempts=3):
+		self.path = path
+		self.lease_time = lease_time
+		self.max_attempts = max_attempts
+		for folder in ['jobs', 'leases', 'results', 'replays']:
+			os.makedirs(os.path.join(path, folder), exist_ok=True)
+
+	def job_path(self, job_id):
+		return os.path.join(self.path, 'jobs', job_id + '.json')
+
+	def lease_path(self, job_id):
+		return os.path.join(self.path, 'leases', job_id + '.lease')
+
+	def result_path(self, job_id):
+		return os.path.join(self.path, 'results', job_id + '.json')
+
+	# writes to a temporary file first, so other hosts never read half a file
+	def write_json(self, path, data):
+		tmp_path = '{}.{}-{}.tmp'.format(path, socket.gethostname(), threading.get_ident())
+		with open(tmp_path, 'w') as f:
+			json.dump(data, f)
+		os.replace(tmp_path, path)
+
+	def read_json(self, path):
+		try:
+			with open(path) as f:
+				return json.load(f)
+		except (FileNotFoundError, ValueError):
+			return None
+
+	# the current time on the shared folder, from the modified time of a file created there and removed again
+	def now(self):
+		clock = os.path.join(self.path, 'clock-{}-{}-{}'.format(socket.gethostname(), os.getpid(), threading.get_ident()))
+		with open(clock, 'w'):
+			pass
+		try:
+			return os.path.getmtime(clock)
+		finally:
+			os.remove(clock)
+
+	# adds a match, the job id is the same every time the same match is added, so a job is never played twice
+	def add(self, algo1, algo2, seed, repeat=0):
+		key = '{} {} {} {}'.format(algo1, algo2, seed, repeat)
+		job_id = '{}-{}-{}'.format(algo1, algo2, hashlib.sha1(key.encode()).hexdigest()[:10])
+		if not os.path.exists(self.job_path(job_id)):
+			self.write_json(self.job_path(job_id), {'id': job_id, 'algo1': algo1, 'algo2': algo2, 'seed': seed, 'attempts': 0})
+		return job_id
+
+	# no more jobs will be added, workers stop once every job has a result
+	def close(self):
+		with open(os.path.join(self.path, 'closed'), 'w'):
+			pass
+
+	def is_closed(self):
+		return os.path.exists(os.path.join(self.path, 'closed'))
+
+	def job_ids(self):
+		return sorted(f[:-5] for f in os.listdir(os.path.join(self.path, 'jobs')) if f.endswith('.json'))
+
+	def get_result(self, job_id):
+		result = self.read_json(self.result_path(job_id))
+		if result is not None and result.get('replay'):
+			result['replay'] = os.path.join(self.path, result['replay'])
+		return result
+
+	def is_finished(self):
+		return self.is_closed() and all(os.path.exists(self.result_path(job_id)) for job_id in self.job_ids())
+
+	# returns an unplayed job and leases it to this worker, or None if there are none free
+	def claim(self, worker):
+		for job_id in self.job_ids():
+			if os.path.exists(self.result_path(job_id)) or os.path.exists(self.lease_path(job_id)):
+				continue
+			try:
+				fd = os.open(self.lease_path(job_id), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+			except FileExistsError:
+				continue
+			with os.fdopen(fd, 'w') as f:
+				f.write(worker)
+			job = self.read_json(self.job_path(job_id))
+			# the job can finish between the check and the claim
+			if job is None or os.path.exists(self.result_path(job_id)):
+				self.release(job_id)
+				continue
+			return job
+		return None
+
+	def renew(self, job_id):
+		try:
+			os.utime(self.lease_path(job_id))
+		except FileNotFoundError:
+			pass
+
+	def release(self, job_id):
+		try:
+			os.remove(self.lease_path(job_id))
+		except FileNotFoundError:
+			pass
 
-	run_single_game("cd {} && java -jar engine.jar work {} {}".format(parent_dir, algo1, algo2), algo1.split('\\')[-2].replace('algos/',''),  algo2.split('\\')[-2].replace('algos/',''), max_name_len)
+	# saves a result and the replay it came from, then frees the job
+	def finish(self, job, result):
+		result = dict(result)
+		if result.get('replay') and os.path.exists(result['replay']):
+			replay = os.path.join('replays', job['id'] + '.replay')
+			shutil.copyfile(result['replay'], os.path.join(self.path, replay))
+			result['replay'] = replay
+		else:
+			result['replay'] = None
+		result['worker'] = socket.gethostname()
+		self.write_json(self.result_path(job['id']), result)
+		self.release(job['id'])
+
+	# removes the leases of lost workers. A job that was lost max_attempts times gets a 'lost' result instead
+	def expire_leases(self):
+		now = self.now()
+		for f_name in os.listdir(os.path.join(self.path, 'leases')):
+			if not f_name.endswith('.lease'):
+				continue
+			job_id = f_name[:-6]
+			path = self.lease_path(job_id)
+			try:
+				if now - os.path.getmtime(path) < self.lease_time:
+					continue
+				# renaming is atomic, so only one host expires each lease
+				stale = '{}.{}-{}.stale'.format(path, socket.gethostname(), threading.get_ident())
+				os.rename(path, stale)
+			except FileNotFoundError:
+				continue
+			job = self.read_json(self.job_path(job_id))
+			if job is not None and not os.path.exists(self.result_path(job_id)):
+				job['attempts'] += 1
+				print ('Lease on {} vs {} expired ({} of {} attempts)'.format(job['algo1'], job['algo2'], job['attempts'], self.max_attempts))
+				if job['attempts'] >= self.max_attempts:
+					self.write_json(self.result_path(job_id), {'algo1': job['algo1'], 'algo2': job['algo2'], 'seed': job['seed'], 'status': 'lost', 'replay': None})
+				else:
+					self.write_json(self.job_path(job_id), job)
+			os.remove(stale)
+
+# plays jobs from a queue on batch_size slots until it is closed and every job has a result
+def run_worker(work_queue, batch_size, timeout=None, cpus=0, memory=None, status_interval=30, poll=2):
+	worker = '{} {}'.format(socket.gethostname(), os.getpid())
+	held = set()
+	held_lock = threading.Lock()
+	print ('Worker {} playing jobs from {}'.format(worker, work_queue.path))
+	core_sets = get_core_sets(cpus, batch_size)
+
+	def slot(cores):
+		while not stopping.is_set():
+			job = work_queue.claim(worker)
+			if job is None:
+				if work_queue.is_finished():
+					return
+				work_queue.expire_leases()
+				time.sleep(poll)
+				continue
+			with held_lock:
+				held.add(job['id'])
+			print ('{: <30}{}   vs   {}'.format('Starting match:', job['algo1'], job['algo2']))
+			try:
+				result = run_match('algos/{}'.format(job['algo1']), 'algos/{}'.format(job['algo2']), 0, timeout, job['seed'], cores, memory)
+			except Exception as e:
+				result = {'algo1': job['algo1'], 'algo2': job['algo2'], 'seed': job['seed'], 'status': 'error', 'error': str(e)}
+			with held_lock:
+				held.discard(job['id'])
+			# an interrupted game keeps its lease until it expires, so another worker plays it
+			if stopping.is_set():
+				return
+			work_queue.finish(job, result)
+
+	slots = [threading.Thread(target=slot, args=(cores,), daemon=True) for cores in core_sets]
+	for thread in slots:
+		thread.start()
+	try:
+		last_status = time.time()
+		while any(thread.is_alive() for thread in slots):
+			with held_lock:
+				for job_id in held:
+					work_queue.renew(job_id)
+			if status_interval > 0 and time.time() - last_status >= status_interval:
+				print_live_status()
+				last_status = time.time()
+			time.sleep(min(work_queue.lease_time / 4, poll))
+	except KeyboardInterrupt:
+		kill_active_games()
+		print ('\nInterrupted, the leases of unfinished jobs will expire and be played by other workers')
+		sys.exit()
+	print ('Worker {} finished, no jobs left'.format(worker))
+
+# Counts the results of a run as they come in, for the dashboard and the metrics file
+# cached results count towards the win rates but not the games per minute, since they were not played
+class ArenaMetrics:
+	def __init__(self, total, slots, path=None):
+		self.total = total
+		self.slots = slots
+		self.path = path
+		self.started = time.time()
+		self.done = 0
+		self.cached = 0
+		self.played = 0
+		self.duration = 0
+		self.timeouts = 0
+		self.errors = 0
+		self.algos = {}
+		self.lock = threading.Lock()
+
+	def get_algo(self, algo):
+		if algo not in self.algos:
+			self.algos[algo] = {'games': 0, 'wins': 0, 'ties': 0, 'crashes': 0}
+		return self.algos[algo]
+
+	def add(self, result):
+		with self.lock:
+			self.done += 1
+			if result.get('cached'):
+				self.cached += 1
+			elif result.get('duration') is not None:
+				self.played += 1
+				self.duration += result['duration']
+			if result['status'] == 'timeout':
+				self.timeouts += 1
+			elif result['status'] != 'finished':
+				self.errors += 1
+			if result['status'] != 'finished':
+				return
+			for player, algo in [(1, result['algo1']), (2, result['algo2'])]:
+				stats = self.get_algo(algo)
+				stats['games'] += 1
+				stats['wins'] += result['winner'] == player
+				stats['ties'] += result['winner'] not in (1, 2)
+				stats['crashes'] += bool(result.get('p{}_crashed'.format(player)))
+
+	# active is the number of games being played, the arena's own games if None
+	def snapshot(self, active=None):
+		with active_lock:
+			running = [{'algo1': g['algo1'], 'algo2': g['algo2'], 'turn': g['turn'], 'seconds': round(time.time() - g['started'])} for g in active_games.values()]
+		if active is None:
+			active = len(running)
+		with self.lock:
+			elapsed = time.time() - self.started
+			rate = self.played / elapsed * 60 if elapsed > 0 else 0
+			remaining = self.total - self.done
+			return {
+				'elapsed': round(elapsed, 1),
+				'total': self.total,
+				'done': self.done,
+				'cached': self.cached,
+				'games_per_minute': round(rate, 2),
+				'average_duration': round(self.duration / self.played, 1) if self.played > 0 else None,
+				'eta': round(remaining / rate * 60) if rate > 0 else None,
+				'active_slots': active,
+				'slots': self.slots,
+				'queue_depth': max(0, remaining - active),
+				'timeouts': self.timeouts,
+				'errors': self.errors,
+				'crashes': sum(stats['crashes'] for stats in self.algos.values()),
+				'algos': {algo: dict(stats, win_rate=round((stats['wins'] + stats['ties'] / 2) / stats['games'], 3) if stats['games'] > 0 else None)
+						  for algo, stats in self.algos.items()},
+				'running': running,
+			}
+
+	# writes the snapshot to the metrics file, through a temporary file so readers never see half of it
+	def write(self, snapshot=None):
+		if self.path is None:
+			return
+		if snapshot is None:
+			snapshot = self.snapshot()
+		tmp_path = self.path + '.tmp'
+		with open(tmp_path, 'w') as f:
+			json.dump(snapshot, f, indent=1)
+		os.replace(tmp_path, self.path)
+
+def format_seconds(seconds):
+	if seconds is None:
+		return '-'
+	minutes, seconds = divmod(int(seconds), 60)
+	hours, minutes = divmod(minutes, 60)
+	return '{}h{:02d}m'.format(hours, minutes) if hours > 0 else '{}m{:02d}s'.format(minutes, seconds)
+
+# redraws the dashboard in place of the last one
+def print_dashboard(snapshot):
+	lines = [
+		'Arena: {done}/{total} games ({cached} cached)'.format(**snapshot) + '   elapsed {}   ETA {}'.format(format_seconds(snapshot['elapsed']), format_seconds(snapshot['eta'])),
+		'{} games/min   average game {}   {} in queue'.format(
+			snapshot['games_per_minute'], '-' if snapshot['average_duration'] is None else '{:.1f}s'.format(snapshot['average_duration']),
+			snapshot['queue_depth']) + ('   {} games running'.format(snapshot['active_slots']) if snapshot['slots'] is None else
+			'   {} of {} slots busy'.format(snapshot['active_slots'], snapshot['slots'])),
+		'timeouts: {timeouts}   errors: {errors}   crashes: {crashes}'.format(**snapshot),
+		'',
+	]
+	if len(snapshot['algos']) > 0:
+		fill = max(len(algo) for algo in snapshot['algos']) + 2
+		lines.append('{: <{fill}}{: >7}{: >10}{: >9}'.format('Algo', 'games', 'win rate', 'crashes', fill=fill))
+		for algo, stats in sorted(snapshot['algos'].items(), key=lambda e: -(e[1]['win_rate'] or 0)):
+			lines.append('{: <{fill}}{: >7}{: >9.0%}{: >9}'.format(algo, stats['games'], stats['win_rate'] or 0, stats['crashes'], fill=fill))
+		lines.append('')
+	for game in snapshot['running']:
+		lines.append('running: {algo1} vs {algo2}   turn {turn}   {seconds}s'.format(**game))
+	# move to the top left and clear the screen first
+	sys.stdout.write('\033[H\033[J' + '\n'.join(lines) + '\n')
+	sys.stdout.flush()
+
+# writes the metrics file and redraws the dashboard if it is shown, called about once a second while matches run
+def update_metrics(metrics, active=None):
+	snapshot = metrics.snapshot(active)
+	metrics.write(snapshot)
+	if dashboard:
+		print_dashboard(snapshot)
 
 # handles all the arguments
 def parse_args():
@@ -163,13 +891,74 @@ def parse_args():
 		"-b", "--batch",
 		type=int,
 		default=5,
-		help="number of games to run at a single time (on seperate threads)\n\n")
+		help="number of games to run at a single time (match slots)\n\n")
+	ap.add_argument(
+		"-t", "--timeout",
+		type=float,
+		default=None,
+		help="seconds a game may run before the engine and both algos are killed\n\n")
+	ap.add_argument(
+		"-r", "--rerun",
+		action='store_true',
+		help="play every pairing again, even if the ledger has a result for the same code\n\n")
+	ap.add_argument(
+		"--status",
+		type=float,
+		default=30,
+		help="seconds between printing the turn each running game is on, 0 to turn it off\n\n")
+	ap.add_argument(
+		"--dashboard",
+		action='store_true',
+		help="show a live summary of the run, redrawn every second, instead of a line per match\n\n")
+	ap.add_argument(
+		"--cpus",
+		type=int,
+		default=0,
+		help="pin each match (the engine and both algos) to this many cores of its own, so games do not slow each other down\n\n")
+	ap.add_argument(
+		"--memory",
+		type=int,
+		default=None,
+		help="most memory in MB a match (the engine and both algos together) may use, where systemd-run can give it a cgroup. Otherwise only the engine's heap is capped\n\n")
+	ap.add_argument(
+		"--queue",
+		default=None,
+		help="instead of playing the matches, add them to a queue in this shared folder for workers to play\n\n")
+	ap.add_argument(
+		"--worker",
+		default=None,
+		help="play matches from the queue in this shared folder, -b at a time, until it is empty\n\n")
+	ap.add_argument(
+		"--lease",
+		type=float,
+		default=60,
+		help="seconds without a heartbeat before a worker's match is given to another worker\n\n")
+	ap.add_argument(
+		"--attempts",
+		type=int,
+		default=3,
+		help="times a match is given out before it is recorded as lost\n\n")
+	ap.add_argument(
+		"--seed",
+		type=int,
+		default=0,
+		help="base of the seeds passed to the algos, change it to play every pairing with new random choices\n\n")
+	ap.add_argument(
+		"--one-side",
+		action='store_true',
+		help="play each pairing once instead of as a side swapped pair\n\n")
+	ap.add_argument(
+		"--resume",
+		nargs='?',
+		const='',
+		default=None,
+		help="finish the matches of an interrupted run, the newest run if no name is given\n\n")
 	return vars(ap.parse_args())
 
 # called by the -a arg, runs every algo in directory
 def run_all():
-	algos_dir = os.path.dirname(os.path.realpath(__file__)).replace('scripts\\contributions', '')+'algos\\'
-	algos = os.listdir(algos_dir)
+	algos_dir = os.path.join(get_parent_dir(), 'algos')
+	algos = sorted(os.listdir(algos_dir))
 	matches = itertools.combinations(algos, 2)
 	return matches
 
@@ -181,54 +970,249 @@ def run_specific(algos):
 # called by the -f arg, runs the algos in the passed file
 def run_from_file(filePath):
 	try:
-		algos = [x.strip() for x in tuple(open(filePath, 'r'))]
+		algos = [x.strip() for x in tuple(open(filePath, 'r')) if x.strip() != '']
 		matches = itertools.combinations(algos, 2)
 		return matches
 	except FileNotFoundError:
 		print ('File {} was not found'.format(filePath))
 		sys.exit()
 
-# returns the number of processess that are active
-def get_num_running(processes):
-	c = 0
-	for i, proc in processes.items():
-		if proc.is_alive():
-			c += 1
-	return c
-
-# starts a subprocess for each match up to batch_size and then starts them as they finish
-def run_matches(matches, batch_size):
-	tmp = copy.deepcopy(matches)
-	max_name_len = len(max(tmp, key=lambda e:len(e[0]))[0])
-
-	algos = []
-	processes = {}
-	i = 0
+# the seed both games of a pairing are played with, the same whichever algo is player 1
+def pair_seed(base_seed, algo1, algo2):
+	key = '{} {} {}'.format(base_seed, *sorted((algo1, algo2)))
+	return int(hashlib.sha1(key.encode()).hexdigest()[:8], 16)
+
+# turns pairings into matches of (player 1, player 2, seed). Each pairing is played from both sides with
+# the same seed, so the two games differ only in which side each algo plays, unless one_side is set
+def make_matches(pairings, base_seed, one_side=False):
+	matches = []
+	for algo1, algo2 in pairings:
+		seed = pair_seed(base_seed, algo1, algo2)
+		matches.append((algo1, algo2, seed))
+		if not one_side:
+			matches.append((algo2, algo1, seed))
+	return matches
+
+# returns the matches the ledger has no up to date result for, and the results it has for the rest
+def split_cached(matches, ledger, rerun=False, journal=None):
+	if ledger is None or rerun:
+		return matches, []
+	to_play = []
+	results = []
+	for algo1, algo2, seed in matches:
+		cached = ledger.get(algo1, algo2, seed)
+		if cached is None:
+			to_play.append((algo1, algo2, seed))
+		else:
+			results.append(cached)
+			if journal is not None:
+				journal.record(cached)
+	if len(results) > 0:
+		print ('Using {} cached results, {} matches to play'.format(len(results), len(to_play)))
+	return to_play, results
+
+# adds the matches to a shared queue and waits for workers to play them, recording results as they come in
+# if this is interrupted the workers carry on, and --resume with the same queue collects their results
+def run_queue(matches, work_queue, ledger=None, rerun=False, journal=None, poll=2, metrics=None):
+	matches, results = split_cached(list(matches), ledger, rerun, journal)
+	if metrics is not None:
+		for result in results:
+			metrics.add(result)
+	pending = {}
+	repeats = {}
 	for match in matches:
-		algos.append((match[0],match[1]))
-		algo1 = 'algos/{}'.format(match[0])
-		algo2 = 'algos/{}'.format(match[1])
-		processes[i] = mp.Process(target=run_match, args=(algo1, algo2, max_name_len))
-		i += 1
-
-	for i in range(len(processes)):
-		print ('{: <30}{: <{fill}}   vs   {}'.format('Starting match:', algos[i][0], algos[i][1], fill=str(max_name_len)))
-		processes[i].start()
-		i += 1
-		while get_num_running(processes) >= batch_size:
-			time.sleep(.1)
-
-	while get_num_running(processes) > 0:
-			time.sleep(.1)
+		repeats[match] = repeats.get(match, 0) + 1
+		pending[work_queue.add(*match, repeat=repeats[match] - 1)] = match
+	work_queue.close()
+	print ('Added {} jobs to {}, start workers with:'.format(len(pending), work_queue.path))
+	print ('>py scripts/contributions/run_arena.py --worker {}'.format(work_queue.path))
+
+	try:
+		while len(pending) > 0:
+			for job_id in list(pending):
+				result = work_queue.get_result(job_id)
+				if result is None:
+					continue
+				del pending[job_id]
+				if not dashboard:
+					print ('{: <30}{}   vs   {}   ({} left)'.format('Finished running match:', result['algo1'], result['algo2'], len(pending)))
+				if ledger is not None:
+					ledger.record(result)
+				if journal is not None:
+					journal.record(result)
+				if metrics is not None:
+					metrics.add(result)
+				results.append(result)
+			if metrics is not None:
+				# the workers' games are the jobs with a lease
+				update_metrics(metrics, len(os.listdir(os.path.join(work_queue.path, 'leases'))))
+			if len(pending) > 0:
+				work_queue.expire_leases()
+				time.sleep(poll)
+	except KeyboardInterrupt:
+		print ('\nInterrupted, workers keep playing. Run with --resume and the same --queue to collect the rest')
+		sys.exit()
+
+	print ()
+	print ('Finished all matches!')
+	print ()
+	return results
+
+# runs the matches on batch_size slots, each slot takes the next match from the queue as soon as it is free
+# pairings the ledger has an up to date result for are not played unless rerun is set
+# returns a result dict for every match, cached ones first and the rest in the order they finished
+def run_matches(matches, batch_size, timeout=None, ledger=None, rerun=False, journal=None, cpus=0, memory=None, status_interval=30, metrics=None):
+	matches = list(matches)
+	if len(matches) == 0:
+		return []
+	max_name_len = len(max(matches, key=lambda e:len(e[0]))[0])
+	total = len(matches)
+	matches, results = split_cached(matches, ledger, rerun, journal)
+	if metrics is not None:
+		for result in results:
+			metrics.add(result)
+
+	jobs = queue.Queue()
+	for match in matches:
+		jobs.put(match)
+	finished = queue.Queue()
+	core_sets = get_core_sets(cpus, min(batch_size, len(matches)))
+
+	def slot(cores):
+		while True:
+			try:
+				if stopping.is_set():
+					return
+				algo1, algo2, seed = jobs.get_nowait()
+			except queue.Empty:
+				return
+			if not dashboard:
+				print ('{: <30}{: <{fill}}   vs   {}'.format('Starting match:', algo1, algo2, fill=str(max_name_len)))
+			try:
+				result = run_match('algos/{}'.format(algo1), 'algos/{}'.format(algo2), max_name_len, timeout, seed, cores, memory)
+			except Exception as e:
+				result = {'algo1': algo1, 'algo2': algo2, 'seed': seed, 'status': 'error', 'error': str(e)}
+			if stopping.is_set():
+				return
+			if ledger is not None:
+				ledger.record(result)
+			if journal is not None:
+				journal.record(result)
+			finished.put(result)
+
+	# daemon threads so an interrupted arena does not wait for them, the matches are in their own process groups
+	# each slot keeps the same cores, so matches running at the same time never share them
+	slots = [threading.Thread(target=slot, args=(cores,), daemon=True) for cores in core_sets]
+	for thread in slots:
+		thread.start()
+
+	try:
+		last_status = time.time()
+		while len(results) < total:
+			try:
+				results.append(finished.get(timeout=1))
+				if metrics is not None:
+					metrics.add(results[-1])
+			except queue.Empty:
+				pass
+			if metrics is not None:
+				update_metrics(metrics)
+			if not dashboard and status_interval > 0 and time.time() - last_status >= status_interval:
+				print_live_status()
+				last_status = time.time()
+	except KeyboardInterrupt:
+		kill_active_games()
+		print ('\nInterrupted, finished matches are saved. Run with --resume to play the rest')
+		sys.exit()
 
 	print ()
 	print ('Finished all matches!')
 	print ()
+	return results
+
+# prints one line per match with the winner, turns, health and duration
+def print_results(results):
+	fill = max([len(r['algo1']) + len(r['algo2']) for r in results] + [10]) + 6
+	for r in results:
+		pairing = '{} vs {}'.format(r['algo1'], r['algo2'])
+		if r['status'] != 'finished':
+			print ('{: <{fill}}  {}'.format(pairing, r['status'], fill=fill))
+			continue
+		winner = r['algo1'] if r['winner'] == 1 else r['algo2'] if r['winner'] == 2 else 'tie'
+		cpu = '  cpu: {:.1f}s'.format(r['cpu_time']) if r.get('cpu_time') is not None else ''
+		print ('{: <{fill}}  winner: {}  turns: {}  health: {} - {}  time: {:.1f}s{}{}'.format(
+			pairing, winner, r['turns'], r['p1_health'], r['p2_health'], r['duration'], cpu, ' (cached)' if r.get('cached') else '', fill=fill))
+
+# the score of an algo in a finished game, 1 for a win, 0.5 for a tie and 0 for a loss
+def game_score(result, algo):
+	if result['winner'] not in (1, 2):
+		return 0.5
+	return 1 if result['algo{}'.format(result['winner'])] == algo else 0
+
+# prints the results of side swapped pairs played with the same seed. An algo's pair score is its score over
+# both games, from 0 to 2. A split pair (1 - 1) means the side mattered more than the algo
+# the mean pair score of each algo, with its standard error over pairs, needs far fewer games to
+# separate two algos than counting single games, since the side and the random choices cancel out
+def print_paired_results(results):
+	games = {}
+	for r in results:
+		if r['status'] == 'finished' and r.get('seed') is not None:
+			games.setdefault((tuple(sorted((r['algo1'], r['algo2']))), r['seed']), []).append(r)
+
+	pairs = []
+	for (algos, seed), rs in sorted(games.items()):
+		if len(rs) == 2 and rs[0]['algo1'] == rs[1]['algo2']:
+			a, b = algos
+			pairs.append((a, b, sum(game_score(r, a) for r in rs)))
+	if len(pairs) == 0:
+		return
+
+	print ()
+	print ('Side swapped pairs:')
+	fill = max(len(a) + len(b) for a, b, _ in pairs) + 6
+	scores = {}
+	for a, b, score in pairs:
+		print ('{: <{fill}}  {:g} - {:g}'.format('{} vs {}'.format(a, b), score, 2 - score, fill=fill))
+		scores.setdefault(a, []).append(score)
+		scores.setdefault(b, []).append(2 - score)
+
+	print ()
+	fill = max(len(a) for a in scores) + 2
+	print ('{: <{fill}}{: >7}{: >12}{: >9}{: >8}'.format('Algo', 'pairs', 'pair score', 'error', 'splits', fill=fill))
+	for algo, s in sorted(scores.items(), key=lambda e: -sum(e[1]) / len(e[1])):
+		mean = sum(s) / len(s)
+		error = math.sqrt(sum((x - mean) ** 2 for x in s) / (len(s) - 1) / len(s)) if len(s) > 1 else float('nan')
+		print ('{: <{fill}}{: >7}{: >12.2f}{: >9.2f}{: >8}'.format(algo, len(s), mean, error, s.count(1), fill=fill))
+
+	unseeded = [algo for algo in sorted(scores) if not is_seeded(algo)]
+	if len(unseeded) > 0:
+		print ()
+		print ('Not seeded (not Python algos): {}'.format(', '.join(unseeded)))
+		print ('Their pairs swap sides, but their random choices differ between the two games')
 
 if __name__ == '__main__':
 	args = parse_args() # get command line arguments
 
-	if args['all']:
+	parent_dir = get_parent_dir()
+	done = []
+	if args['memory'] is not None and is_windows:
+		print ('WARNING: memory limits are not supported on Windows, --memory is ignored')
+		args['memory'] = None
+	elif args['memory'] is not None:
+		cgroup_launcher = get_cgroup_launcher()
+		if cgroup_launcher is None:
+			print ('WARNING: systemd-run cannot make cgroups here, --memory only caps the engine\'s heap and not the algos')
+
+	if args['worker'] is not None:
+		run_worker(WorkQueue(args['worker'], args['lease'], args['attempts']), args['batch'], args['timeout'], args['cpus'], args['memory'], args['status'])
+		sys.exit()
+
+	if args['resume'] is not None:
+		journal_path = find_journal(parent_dir, args['resume'])
+		all_matches, done = load_journal(journal_path)
+		matches = get_remaining(all_matches, done)
+		print ('Resuming {}: {} of {} matches left'.format(journal_path, len(matches), len(all_matches)))
+	elif args['all']:
 		print ('Running all algos')
 		matches = run_all()
 	elif len(args['specific']) > 0:
@@ -239,17 +1223,38 @@ if __name__ == '__main__':
 		print ('No arguments - no action taken')
 		sys.exit()
 
-	tmp = copy.deepcopy(matches)
-	run_matches(matches, args['batch'])		# run all matches
+	if args['resume'] is not None:
+		journal = Journal(journal_path)
+	else:
+		matches = make_matches(matches, args['seed'], args['one_side'])
+		journal = new_journal(parent_dir, matches)
+		print ('Recording this run in {}'.format(journal.path))
+
+	if args['dashboard'] and not sys.stdout.isatty():
+		print ('WARNING: the dashboard needs a terminal, printing a line per match instead')
+	dashboard = args['dashboard'] and sys.stdout.isatty()
+	slots = None if args['queue'] is not None else args['batch']
+	metrics = ArenaMetrics(len(matches), slots, journal.path[:-len('.jsonl')] + '.metrics.json')
+	print ('Writing live metrics to {}'.format(metrics.path))
+
+	ledger = Ledger(os.path.join(parent_dir, 'arena_ledger.json'), parent_dir)
+	if args['queue'] is not None:
+		results = done + run_queue(matches, WorkQueue(args['queue'], args['lease'], args['attempts']), ledger, args['rerun'], journal, metrics=metrics)
+	else:
+		results = done + run_matches(matches, args['batch'], args['timeout'], ledger, args['rerun'], journal, args['cpus'], args['memory'], args['status'], metrics)		# run all matches
+	metrics.write()
+	print_results(results)
+	print_paired_results(results)
+	replays = [r['replay'] for r in results if r.get('replay') and os.path.exists(r['replay'])]
 
 	# if get_results is avalible, run a summary of the matches played
 	try:
 		args = {	'all':		False, 				\
 					'verbose':	False, 				\
 					'averages':	[], 				\
-					'file':		[],					\
+					'file':		replays,			\
 					'graph':	['wins'],	\
-					'num':		len(list(tmp))		\
+					'num':		len(replays)		\
 				}
 		from get_results import main
 		main(args)
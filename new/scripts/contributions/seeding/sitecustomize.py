@@ -0,0 +1,23 @@
+# run_arena.py puts this folder on the PYTHONPATH of the games it runs. Python imports sitecustomize
+# when it starts, so every Python algo is seeded from TERMINAL_SEED, including algos that ship
+# their own copy of gamelib, without changing their code
+
+import os
+import sys
+import random
+import importlib.util
+import importlib.machinery
+
+seed = os.environ.get('TERMINAL_SEED')
+if seed is not None:
+	try:
+		random.seed(int(seed))
+	except ValueError:
+		pass
+
+# run the sitecustomize of the Python install, if it has one, since this one hides it
+here = os.path.dirname(os.path.abspath(__file__))
+path = [p for p in sys.path if os.path.abspath(p or '.') != here]
+spec = importlib.machinery.PathFinder.find_spec('sitecustomize', path)
+if spec is not None:
+	spec.loader.exec_module(importlib.util.module_from_spec(spec))
@@ -0,0 +1,272 @@
+#!/usr/bin/env python
+
+'''
+------------------------------------------------------------------------------------------------
+Copyright: CC0 - completely open to edit, share, etc
+
+Short Description:
+This is a python script to decide which of two algos is better, or to rank many algos, with as
+few games as possible. It runs its games the same way run_arena.py does.
+------------------------------------------------------------------------------------------------
+
+README:
+
+This program assumes this file is in the contributions/scripts directory, next to run_arena.py
+
+There are 2 modes.
+
+1st, head to head:
+>py scripts/contributions/tournament.py -h2h new-algo old-algo -b 4
+
+This plays new-algo against old-algo, 4 games at a time, in pairs of games with swapped sides and
+the same seed (see run_arena.py). After every game it runs a sequential probability ratio test (SPRT) on the win rate
+of new-algo and stops as soon as the result is clear:
+	- H1: new-algo wins at least --p1 of its games (default 0.65), so it is better
+	- H0: new-algo wins at most --p0 of its games (default 0.5), so it is not better
+--alpha and --beta (default 0.05) are the chances of wrongly accepting H1 or H0. A tie counts
+as half a win. If neither is accepted after --max-games (default 200) games, it stops anyway.
+A clear difference is usually decided in well under 30 games, instead of a fixed batch.
+
+It also prints the Bayesian probability that new-algo is better (that its win rate is over
+50%, with a uniform prior), which is a good guide when the test stops at --max-games.
+
+2nd, ladder:
+>py scripts/contributions/tournament.py -l algo1 algo2 algo3 algo4 [...] -r 6 -b 4
+
+This plays 6 Swiss rounds, each pairing playing a side swapped pair of games. Each algo has an Elo rating, starting at 0. Every round the algos
+are sorted by rating and each is paired with the closest rated algo it has played the fewest
+times, so games are spent on the pairings that are still close instead of every combination.
+Ratings are updated after every game (-k sets how fast, default 32) and printed at the end.
+Passing -l with no algos uses every algo in the /algos/ directory.
+
+-t sets a timeout per game, as in run_arena.py. Every game is recorded in arena_runs/, so
+you can look at the games of a tournament with:
+>py scripts/contributions/get_results.py -r
+'''
+
+import sys
+try:
+	import os
+	import math
+	import argparse
+	import concurrent.futures
+except ImportError as e:
+	print("WARNING: Module not found, full error:\n")
+	print(str(e))
+	sys.exit()
+
+import run_arena
+
+
+# handles all the arguments
+def parse_args():
+	ap = argparse.ArgumentParser(add_help=False, formatter_class=argparse.RawTextHelpFormatter)
+	ap.add_argument('-h', '--help', action='help', help='show this help message and exit\n\n')
+	ap.add_argument(
+		"-h2h", "--head-to-head",
+		nargs=2,
+		default=None,
+		help="plays two algos against each other until the SPRT decides if the first is better\n\n")
+	ap.add_argument(
+		"-l", "--ladder",
+		nargs='*',
+		default=None,
+		help="ranks the algos with Swiss rounds, every algo in the directory if none are given\n\n")
+	ap.add_argument(
+		"-b", "--batch",
+		type=int,
+		default=5,
+		help="number of games to run at a single time\n\n")
+	ap.add_argument(
+		"-t", "--timeout",
+		type=float,
+		default=None,
+		help="seconds a game may run before the engine and both algos are killed\n\n")
+	ap.add_argument("--p0", type=float, default=0.5, help="win rate of the first algo if it is not better\n\n")
+	ap.add_argument("--p1", type=float, default=0.65, help="win rate of the first algo if it is better\n\n")
+	ap.add_argument("--alpha", type=float, default=0.05, help="chance of deciding it is better when it is not\n\n")
+	ap.add_argument("--beta", type=float, default=0.05, help="chance of deciding it is not better when it is\n\n")
+	ap.add_argument("--max-games", type=int, default=200, help="most head to head games to play\n\n")
+	ap.add_argument("-r", "--rounds", type=int, default=5, help="number of Swiss rounds in a ladder\n\n")
+	ap.add_argument("-k", type=float, default=32, help="Elo K factor for the ladder\n\n")
+	ap.add_argument("--seed", type=int, default=0, help="base of the seeds passed to the algos\n\n")
+	return vars(ap.parse_args())
+
+# plays one game with algo1 and algo2 as player 1 and 2, and returns the score of algo1: 1 win, 0.5 tie, 0 loss
+# None if the game did not finish. A game that fails to run is recorded as an error, as run_arena does
+def play(algo1, algo2, timeout, journal, seed=None):
+	try:
+		result = run_arena.run_match('algos/{}'.format(algo1), 'algos/{}'.format(algo2), 0, timeout, seed)
+	except Exception as e:
+		print ('Error with match - {} {}: {}'.format(algo1, algo2, e))
+		result = {'algo1': algo1, 'algo2': algo2, 'seed': seed, 'status': 'error', 'error': str(e)}
+	if run_arena.stopping.is_set():
+		return None
+	journal.record(result)
+	if result['status'] != 'finished':
+		return None
+	return {1: 1, 2: 0}.get(result['winner'], 0.5)
+
+def new_journal(parent_dir, mode):
+	journal = run_arena.new_journal(parent_dir, [], mode)
+	print ('Recording this run in {}'.format(journal.path))
+	return journal
+
+# the log likelihood ratio of H1 (win rate p1) over H0 (win rate p0), ties count as half a win and half a loss
+def sprt_llr(wins, losses, ties, p0, p1):
+	return (wins + ties / 2) * math.log(p1 / p0) + (losses + ties / 2) * math.log((1 - p1) / (1 - p0))
+
+# the probability that the win rate is over 0.5, with a uniform prior, so a Beta(wins + 1, losses + 1) posterior
+def prob_better(wins, losses, ties, steps=2000):
+	a = wins + ties / 2 + 1
+	b = losses + ties / 2 + 1
+	log_norm = math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b)
+	# Simpson's rule over [0.5, 1]
+	h = 0.5 / steps
+	total = 0
+	for i in range(steps + 1):
+		x = 0.5 + i * h
+		if x >= 1:
+			density = math.exp(log_norm) if b == 1 else 0
+		else:
+			density = math.exp(log_norm + (a - 1) * math.log(x) + (b - 1) * math.log(1 - x))
+		total += density * (1 if i == 0 or i == steps else 4 if i % 2 == 1 else 2)
+	return min(1.0, total * h / 3)
+
+# plays algo1 against algo2, alternating sides, until the SPRT accepts H1 or H0 or max_games have been played
+# returns 'H1', 'H0' or None and the score so far
+def run_sprt(pool, algo1, algo2, args, journal):
+	lower = math.log(args['beta'] / (1 - args['alpha']))
+	upper = math.log((1 - args['beta']) / args['alpha'])
+	score = {'wins': 0, 'losses': 0, 'ties': 0, 'failed': 0, 'started': 0}
+	running = {}
+	while True:
+		# keep every slot busy until max_games have been started
+		while len(running) < args['batch'] and score['started'] < args['max_games']:
+			# games are played in side swapped pairs with the same seed
+			swapped = score['started'] % 2 == 1
+			seed = run_arena.pair_seed(args['seed'] + score['started'] // 2, algo1, algo2)
+			if swapped:
+				future = pool.submit(play, algo2, algo1, args['timeout'], journal, seed)
+			else:
+				future = pool.submit(play, algo1, algo2, args['timeout'], journal, seed)
+			running[future] = swapped
+			score['started'] += 1
+		if len(running) == 0:
+			return None, score
+
+		done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+		for future in done:
+			swapped = running.pop(future)
+			s = future.result()
+			if s is None:
+				score['failed'] += 1
+				continue
+			if swapped:
+				s = 1 - s
+			score['wins' if s == 1 else 'losses' if s == 0 else 'ties'] += 1
+
+		llr = sprt_llr(score['wins'], score['losses'], score['ties'], args['p0'], args['p1'])
+		print ('{wins} - {losses} - {ties} (W-L-T)   '.format(**score) + 'LLR: {: .2f}  [{:.2f}, {:.2f}]'.format(llr, lower, upper))
+		if llr >= upper or llr <= lower:
+			# the test is decided, the games still running would not change it
+			run_arena.kill_active_games()
+			return 'H1' if llr >= upper else 'H0', score
+
+def head_to_head(algo1, algo2, args, journal):
+	with concurrent.futures.ThreadPoolExecutor(max_workers=args['batch']) as pool:
+		try:
+			decision, score = run_sprt(pool, algo1, algo2, args, journal)
+		except KeyboardInterrupt:
+			run_arena.kill_active_games()
+			raise
+
+	print ()
+	print ('{} vs {}: {wins} wins, {losses} losses, {ties} ties, {failed} games did not finish'.format(algo1, algo2, **score))
+	print ('Probability {} is better: {:.1%}'.format(algo1, prob_better(score['wins'], score['losses'], score['ties'])))
+	if decision == 'H1':
+		print ('Accepted H1: {} is better (win rate >= {})'.format(algo1, args['p1']))
+	elif decision == 'H0':
+		print ('Accepted H0: {} is not better (win rate <= {})'.format(algo1, args['p0']))
+	else:
+		print ('No decision after {} games'.format(score['started']))
+	return decision
+
+# pairs each algo, best rated first, with the closest rated algo it has played the fewest times
+def swiss_pairings(algos, ratings, played, byes):
+	order = sorted(algos, key=lambda a: -ratings[a])
+	if len(order) % 2 == 1:
+		bye = min(reversed(order), key=lambda a: byes[a])
+		byes[bye] += 1
+		order.remove(bye)
+	pairings = []
+	while len(order) > 0:
+		algo = order.pop(0)
+		other = min(order, key=lambda o: (played.get(frozenset((algo, o)), 0), abs(ratings[algo] - ratings[o])))
+		order.remove(other)
+		pairings.append((algo, other))
+	return pairings
+
+def elo_update(ratings, algo1, algo2, score, k):
+	expected = 1 / (1 + 10 ** ((ratings[algo2] - ratings[algo1]) / 400))
+	ratings[algo1] += k * (score - expected)
+	ratings[algo2] -= k * (score - expected)
+
+# plays the Swiss rounds of a ladder, updating the ratings, records and pairing counts after every game
+def play_rounds(pool, algos, args, journal, ratings, records, played):
+	byes = {algo: 0 for algo in algos}
+	for round_num in range(args['rounds']):
+		pairings = swiss_pairings(algos, ratings, played, byes)
+		print ('Round {}: {}'.format(round_num + 1, ', '.join('{} vs {}'.format(a, b) for a, b in pairings)))
+		# each pairing is a side swapped pair of games with the same seed
+		futures = {}
+		for a, b in pairings:
+			seed = run_arena.pair_seed(args['seed'] + round_num, a, b)
+			futures[pool.submit(play, a, b, args['timeout'], journal, seed)] = (a, b)
+			futures[pool.submit(play, b, a, args['timeout'], journal, seed)] = (b, a)
+		for future in concurrent.futures.as_completed(futures):
+			a, b = futures[future]
+			score = future.result()
+			if score is None:
+				continue
+			played[frozenset((a, b))] = played.get(frozenset((a, b)), 0) + 1
+			elo_update(ratings, a, b, score, args['k'])
+			for algo, s in [(a, score), (b, 1 - score)]:
+				records[algo][0 if s == 1 else 1 if s == 0 else 2] += 1
+
+def ladder(algos, args, journal):
+	ratings = {algo: 0.0 for algo in algos}
+	records = {algo: [0, 0, 0] for algo in algos}
+	played = {}
+
+	with concurrent.futures.ThreadPoolExecutor(max_workers=args['batch']) as pool:
+		try:
+			play_rounds(pool, algos, args, journal, ratings, records, played)
+		except KeyboardInterrupt:
+			run_arena.kill_active_games()
+			raise
+
+	print ()
+	fill = max(len(a) for a in algos) + 2
+	print ('{: <{fill}}{: >8}{: >12}'.format('Algo', 'Elo', 'W-L-T', fill=fill))
+	for algo in sorted(algos, key=lambda a: -ratings[a]):
+		print ('{: <{fill}}{: >8.0f}{: >12}'.format(algo, ratings[algo], '-'.join(str(n) for n in records[algo]), fill=fill))
+	return ratings
+
+if __name__ == '__main__':
+	args = parse_args() # get command line arguments
+	parent_dir = run_arena.get_parent_dir()
+
+	if args['head_to_head'] is not None:
+		algo1, algo2 = args['head_to_head']
+		head_to_head(algo1, algo2, args, new_journal(parent_dir, 'h2h'))
+	elif args['ladder'] is not None:
+		algos = args['ladder']
+		if len(algos) == 0:
+			algos = sorted(os.listdir(os.path.join(parent_dir, 'algos')))
+		if len(algos) < 2:
+			print ('A ladder needs at least 2 algos')
+			sys.exit()
+		ladder(algos, args, new_journal(parent_dir, 'ladder'))
+	else:
+		print ('No arguments - no action taken')
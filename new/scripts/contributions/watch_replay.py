@@ -196,11 +196,14 @@ try:
 	import warnings
 	import argparse
 	import subprocess
-	import multiprocessing as mp
 except ImportError as e:
 	sys.stderr.write("WARNING: Module not found, full error:\n\n")
 	sys.stderr.write(e)
 
+# run_match.py in the scripts folder starts the engine for real-time watching
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+from run_match import Match
+
 try:
 	import matplotlib.pyplot as plt
 	import matplotlib.animation as animation
@@ -1226,63 +1229,17 @@ class FileHandler:
 				self.replays.append(Replay(f_name))
 
 
-# This is all almost directly copied from run_match.py
-
-# Runs a single game
-def run_single_game(process_command):
-	print("Start run a match")
-	p = subprocess.Popen(
-		process_command,
-		shell=True,
-		stdout=sys.stdout,
-		stderr=sys.stderr
-		)
-	# daemon necessary so game shuts down if this script is shut down by user
-	p.daemon = 1
-	p.wait()
-	print("Finished running match")
-
+# starts a match and returns it without waiting for it to end, the engine's output goes to the terminal
 def run_match(a1='', a2=''):
-	# Get location of this run file
-	file_dir = os.path.dirname(os.path.realpath(__file__))
-	parent_dir = os.path.abspath('{}/..'.format(os.path.join(file_dir, os.pardir)))
-
-	# Get if running in windows OS
-	is_windows = sys.platform.startswith('win')
-	print("Is windows: {}".format(is_windows))
-
 	# Set default path for algos if script is run with no params
-	default_algo = parent_dir + "/algos/starter-algo-ZIPME/run.ps1" if is_windows else parent_dir + "/algos/starter-algo-ZIPME/run.sh" 
-	algo1 = default_algo
-	algo2 = default_algo
-
-	if a1 != '':
-		algo1 = a1
-	if a2 != '':
-		algo2 = a2
-
-	# If folder path is given instead of run file path, add the run file to the path based on OS
-	# trailing_char deals with if there is a trailing \ or / or not after the directory name
-	if is_windows:
-		if "run.ps1" not in algo1:
-			trailing_char = "" if algo1.endswith("\\") else "/"
-			algo1 = algo1 + trailing_char + "run.ps1"
-		if "run.ps1" not in algo2:
-			trailing_char = "" if algo2.endswith("\\") else "/"
-			algo2 = algo2 + trailing_char + "run.ps1"
-	else:
-		if "run.sh" not in algo1:
-			trailing_char = "" if algo1.endswith('/') else "/"
-			algo1 = algo1 + trailing_char + "run.sh"
-		if "run.sh" not in algo2:
-			trailing_char = "" if algo2.endswith('/') else "/"
-			algo2 = algo2 + trailing_char + "run.sh"
+	default_algo = os.path.join("algos", "starter-algo-ZIPME")
+	algo1 = a1 if a1 != '' else default_algo
+	algo2 = a2 if a2 != '' else default_algo
 
-	print("Algo 1: ", algo1)
-	print("Algo 2:", algo2)
-
-	match = mp.Process(target=run_single_game, args=("cd {} && java -jar engine.jar work {} {}".format(parent_dir, algo1, algo2),))
-	match.start()
+	match = Match(algo1, algo2, stdout=sys.stdout, stderr=sys.stderr)
+	print("Algo 1: ", match.algo1)
+	print("Algo 2:", match.algo2)
+	return match
 
 def main(args):
 	global BLIT
@@ -1302,17 +1259,17 @@ def main(args):
 		elif keep_trying:
 			print ('\n\nWARNING: You specified keep trying writers, but nothing will be saved since this is running real time. Wait for the match to end.')
 
-		fh = FileHandler()																		# create a file handler object
-		fh.load_files(1,False,args['file'])														# load latest replay
-		previous_replay = str(fh.get_last_replay())												# get the replay that was last created
-
-		if len(args['run_match']) > 1: run_match(args['run_match'][0], args['run_match'][1])	# run the match with both algos specified
-		else: run_match(args['run_match'][0])													# run the match with one algo specified
+		match = run_match(*args['run_match'][:2])												# run the match with the algos specified
 
-		# wait to open visualizer until a new replay has been created
-		while str(fh.get_last_replay()) == previous_replay:
-			fh.load_files()
+		# wait to open visualizer until the engine has created the match's replay
+		while match.get_replay() is None:
+			if match.process.poll() is not None:
+				sys.stderr.write('The match ended without a replay\n')
+				match.finish()
+				sys.exit()
 			time.sleep(.5)
+		args['file'] = [match.get_replay()]														# only ever load this match's replay
+		fh = FileHandler()																		# create a file handler object
 
 		# keep trying to load the replay file until it is capable of getting data from it - then start the visualizer
 		while True:
@@ -1323,6 +1280,12 @@ def main(args):
 				break
 			except RuntimeError:																		# we raised this error when data was nothing in Graph init()
 				time.sleep(.5)
+
+		# the window is closed, move the replay into replays/ once the match is over
+		match.wait()
+		result = match.finish()
+		if result.replay is not None:
+			print ('Replay saved to {}'.format(result.replay))
 	else:
 		# here we know the replay file is already created an finished
 
@@ -1,59 +1,232 @@
-import os
-import subprocess
-import sys
+'''
+Runs a match between two algos:
+>python3 scripts/run_match.py python-algo java-algo/algo-target
 
-# Runs a single game
-def run_single_game(process_command):
-    print("Start run a match")
-    p = subprocess.Popen(
-        process_command,
-        shell=True,
-        stdout=sys.stdout,
-        stderr=sys.stderr
-        )
-    # daemon necessary so game shuts down if this script is shut down by user
-    p.daemon = 1
-    p.wait()
-    print("Finished running match")
+It can also be imported by other scripts, which get the result of the match back:
+    import run_match
+    result = run_match.run_match('algos/my-bot1', 'algos/my-bot2', timeout=300)
+    print(result.winner, result.turns, result.replay)
+
+The engine is started directly, without a shell, in a folder of its own inside replays/. The
+replay it writes there is the only one in that folder, so it is found without looking through
+the other replays, then moved into replays/ next to them.
+'''
 
-# Get location of this run file
-file_dir = os.path.dirname(os.path.realpath(__file__))
-parent_dir = os.path.join(file_dir, os.pardir)
-parent_dir = os.path.abspath(parent_dir)
+import os
+import sys
+import json
+import time
+import shutil
+import signal
+import tempfile
+import subprocess
 
 # Get if running in windows OS
 is_windows = sys.platform.startswith('win')
-print("Is windows: {}".format(is_windows))
-
-# Set default path for algos if script is run with no params
-default_algo = parent_dir + "\\python-algo\\run.ps1" if is_windows else parent_dir + "/python-algo/run.sh"
-algo1 = default_algo
-algo2 = default_algo
-
-# If script run with params, use those algo locations when running the game
-if len(sys.argv) > 1:
-    algo1 = sys.argv[1]
-if len(sys.argv) > 2:
-    algo2 = sys.argv[2]
-
-# If folder path is given instead of run file path, add the run file to the path based on OS
-# trailing_char deals with if there is a trailing \ or / or not after the directory name
-if is_windows:
-    if "run.ps1" not in algo1:
-        trailing_char = "" if algo1.endswith("\\") else "\\"
-        algo1 = algo1 + trailing_char + "run.ps1"
-    if "run.ps1" not in algo2:
-        trailing_char = "" if algo2.endswith("\\") else "\\"
-        algo2 = algo2 + trailing_char + "run.ps1"
-else:
-    if "run.sh" not in algo1:
-        trailing_char = "" if algo1.endswith('/') else "/"
-        algo1 = algo1 + trailing_char + "run.sh"
-    if "run.sh" not in algo2:
-        trailing_char = "" if algo2.endswith('/') else "/"
-        algo2 = algo2 + trailing_char + "run.sh"
-
-print("Algo 1: ", algo1)
-print("Algo 2:", algo2)
-
-run_single_game("cd {} && java -jar engine.jar work {} {}".format(parent_dir, algo1, algo2))
\ No newline at end of file
+run_file = "run.ps1" if is_windows else "run.sh"
+
+# the folder holding engine.jar, game-configs.json and replays/, above this scripts folder
+def get_parent_dir():
+    file_dir = os.path.dirname(os.path.realpath(__file__))
+    return os.path.abspath(os.path.join(file_dir, os.pardir))
+
+# the run file of an algo from its folder or the run file itself. Relative paths are from parent_dir
+def get_run_file(algo, parent_dir):
+    algo = os.path.join(parent_dir, algo)
+    if os.path.isdir(algo):
+        algo = os.path.join(algo, run_file)
+    return os.path.abspath(algo)
+
+# keyword arguments for Popen that put the match in its own process group, so it can be killed as a whole
+def new_process_group():
+    if is_windows:
+        return {'creationflags': subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {'start_new_session': True}
+
+# kills the engine and both algos started by a match
+def kill_process_tree(p):
+    try:
+        if is_windows:
+            subprocess.call(['taskkill', '/F', '/T', '/PID', str(p.pid)], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        else:
+            os.killpg(p.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError, OSError):
+        pass
+
+# reads the winner, turns, health and crashes from the last frame of a replay
+def read_replay_result(replay_path):
+    last_line = ''
+    with open(replay_path) as f:
+        for line in f:
+            if line.strip() != '':
+                last_line = line
+    frame = json.loads(last_line)
+    end_stats = frame.get('endStats', {})
+    p1_health = frame['p1Stats'][0]
+    p2_health = frame['p2Stats'][0]
+    winner = end_stats.get('winner')
+    if winner is None:
+        winner = 1 if p1_health > p2_health else 2 if p2_health > p1_health else 0
+    return {
+        'player1': end_stats.get('player1', {}).get('name'),
+        'player2': end_stats.get('player2', {}).get('name'),
+        'winner': winner,
+        'turns': end_stats.get('turns', frame['turnInfo'][1]),
+        'p1_health': p1_health,
+        'p2_health': p2_health,
+        'p1_crashed': end_stats.get('player1', {}).get('crashed', False),
+        'p2_crashed': end_stats.get('player2', {}).get('crashed', False),
+    }
+
+# the outcome of a match. status is 'finished', 'timeout', 'error' (the engine failed) or 'no replay'
+# winner is 1 or 2, 0 for a tie, and None with the other replay fields unless the match finished
+class MatchResult:
+    def __init__(self, algo1, algo2, status, duration, returncode=None, replay=None):
+        self.algo1 = algo1
+        self.algo2 = algo2
+        self.status = status
+        self.duration = duration
+        self.returncode = returncode
+        self.replay = replay
+        self.winner = None
+        self.turns = None
+        self.p1_health = None
+        self.p2_health = None
+        self.p1_crashed = False
+        self.p2_crashed = False
+        if status == 'finished':
+            try:
+                stats = read_replay_result(replay)
+            except (ValueError, KeyError, IndexError, OSError):
+                self.status = 'no replay'
+                return
+            for key in ['winner', 'turns', 'p1_health', 'p2_health', 'p1_crashed', 'p2_crashed']:
+                setattr(self, key, stats[key])
+
+    def as_dict(self):
+        return dict(vars(self))
+
+    def __repr__(self):
+        return 'MatchResult({})'.format(', '.join('{}={!r}'.format(key, value) for key, value in vars(self).items()))
+
+# a match being played. It starts when it is created, popen_args are passed on to Popen (for output, env, etc)
+# config is a path to a game config or the config as a dict, the game-configs.json in parent_dir by default
+# launcher is a command to start java under (like taskset) and java_options are passed to java before -jar
+class Match:
+    def __init__(self, algo1, algo2, config=None, parent_dir=None, launcher=None, java_options=None, **popen_args):
+        if parent_dir is None:
+            parent_dir = get_parent_dir()
+        self.parent_dir = parent_dir
+        self.algo1 = get_run_file(algo1, parent_dir)
+        self.algo2 = get_run_file(algo2, parent_dir)
+        self.replay_dir = os.path.join(parent_dir, 'replays')
+        os.makedirs(self.replay_dir, exist_ok=True)
+
+        # the engine reads game-configs.json from and writes replays/ to the folder it is run in
+        self.work_dir = tempfile.mkdtemp(prefix='.match-', dir=self.replay_dir)
+        try:
+            os.mkdir(os.path.join(self.work_dir, 'replays'))
+            config_path = os.path.join(self.work_dir, 'game-configs.json')
+            if config is None:
+                config = os.path.join(parent_dir, 'game-configs.json')
+            if isinstance(config, dict):
+                with open(config_path, 'w') as f:
+                    json.dump(config, f)
+            else:
+                shutil.copyfile(config, config_path)
+
+            self.started = time.time()
+            self.process = subprocess.Popen(
+                list(launcher or []) + ['java'] + list(java_options or []) + ['-jar', os.path.join(parent_dir, 'engine.jar'), 'work', self.algo1, self.algo2],
+                cwd=self.work_dir,
+                **dict(new_process_group(), **popen_args)
+                )
+        except BaseException:
+            # nothing is running, so the match's folder is not left behind in replays/
+            shutil.rmtree(self.work_dir, ignore_errors=True)
+            raise
+        self.result = None
+
+    # the replay of the match, in the match's own folder while it is being played. None until the engine starts it
+    def get_replay(self):
+        if self.result is not None:
+            return self.result.replay
+        replays = sorted(f for f in os.listdir(os.path.join(self.work_dir, 'replays')) if f.endswith('.replay'))
+        return os.path.join(self.work_dir, 'replays', replays[-1]) if len(replays) > 0 else None
+
+    def kill(self):
+        kill_process_tree(self.process)
+
+    # waits for the match to end, killing it after timeout seconds. Returns whether it timed out
+    def wait(self, timeout=None):
+        try:
+            self.process.wait(timeout)
+            return False
+        except subprocess.TimeoutExpired:
+            self.kill()
+            self.process.wait()
+            return True
+
+    # moves the replay into replays/, removes the match's folder and returns the MatchResult
+    # call it once the process has ended, status is worked out from its exit code unless it is given
+    def finish(self, status=None):
+        if self.result is not None:
+            return self.result
+        if status is None:
+            status = 'finished' if self.process.returncode == 0 else 'error'
+        replay = self.get_replay()
+        if replay is not None:
+            moved = os.path.join(self.replay_dir, os.path.basename(replay))
+            os.replace(replay, moved)
+            replay = moved
+        elif status == 'finished':
+            status = 'no replay'
+        # anything else the engine wrote, like its error files, goes where it went when the engine ran in parent_dir
+        for f_name in os.listdir(self.work_dir):
+            if f_name not in ('replays', 'game-configs.json'):
+                os.replace(os.path.join(self.work_dir, f_name), os.path.join(self.parent_dir, f_name))
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+        self.result = MatchResult(
+            os.path.basename(os.path.dirname(self.algo1)), os.path.basename(os.path.dirname(self.algo2)),
+            status, time.time() - self.started, self.process.returncode, replay)
+        return self.result
+
+# plays a match and returns its MatchResult. The match is killed after timeout seconds
+def run_match(algo1, algo2, config=None, timeout=None, parent_dir=None, **popen_args):
+    match = Match(algo1, algo2, config, parent_dir, **popen_args)
+    try:
+        timed_out = match.wait(timeout)
+    except BaseException:
+        # interrupted, so the engine and algos are not left running
+        match.kill()
+        match.process.wait()
+        match.finish('error')
+        raise
+    return match.finish('timeout' if timed_out else None)
+
+if __name__ == '__main__':
+    parent_dir = get_parent_dir()
+    print("Is windows: {}".format(is_windows))
+
+    # Set default path for algos if script is run with no params
+    default_algo = os.path.join(parent_dir, "python-algo")
+    algo1 = default_algo
+    algo2 = default_algo
+
+    # If script run with params, use those algo locations when running the game
+    if len(sys.argv) > 1:
+        algo1 = sys.argv[1]
+    if len(sys.argv) > 2:
+        algo2 = sys.argv[2]
+
+    print("Algo 1: ", get_run_file(algo1, parent_dir))
+    print("Algo 2:", get_run_file(algo2, parent_dir))
+
+    print("Start run a match")
+    result = run_match(algo1, algo2, parent_dir=parent_dir, stdout=sys.stdout, stderr=sys.stderr)
+    print("Finished running match")
+    if result.status == 'finished':
+        winner = result.algo1 if result.winner == 1 else result.algo2 if result.winner == 2 else 'tie'
+        print("Winner: {}   turns: {}   replay: {}".format(winner, result.turns, result.replay))
+    else:
+        print("Match {}".format(result.status))